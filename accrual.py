@@ -0,0 +1,203 @@
+"""포인트 적립 규칙 (등급, 품목/분류별 적립률, 기간 행사, 상한)
+
+규칙 파일(point_rules.json) 형식:
+
+    {
+      "base_rate": 0.01,                          # 기본 적립률 (총액 기준)
+      "categories": {"음료": 0.02},                # 품목 분류별 적립률
+      "items": {"P000001": 0.05},                  # 품목별 적립률 (분류보다 우선)
+      "tiers": {"VIP": 1.5},                       # 거래처 등급별 배율 (customers.json의 "tier")
+      "promotions": [                              # 기간 행사 배율 (겹치면 곱함)
+        {"name": "여름 행사", "start": "2024-07-01", "end": "2024-08-31", "multiplier": 2,
+         "categories": ["음료"], "items": [], "tiers": []}   # 대상 목록을 생략하면 전체
+      ],
+      "min_amount": 0,                             # 이 총액 미만 거래는 적립하지 않음
+      "max_points": null                           # 거래 1건당 적립 상한
+    }
+
+품목 한 줄의 적립 = 합계 × 적립률 × 등급 배율 × 행사 배율, 거래의 적립 = 줄 합계의 소수점 버림(상한 적용).
+규칙은 compile_rules()로 한 번 검사/변환한 뒤 장바구니 하나나 전체 거래 내역에 대해 배열 연산으로 계산한다.
+"""
+import math
+from datetime import datetime
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
+
+import metrics
+
+DEFAULT_RULES = {
+    "base_rate": 0.01,
+    "categories": {},
+    "items": {},
+    "tiers": {},
+    "promotions": [],
+    "min_amount": 0,
+    "max_points": None,
+}
+
+_EPSILON = 1e-9  # 32.999999... 처럼 부동소수점 오차로 1점이 덜 적립되지 않도록
+
+
+class RuleError(ValueError):
+    """적립 규칙 형식 오류"""
+
+
+def _rate(value, where):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+        raise RuleError(f"{where}: 0 이상의 숫자여야 합니다 ({value!r})")
+    return float(value)
+
+
+def _date(value, where):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        raise RuleError(f"{where}: 날짜는 YYYY-MM-DD 형식이어야 합니다 ({value!r})")
+
+
+def _names(value, where):
+    if value is None:
+        return None
+    if not isinstance(value, list):
+        raise RuleError(f"{where}: 목록이어야 합니다")
+    return frozenset(map(str, value)) or None  # 빈 목록은 전체 대상
+
+
+class Promotion:
+    def __init__(self, spec, number):
+        where = f"promotions[{number}]"
+        if not isinstance(spec, dict):
+            raise RuleError(f"{where}: 객체여야 합니다")
+        self.name = str(spec.get("name") or f"행사 {number + 1}")
+        self.start = _date(spec.get("start"), f"{where}.start")
+        self.end = _date(spec.get("end"), f"{where}.end")
+        if self.start > self.end:
+            raise RuleError(f"{where}: 시작일이 종료일보다 늦습니다")
+        self.multiplier = _rate(spec.get("multiplier", 1), f"{where}.multiplier")
+        self.items = _names(spec.get("items"), f"{where}.items")
+        self.categories = _names(spec.get("categories"), f"{where}.categories")
+        self.tiers = _names(spec.get("tiers"), f"{where}.tiers")
+
+    def covers_item(self, code, category):
+        if self.items is None and self.categories is None:
+            return True
+        return bool((self.items and code in self.items) or (self.categories and category in self.categories))
+
+
+class CompiledRules:
+    """검사를 마친 적립 규칙. compile_rules()로 만든다"""
+
+    def __init__(self, rules):
+        if not isinstance(rules, dict):
+            raise RuleError("적립 규칙은 객체여야 합니다")
+        unknown = set(rules) - set(DEFAULT_RULES)
+        if unknown:
+            raise RuleError(f"알 수 없는 항목: {', '.join(sorted(unknown))}")
+        rules = {**DEFAULT_RULES, **rules}
+        self.base_rate = _rate(rules["base_rate"], "base_rate")
+        self.category_rates = {str(k): _rate(v, f"categories.{k}") for k, v in (rules["categories"] or {}).items()}
+        self.item_rates = {str(k): _rate(v, f"items.{k}") for k, v in (rules["items"] or {}).items()}
+        self.tier_multipliers = {str(k): _rate(v, f"tiers.{k}") for k, v in (rules["tiers"] or {}).items()}
+        if not isinstance(rules["promotions"] or [], list):
+            raise RuleError("promotions: 목록이어야 합니다")
+        self.promotions = [Promotion(spec, number) for number, spec in enumerate(rules["promotions"] or [])]
+        self.min_amount = _rate(rules["min_amount"] or 0, "min_amount")
+        self.max_points = None if rules["max_points"] is None else int(_rate(rules["max_points"], "max_points"))
+
+    @property
+    def tiers(self):
+        return sorted(self.tier_multipliers)
+
+    def _item_tables(self, codes, items):
+        """품목코드 목록별 (적립률 배열, 행사별 대상 여부 배열 목록)"""
+        categories = [str(items.get(code, {}).get("category") or "") for code in codes]
+        rates = np.array([
+            self.item_rates.get(code, self.category_rates.get(category, self.base_rate))
+            for code, category in zip(codes, categories)
+        ], dtype=np.float64)
+        covered = [
+            np.array([promotion.covers_item(code, category) for code, category in zip(codes, categories)], dtype=bool)
+            for promotion in self.promotions
+        ]
+        return rates, covered
+
+    def evaluate(self, lines, items):
+        """펼친 거래 내역(flatten_lines 결과)의 거래별 적립 포인트 배열"""
+        count = len(lines["dates"])
+        owner = lines["line_owner"]
+        rates, covered = self._item_tables(lines["codes"], items)
+        tier_names = lines["tiers"]
+
+        # 품목 줄별 적립률 × 등급 배율 × 행사 배율
+        tier_multipliers = np.array([self.tier_multipliers.get(tier, 1.0) for tier in tier_names] or [1.0])
+        multiplier = tier_multipliers[lines["tier_index"]][owner]
+        for promotion, item_covered in zip(self.promotions, covered):
+            active = (lines["dates"] >= promotion.start) & (lines["dates"] <= promotion.end)
+            if promotion.tiers is not None:
+                in_tiers = np.array([tier in promotion.tiers for tier in tier_names] or [False])
+                active &= in_tiers[lines["tier_index"]]
+            active = active[owner] & item_covered[lines["code_index"]]
+            multiplier = np.where(active, multiplier * promotion.multiplier, multiplier)
+        line_points = lines["totals"] * rates[lines["code_index"]] * multiplier
+
+        points = np.floor(np.bincount(owner, weights=line_points, minlength=count) + _EPSILON)
+        points[lines["amounts"] < self.min_amount] = 0
+        if self.max_points is not None:
+            points = np.minimum(points, self.max_points)
+        return points.astype(np.int64)
+
+    def basket_points(self, basket_lines, items, date, tier=""):
+        """장바구니(make_line() 형식 목록) 하나의 적립 포인트"""
+        transaction = {"date": date, "items": basket_lines, "total_amount": sum(line["total"] for line in basket_lines)}
+        return int(self.evaluate(flatten_lines([transaction], tiers=[tier or ""]), items)[0])
+
+
+def compile_rules(rules=None):
+    """규칙(dict)을 검사하여 CompiledRules로 변환 (None이면 기본 규칙: 총액의 1%)"""
+    return CompiledRules(DEFAULT_RULES if rules is None else rules)
+
+
+@metrics.timed("points.flatten")
+def flatten_lines(transactions, customers=None, tiers=None):
+    """거래 목록을 적립 계산용 배열로 펼친다 (한 번 펼쳐서 여러 규칙에 재사용)
+
+    거래처 등급은 tiers(거래별 등급 목록)가 있으면 그것을, 없으면 customers의 현재 "tier"를 쓴다.
+    """
+    if tiers is None:
+        customer_tiers = {
+            customer_id: info["tier"] for customer_id, info in (customers or {}).items() if info.get("tier")
+        }
+        if customer_tiers:
+            tiers = [customer_tiers.get(transaction.get("customer_id"), "") for transaction in transactions]
+        else:
+            tiers = [""] * len(transactions)
+    tier_names = sorted(set(tiers))
+    tier_numbers = {tier: number for number, tier in enumerate(tier_names)}
+
+    import pandas as pd  # 품목코드 번호 매기기(factorize)에만 사용
+
+    line_lists = [transaction.get("items", []) for transaction in transactions]
+    counts = np.fromiter(map(len, line_lists), dtype=np.int64, count=len(line_lists))
+    total = int(counts.sum())
+    codes = np.fromiter(map(itemgetter("item_code"), chain.from_iterable(line_lists)), dtype=object, count=total)
+    code_index, code_names = pd.factorize(codes)
+    return {
+        "dates": np.fromiter(map(itemgetter("date"), transactions), dtype="U10", count=len(transactions)),
+        "amounts": np.fromiter(map(itemgetter("total_amount"), transactions), dtype=np.float64,
+                               count=len(transactions)),
+        "tiers": tier_names,
+        "tier_index": np.fromiter(map(tier_numbers.__getitem__, tiers), dtype=np.int64, count=len(tiers)),
+        "codes": list(code_names),
+        "code_index": code_index,
+        "totals": np.fromiter(map(itemgetter("total"), chain.from_iterable(line_lists)),
+                              dtype=np.float64, count=total),
+        "line_owner": np.repeat(np.arange(len(line_lists)), counts),
+    }
+
+
+def recorded_points(transactions):
+    """거래에 기록된 적립 포인트 배열 (규칙 변경 모의 계산의 비교 기준)"""
+    return np.fromiter((transaction.get("points", 0) for transaction in transactions),
+                       dtype=np.int64, count=len(transactions))
@@ -0,0 +1,163 @@
+"""코다이포인트 HTTP API (POS 단말기, 키오스크 연동용)
+
+실행 방법:
+    uvicorn api:app --host 0.0.0.0 --port 8000
+
+Streamlit 화면과 같은 데이터 파일을 사용하며, 저장은 storage.locked()로 화면과 순서를 맞춘다.
+"""
+import time
+from datetime import date as Date
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+import accrual
+import backup
+import customer_ids
+import metrics
+import service
+import storage
+
+app = FastAPI(title="코다이포인트 API", version="1.0")
+
+# 프로세스 내 데이터 캐시 (다른 프로세스가 파일을 바꾸면 다시 읽음)
+store = storage.DataStore()
+backup.start_from_env()  # CODAIPOINT_BACKUP_DIR 지정 시 저장 후 백그라운드 백업
+_compiled_rules = {}  # 적립 규칙 파일 버전 -> 변환된 규칙
+_id_variants = {}  # 거래처 파일 버전 -> 표준 표기가 같은 번호 묶음
+
+
+class LineIn(BaseModel):
+    item_code: str
+    quantity: int = Field(gt=0)
+    price: int = Field(gt=0)
+
+
+class TransactionIn(BaseModel):
+    customer_id: str = Field(min_length=1)
+    customer_name: str = Field(min_length=1)
+    date: Optional[Date] = None  # 생략 시 오늘
+    items: List[LineIn] = Field(min_length=1)
+
+
+class RedeemIn(BaseModel):
+    points: int = Field(gt=0)
+
+
+def _point_rules():
+    """적립 규칙 (파일이 바뀔 때만 다시 변환, 규칙 파일 오류 시 기본 규칙)"""
+    rules = store.get('point_rules')
+    version = store.version('point_rules')
+    if version not in _compiled_rules:
+        try:
+            compiled = accrual.compile_rules(rules)
+        except accrual.RuleError:
+            compiled = accrual.compile_rules()
+        _compiled_rules.clear()
+        _compiled_rules[version] = compiled
+    return _compiled_rules[version]
+
+
+def _resolve(customer_id):
+    """요청의 거래처 번호를 등록된 거래처 키로 (아직 표준 표기로 합치지 않은 거래처 포함)"""
+    customers = store.get('customers')
+    version = store.version('customers')
+    if version not in _id_variants:
+        _id_variants.clear()
+        _id_variants[version] = customer_ids.variant_groups(customers)
+    return service.resolve_customer_id(customers, customer_id, _id_variants[version])
+
+
+def _register(body, store_code=None):
+    transaction_date = (body.date or Date.today()).strftime("%Y-%m-%d")
+    with storage.locked(), storage.using_store(store_code):  # 거래/품목은 매장별, 거래처는 모든 매장 공용
+        lines = service.lines_from_items(
+            storage.load_item_catalog(),
+            [(line.item_code, line.quantity, line.price) for line in body.items]
+        )
+        customer_id = _resolve(body.customer_id)
+        customers = store.get('customers')
+        transaction = service.register_transaction(
+            customers, store.get('transactions'),
+            customer_id, body.customer_name, transaction_date, lines,
+            rules=_point_rules(), items=storage.load_item_catalog()
+        )
+        store.save('customers')
+        store.save('transactions')
+        return transaction, service.get_balance(customers, customer_id)
+
+
+def _redeem(customer_id, points):
+    with storage.locked():
+        customer_id = _resolve(customer_id)
+        balance = service.use_points(store.get('customers'), customer_id, points)
+        store.save('customers')
+        return customer_id, balance
+
+
+def _balance(customer_id):
+    customer_id = _resolve(customer_id)
+    customer = service.get_customer(store.get('customers'), customer_id)
+    expiring = service.expiring_points(customer, Date.today().strftime("%Y-%m-%d"), service.POINT_NOTICE_DAYS)
+    return customer_id, customer.get('name', ''), customer.get('points', 0), expiring
+
+
+async def _call(func, *args, not_found_status=404):
+    """블로킹 파일 처리는 스레드에서 실행하고 서비스 오류를 HTTP 오류로 변환"""
+    try:
+        return await run_in_threadpool(func, *args)
+    except service.NotFoundError as e:
+        raise HTTPException(status_code=not_found_status, detail=str(e))
+    except service.ServiceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.middleware("http")
+async def record_request_time(request: Request, call_next):
+    """요청별 처리 시간 기록 (경로는 /customers/{customer_id} 같은 라우트 형식으로 묶음)"""
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    metrics.record(
+        "http.api", time.perf_counter() - start,
+        method=request.method, path=route.path if route else "unmatched", status=response.status_code
+    )
+    return response
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus 수집용 구간별 실행 시간"""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.post("/transactions", status_code=201)
+async def register_transaction(body: TransactionIn, store: Optional[str] = Query(None)):
+    """거래 등록 및 포인트 적립 (store: 매장 코드, 생략 시 기본 매장)"""
+    transaction, balance = await _call(_register, body, store, not_found_status=400)
+    return {"transaction": transaction, "balance": balance}
+
+
+@app.post("/customers/{customer_id}/redeem")
+async def redeem_points(customer_id: str, body: RedeemIn):
+    """포인트 사용"""
+    customer_id, balance = await _call(_redeem, customer_id, body.points)
+    return {"customer_id": customer_id, "used": body.points, "balance": balance}
+
+
+@app.get("/customers/{customer_id}")
+async def get_balance(customer_id: str):
+    """거래처 포인트 잔액 조회 (번호 표기가 달라도 조회, 응답의 customer_id는 등록된 표준 표기)
+
+    expiring_soon: POINT_NOTICE_DAYS일 안에 소멸 예정인 포인트
+    """
+    customer_id, name, points, expiring = await _call(_balance, customer_id)
+    return {"customer_id": customer_id, "name": name, "points": points, "expiring_soon": expiring}
@@ -0,0 +1,507 @@
+"""데이터 파일 증분 백업과 시점 복원
+
+    CODAIPOINT_BACKUP_DIR=backups streamlit run app.py   # 저장할 때마다 백그라운드에서 백업
+    python -m backup --dir backups --snapshot            # 지금 백업 (cron 등)
+    python -m backup --dir backups --list
+    python -m backup --dir backups --restore "2026-10-19 14:00" [--output-dir restored]
+
+파일 내용을 내용 기준 경계(CDC, 직전 WINDOW 바이트의 롤링 해시)로 평균 약 64 KB 조각으로 나누고,
+조각 해시로 이전 백업에 이미 있는 조각은 다시 쓰지 않는다. 거래 추가처럼 파일 끝만 바뀌면 마지막 조각 몇 개,
+거래처 몇 곳이 바뀌면 그 주변 조각만 새로 압축해 기록하므로 백업 크기와 시간은 전체 내역이 아니라 변경량에 비례한다.
+직전 백업과 같은 앞부분은 조각 경계를 다시 계산하지 않고 직전 스냅샷의 조각 해시와 비교만 한다
+(파일 내용을 메모리에 남겨 두지 않으므로 백업을 켠 프로세스의 메모리가 데이터 파일 크기만큼 늘지 않음).
+
+백업 파일 하나가 스냅샷 하나이다.
+- 전체(full): 모든 조각을 담아 그 파일만으로 복원 가능
+- 증분(delta): 같은 묶음(직전 전체 백업 이후)에 없던 조각만 담음
+증분이 FULL_EVERY개 쌓이거나 증분 합계가 전체 백업 크기의 DELTA_RATIO배를 넘으면 다음 백업을 전체로 하고,
+전체 백업 기준으로 최근 KEEP_FULLS묶음만 남긴다. 각 스냅샷에는 데이터별 조각 목록이 모두 기록되어 있어,
+복원은 그 시점의 스냅샷과 같은 묶음 파일에서 필요한 조각만 읽는다.
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import threading
+from datetime import datetime
+
+import numpy as np
+
+import metrics
+import serializers
+import storage
+
+try:
+    import fcntl  # 여러 프로세스가 같은 백업 폴더를 쓸 때의 잠금 (Linux/macOS)
+except ImportError:
+    fcntl = None
+
+BACKUP_DIR_ENV = 'CODAIPOINT_BACKUP_DIR'  # 지정하면 저장 후 백그라운드 백업 사용
+BACKUP_INTERVAL_ENV = 'CODAIPOINT_BACKUP_INTERVAL'  # 저장 후 백업까지 기다리는 시간(초)
+
+DEFAULT_INTERVAL = 30.0  # 이 시간 동안의 저장은 한 번의 백업으로 묶음
+FULL_EVERY = 48
+DELTA_RATIO = 0.5
+KEEP_FULLS = 7
+
+# 백업할 데이터 (api_config는 인증키가 있어 제외). 매장별 데이터는 등록된 모든 매장의 파일을 백업
+DATASETS = ('customers', 'transactions', 'items', 'point_rules', 'stores')
+
+WINDOW = 48  # 롤링 해시 창 크기(바이트)
+MIN_CHUNK = 16 * 1024
+MAX_CHUNK = 256 * 1024
+CHUNK_MASK = (1 << 16) - 1  # 평균 조각 크기 약 64 KB
+_SCAN_BLOCK = 4 * 1024 * 1024  # 경계 계산 시 한 번에 numpy로 처리하는 크기
+# 바이트 값 -> 임의의 32비트 값 (경계 위치가 이 표로 정해지므로 바꾸면 이전 백업과 조각이 공유되지 않음)
+_GEAR = np.random.default_rng(0x434450).integers(0, 1 << 32, 256, dtype=np.uint64).astype(np.uint32)
+
+MAGIC = b"CDBK"
+FILE_VERSION = 1
+_HEADER = struct.Struct(">4sBI")  # MAGIC, 파일 형식 버전, 목록(manifest) 길이
+SUFFIX = '.cdbk'
+_TIME_FORMAT = "%Y%m%dT%H%M%S%f"
+
+
+class BackupError(Exception):
+    """백업 파일이 없거나 읽을 수 없음"""
+
+
+def _compression():
+    return 'zstd' if serializers.COMPRESSIONS['zstd'][3]() else 'gzip'
+
+
+def _digest(chunk):
+    return hashlib.blake2b(chunk, digest_size=16).hexdigest()
+
+
+def _cut_points(content, start):
+    """content[start:]의 조각 경계 (조각 끝 위치 목록, 마지막은 len(content))"""
+    size = len(content)
+    data = np.frombuffer(content, dtype=np.uint8)
+    cuts = []
+    last = start
+    position = start
+    while position < size:
+        # 창이 직전 블록에 걸치도록 WINDOW 바이트 앞부터 읽음 (uint32 누적합은 넘쳐도 차이는 정확함)
+        lo = max(position - WINDOW, 0)
+        hi = min(position + _SCAN_BLOCK, size)
+        sums = np.cumsum(_GEAR[data[lo:hi]], dtype=np.uint32)
+        hashes = sums[WINDOW:] - sums[:-WINDOW]  # hashes[k]: (lo+k, lo+k+WINDOW] 구간 → 위치 lo+k+WINDOW+1 에서 자름
+        candidates = np.flatnonzero((hashes & CHUNK_MASK) == 0) + lo + WINDOW + 1
+        for cut in candidates[candidates > position].tolist():
+            while cut - last > MAX_CHUNK:
+                last += MAX_CHUNK
+                cuts.append(last)
+            if cut - last >= MIN_CHUNK:
+                cuts.append(cut)
+                last = cut
+        position = hi
+    while size - last > MAX_CHUNK:
+        last += MAX_CHUNK
+        cuts.append(last)
+    if last < size or not cuts:
+        cuts.append(size)
+    return cuts
+
+
+def split_chunks(content, previous=None):
+    """content를 [(해시, 길이), ...] 조각으로 나눔
+
+    previous(이전 스냅샷의 조각 목록)를 주면 앞부분에서 해시가 같은 조각은 경계를 다시 계산하지 않고 그대로 쓴다.
+    """
+    chunks = []
+    start = 0
+    if previous:
+        view = memoryview(content)
+        for digest, length in previous:
+            end = start + length
+            if end > len(content) or _digest(view[start:end]) != digest:
+                break
+            chunks.append((digest, length))
+            start = end
+        # 마지막 조각은 파일 끝이라 잘린 것일 수 있으므로(뒤에 내용이 붙으면 경계가 달라짐) 다시 나눈다
+        if chunks and start < len(content) and start == sum(length for _, length in previous):
+            start -= chunks.pop()[1]
+    if start >= len(content) and chunks:
+        return chunks
+    for end in _cut_points(content, start):
+        chunks.append((_digest(content[start:end]), end - start))
+        start = end
+    return chunks
+
+
+def _snapshot_name(time, kind):
+    return f"{time.strftime(_TIME_FORMAT)}-{kind}{SUFFIX}"
+
+
+def _parse_name(name):
+    """파일 이름 -> (시각, 종류). 백업 파일이 아니면 None"""
+    if not name.endswith(SUFFIX):
+        return None
+    stamp, _, kind = name[:-len(SUFFIX)].partition('-')
+    try:
+        return datetime.strptime(stamp, _TIME_FORMAT), kind
+    except ValueError:
+        return None
+
+
+def _read_manifest(f):
+    header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise BackupError("백업 파일 머리말이 잘렸습니다")
+    magic, version, length = _HEADER.unpack(header)
+    if magic != MAGIC or version > FILE_VERSION:
+        raise BackupError("백업 파일 형식이 아닙니다")
+    return json.loads(f.read(length).decode('utf-8')), _HEADER.size + length
+
+
+class Backup:
+    """백업 폴더 하나 (스냅샷 만들기, 목록, 복원)"""
+
+    def __init__(self, directory, full_every=FULL_EVERY, keep_fulls=KEEP_FULLS, delta_ratio=DELTA_RATIO):
+        self.directory = directory
+        self.full_every = full_every
+        self.keep_fulls = keep_fulls
+        self.delta_ratio = delta_ratio
+        self._lock = threading.Lock()
+        self._chain = None  # 현재 묶음 {"files": [...], "known": 조각 해시 집합, "full_size", "delta_size"}
+        self._datasets = {}  # 마지막 스냅샷의 데이터별 기록 (조각 목록은 다음 백업의 앞부분 비교용)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def files(self):
+        """백업 파일 이름 목록 (시각순)"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name for name in names if _parse_name(name) is not None)
+
+    def list(self):
+        """[(시각, 종류, 파일 크기), ...]"""
+        return [
+            (*_parse_name(name), os.path.getsize(self._path(name)))
+            for name in self.files()
+        ]
+
+    def _chains(self, names):
+        """파일 이름 목록을 전체 백업 기준 묶음으로 나눔 (전체 백업 이전의 증분은 버림)"""
+        chains = []
+        for name in names:
+            if _parse_name(name)[1] == 'full':
+                chains.append([name])
+            elif chains:
+                chains[-1].append(name)
+        return chains
+
+    def _load_chain(self):
+        """폴더의 마지막 묶음으로 상태를 맞춤 (다른 프로세스가 백업을 추가했을 수 있음)"""
+        chains = self._chains(self.files())
+        if not chains:
+            self._chain, self._datasets = None, {}
+            return
+        files = chains[-1]
+        if self._chain is not None and self._chain["files"] == files:
+            return
+        known = set()
+        sizes = []
+        manifest = None
+        for name in files:
+            with open(self._path(name), 'rb') as f:
+                manifest, _ = _read_manifest(f)
+            known.update(manifest["blobs"])
+            sizes.append(os.path.getsize(self._path(name)))
+        self._chain = {"files": files, "known": known, "full_size": sizes[0], "delta_size": sum(sizes[1:])}
+        self._datasets = manifest["datasets"]
+
+    def _needs_full(self):
+        chain = self._chain
+        return (
+            chain is None
+            or len(chain["files"]) - 1 >= self.full_every
+            or chain["delta_size"] > chain["full_size"] * self.delta_ratio
+        )
+
+    def _read_files(self, targets):
+        """데이터 파일 내용과 버전 (저장 중간의 파일 조합을 읽지 않도록 잠금 안에서 읽기만 함)"""
+        contents = {}
+        with storage.locked():
+            for name, path in targets.items():
+                version = storage.file_version(path)
+                if version is None:
+                    continue
+                with open(path, 'rb') as f:
+                    contents[name] = (path, list(version), f.read())
+        return contents
+
+    def snapshot(self, full=False):
+        """바뀐 데이터가 있으면 스냅샷을 만들고 파일 이름을, 없으면 None을 반환"""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, _DirectoryLock(self._path('.lock')):
+            self._load_chain()
+            full = full or self._needs_full()
+            targets = _targets()
+            versions = {name: storage.file_version(path) for name, path in targets.items()}
+            changed = [
+                name for name, version in versions.items()
+                if version is not None and (
+                    name not in self._datasets or self._datasets[name]["version"] != list(version)
+                )
+            ]
+            if not full and not changed:
+                return None
+            kind = 'full' if full else 'delta'
+            with metrics.timer("backup.snapshot", kind=kind):
+                return self._write_snapshot(
+                    kind, self._read_files(targets if full else {name: targets[name] for name in changed})
+                )
+
+    def _write_snapshot(self, kind, contents):
+        datasets = {} if kind == 'full' else dict(self._datasets)
+        known = set() if kind == 'full' else set(self._chain["known"])
+        compress = serializers.COMPRESSIONS[_compression()][1]
+        blobs, payloads, offset = {}, [], 0
+        for name, (path, version, content) in contents.items():
+            chunks = split_chunks(content, self._datasets.get(name, {}).get("chunks"))
+            start = 0
+            for digest, length in chunks:
+                if digest not in known:
+                    payload = compress(content[start:start + length])
+                    blobs[digest] = [offset, len(payload)]
+                    payloads.append(payload)
+                    offset += len(payload)
+                    known.add(digest)
+                start += length
+            datasets[name] = {
+                "file": path, "version": version, "size": len(content),
+                "chunks": [list(chunk) for chunk in chunks],
+            }
+
+        time = datetime.now()
+        name = _snapshot_name(time, kind)
+        manifest = json.dumps({
+            "time": time.isoformat(), "kind": kind, "compression": _compression(),
+            "datasets": datasets, "blobs": blobs,
+        }, ensure_ascii=False).encode('utf-8')
+        tmp_path = self._path(f".{name}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, FILE_VERSION, len(manifest)))
+            f.write(manifest)
+            for payload in payloads:
+                f.write(payload)
+        os.replace(tmp_path, self._path(name))
+
+        size = os.path.getsize(self._path(name))
+        if kind == 'full':
+            self._chain = {"files": [name], "known": known, "full_size": size, "delta_size": 0}
+            self._prune()
+        else:
+            self._chain = {**self._chain, "files": self._chain["files"] + [name], "known": known,
+                           "delta_size": self._chain["delta_size"] + size}
+        self._datasets = datasets
+        return name
+
+    def _prune(self):
+        for chain in self._chains(self.files())[:-self.keep_fulls]:
+            for name in chain:
+                os.remove(self._path(name))
+
+    def _select(self, until):
+        """until 시각 이전의 마지막 스냅샷과 그 묶음의 파일 목록"""
+        for chain in reversed(self._chains(self.files())):
+            usable = [name for name in chain if _parse_name(name)[0] <= until]
+            if usable:
+                return usable
+        raise BackupError(f"{until:%Y-%m-%d %H:%M:%S} 이전의 백업이 없습니다")
+
+    @metrics.timed("backup.restore")
+    def read(self, until=None):
+        """until 시각(기본: 최신)의 데이터 파일 내용 {데이터 이름: (파일 이름, 내용)}과 스냅샷 시각"""
+        files = self._select(until or datetime.max)
+        locations = {}  # 조각 해시 -> (백업 파일 이름, 위치, 길이, 압축)
+        manifest = None
+        for name in files:
+            with open(self._path(name), 'rb') as f:
+                manifest, data_start = _read_manifest(f)
+            for digest, (offset, length) in manifest["blobs"].items():
+                locations[digest] = (name, data_start + offset, length, manifest["compression"])
+
+        handles = {}
+        try:
+            result = {}
+            for dataset, entry in manifest["datasets"].items():
+                parts = []
+                for digest, length in entry["chunks"]:
+                    if digest not in locations:
+                        raise BackupError(f"{dataset} 조각이 백업 파일에 없습니다: {digest}")
+                    name, offset, stored, compression = locations[digest]
+                    f = handles.get(name) or handles.setdefault(name, open(self._path(name), 'rb'))
+                    f.seek(offset)
+                    chunk = serializers.COMPRESSIONS[compression][2](f.read(stored))
+                    if len(chunk) != length or _digest(chunk) != digest:
+                        raise BackupError(f"{dataset} 조각이 손상되었습니다: {digest}")
+                    parts.append(chunk)
+                result[dataset] = (entry["file"], b"".join(parts))
+        finally:
+            for f in handles.values():
+                f.close()
+        return result, datetime.fromisoformat(manifest["time"])
+
+    def restore(self, until=None, output_dir=None):
+        """until 시각의 데이터로 복원. output_dir가 없으면 현재 데이터 파일을 바꾼다 (다시 백업됨)"""
+        contents, time = self.read(until)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+            for file_name, content in contents.values():
+                path = os.path.join(output_dir, file_name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(content)
+        else:
+            with storage.locked():
+                for file_name, content in contents.values():
+                    storage._write_file(file_name, content)
+        return time, {dataset: len(content) for dataset, (_, content) in contents.items()}
+
+
+def _targets():
+    """백업할 {이름: 파일 경로}. 기본 매장이 아닌 매장의 데이터는 "매장코드/데이터" 이름"""
+    targets = {}
+    for code in storage.store_codes():
+        with storage.using_store(code):
+            for name in DATASETS:
+                path = storage.DATASETS[name][0]()
+                if not code:
+                    targets[name] = path
+                elif path not in targets.values():  # 매장 공용 파일은 한 번만
+                    targets[f"{code}/{name}"] = path
+    return targets
+
+
+class _DirectoryLock:
+    """백업 폴더 잠금 (같은 폴더를 쓰는 다른 프로세스와 스냅샷이 섞이지 않도록)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._file = open(self.path, 'a')
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+class BackupWorker:
+    """저장 알림을 받아 interval초 동안 모은 뒤 백그라운드 스레드에서 스냅샷을 만든다
+
+    notify()는 깨우기만 하므로 저장(save_data 등)을 막지 않는다.
+    """
+
+    def __init__(self, backup, interval=DEFAULT_INTERVAL):
+        self.backup = backup
+        self.interval = interval
+        self.last_error = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="codaipoint-backup", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def notify(self, path=None):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._stop.wait(self.interval)  # 연달아 저장되는 동안 기다렸다가 한 번에 백업
+            self._wake.clear()
+            try:
+                self.backup.snapshot()
+            except Exception as e:  # 백업 실패로 화면/API가 멈추지 않도록 기록만 함
+                self.last_error = e
+                print(f"백업 실패: {e}", file=sys.stderr)
+            else:
+                self.last_error = None
+
+    def stop(self, flush=True):
+        """스레드를 멈추고, flush이면 남은 변경을 바로 백업"""
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=self.interval + 60)
+        if flush:
+            self.backup.snapshot()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_from_env():
+    """CODAIPOINT_BACKUP_DIR가 있으면 (프로세스당 한 번) 백그라운드 백업을 시작"""
+    global _worker
+    directory = os.environ.get(BACKUP_DIR_ENV)
+    if not directory:
+        return None
+    with _worker_lock:
+        if _worker is None:
+            interval = float(os.environ.get(BACKUP_INTERVAL_ENV) or DEFAULT_INTERVAL)
+            _worker = BackupWorker(Backup(directory), interval).start()
+            storage.SAVE_LISTENERS.append(_worker.notify)
+            _worker.notify()  # 시작 시 지난 백업 이후 바뀐 내용 백업
+    return _worker
+
+
+def _parse_time(value):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"시각 형식이 올바르지 않습니다 (예: 2026-10-19 14:00): {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="데이터 파일 증분 백업과 시점 복원")
+    parser.add_argument("--dir", default=os.environ.get(BACKUP_DIR_ENV) or "backups", help="백업 폴더")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--snapshot", action="store_true", help="바뀐 데이터 백업")
+    action.add_argument("--full", action="store_true", help="전체 백업")
+    action.add_argument("--list", action="store_true", help="백업 목록")
+    action.add_argument("--restore", type=_parse_time, metavar="시각", help="이 시각 이전의 마지막 백업으로 복원")
+    parser.add_argument("--output-dir", help="복원한 파일을 쓸 폴더 (기본: 현재 데이터 파일을 바꿈)")
+    args = parser.parse_args()
+
+    backup = Backup(args.dir)
+    if args.list:
+        for time, kind, size in backup.list():
+            print(f"{time:%Y-%m-%d %H:%M:%S.%f}  {kind:5}  {size:>12,} B")
+        return
+    if args.restore:
+        try:
+            time, sizes = backup.restore(args.restore, args.output_dir)
+        except BackupError as e:
+            print(str(e), file=sys.stderr)
+            sys.exit(1)
+        restored = ", ".join(f"{name} {size:,} B" for name, size in sizes.items())
+        print(f"{time:%Y-%m-%d %H:%M:%S} 백업으로 복원: {restored}", file=sys.stderr)
+        return
+    name = backup.snapshot(full=args.full)
+    if name is None:
+        print("지난 백업 이후 바뀐 데이터가 없습니다.", file=sys.stderr)
+    else:
+        print(f"백업 저장: {os.path.join(args.dir, name)} "
+              f"({os.path.getsize(os.path.join(args.dir, name)):,} B)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
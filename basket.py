@@ -0,0 +1,118 @@
+import pandas as pd
+
+import metrics
+import service
+import storage
+from service import VAT_RATE  # 화면 합계와 API/서비스 합계가 같은 세율을 쓰도록
+
+# 장바구니 편집기에서 품목 표시 형식 ("품목코드 - 품목명")
+ITEM_LABEL_SEP = " - "
+
+
+def item_options(item_data):
+    """품목 편집기 자동완성 목록 (품목코드 순)"""
+    if hasattr(item_data, 'labels'):  # 품목 카탈로그는 목록을 만들어 두고 세션끼리 공유
+        return item_data.labels(ITEM_LABEL_SEP)
+    return [f"{code}{ITEM_LABEL_SEP}{item_data[code]['name']}" for code in sorted(item_data)]
+
+
+def empty_basket():
+    """비어 있는 장바구니 (편집기 입력 열만 포함)"""
+    return pd.DataFrame({
+        "item": pd.Series(dtype="object"),
+        "quantity": pd.Series(dtype="int64"),
+        "price": pd.Series(dtype="int64"),
+    })
+
+
+@metrics.timed("dataframe.basket")
+def compute_basket(basket):
+    """편집기 결과 전체에 대해 공급가액/부가세/합계를 한 번에 계산하는 함수
+
+    품목이 선택되고 수량과 단가가 0보다 큰 행만 반환한다.
+    """
+    labels = basket["item"].fillna("").astype(str)
+    parts = labels.str.split(ITEM_LABEL_SEP, n=1, regex=False)
+    quantity = pd.to_numeric(basket["quantity"], errors="coerce").fillna(0).astype("int64")
+    price = pd.to_numeric(basket["price"], errors="coerce").fillna(0).astype("int64")
+
+    lines = pd.DataFrame({
+        "item_code": parts.str[0],
+        "item_name": parts.str[1].fillna(""),
+        "quantity": quantity,
+        "price": price,
+    })
+    lines["supply_value"] = lines["quantity"] * lines["price"]
+    lines["vat"] = lines["supply_value"] * VAT_RATE
+    lines["total"] = lines["supply_value"] + lines["vat"]
+
+    valid = (lines["item_code"] != "") & (lines["quantity"] > 0) & (lines["price"] > 0)
+    return lines[valid].reset_index(drop=True)
+
+
+def basket_totals(lines):
+    """총 공급가액, 총 부가세, 총 합계"""
+    return (
+        int(lines["supply_value"].sum()),
+        float(lines["vat"].sum()),
+        float(lines["total"].sum()),
+    )
+
+
+def sale_request(lines, date, customer_code, customer_name, points=0):
+    """장바구니(compute_basket 결과)를 이카운트 SaveSale 요청 본문으로 (품목 한 줄이 BulkDatas 하나)
+
+    date는 "YYYY-MM-DD", customer_code는 표준 표기 거래처 번호, points는 현재 적립 포인트(U_MEMO1).
+    """
+    return {"SaleList": [{
+        "BulkDatas": {
+            "UPLOAD_SER_NO": "",  # 필수
+            "IO_DATE": date.replace("-", ""),  # 거래일자 (대사 시 로컬 거래와 비교)
+            "WH_CD": "100",  # 필수
+            "CUST": customer_code,  # 거래처코드 (표준 표기 번호)
+            "CUST_DES": customer_name,  # 거래처명
+            "PROD_CD": line["item_code"],  # 필수
+            "QTY": str(line["quantity"]),  # 필수
+            "PRICE": str(line["price"]),  # 단가
+            "SUPPLY_AMT": str(line["supply_value"]),  # 공급가액
+            "VAT_AMT": str(int(line["vat"])),  # 부가세 (정수)
+            "U_MEMO1": str(points),  # 현재 적립 포인트
+        }
+    } for line in lines.to_dict('records')]}
+
+
+def sale_result(response_data):
+    """SaveSale 응답 → (판매 전표 번호, 오류 메시지 목록). 오류 목록이 비어 있으면 저장 성공"""
+    if response_data is None:
+        return None, ["이카운트 API로부터 응답을 받지 못했습니다."]
+    if response_data.get("Error"):
+        return None, [f"이카운트 API 오류: {response_data['Error'].get('Message', '알 수 없는 오류가 발생했습니다.')}"]
+    if response_data.get("Errors"):
+        return None, [f"이카운트 API 오류: {response_data['Errors'][0].get('Message', '알 수 없는 오류가 발생했습니다.')}"]
+
+    data = response_data.get("Data") or {}
+    if data.get("FailCnt", 0) > 0 and data.get("ResultDetails"):
+        details = data["ResultDetails"][0]
+        if not details.get("IsSuccess"):
+            return None, ["이카운트 전송 실패:"] + [f"- {error.get('Message', '')}" for error in details.get("Errors", [])]
+    if data.get("SuccessCnt", 0) > 0:
+        slip_nos = data.get("SlipNos") or []
+        return (slip_nos[0] if slip_nos else None), []
+    return None, ["이카운트 전송 실패: 알 수 없는 오류가 발생했습니다."]
+
+
+def register_basket(store, id_number, customer_name, date, lines, rules=None, items=None, slip_no=None,
+                    resolve=None):
+    """장바구니를 거래로 등록하고 포인트를 적립한 뒤 저장. 추가된 거래를 반환
+
+    store는 세션의 storage.DataStore, resolve(번호)는 입력한 번호의 거래처 키 (다른 세션이 바꾼 거래처를
+    반영하도록 잠금 안에서 호출). slip_no는 이카운트 판매 전표 번호.
+    """
+    with storage.locked():  # 다른 세션이나 API 서버와 동시에 저장하지 않도록 잠금
+        transaction = service.register_transaction(
+            store.get('customers'), store.get('transactions'), resolve(id_number) if resolve else id_number,
+            customer_name, date, lines.to_dict('records'), rules=rules, items=items, slip_no=slip_no
+        )
+        store.save('customers')
+        store.save('transactions')
+    return transaction
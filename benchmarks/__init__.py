@@ -0,0 +1 @@
+"""성능 측정용 합성 데이터 생성기와 벤치마크 (python -m benchmarks.run)"""
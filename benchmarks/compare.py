@@ -0,0 +1,55 @@
+"""두 벤치마크 결과 비교
+
+    python -m benchmarks.compare 이전.json 이후.json --threshold 0.2
+
+중앙값이 threshold 비율 이상 느려진 구간이 있으면 종료 코드 1을 반환한다.
+"""
+import argparse
+import json
+import sys
+
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    return report["meta"], {(r["benchmark"], r["line_items"]): r for r in report["results"]}
+
+
+def compare(base, head, threshold):
+    """(구간, 크기, 이전 중앙값, 이후 중앙값, 비율, 판정) 목록"""
+    rows = []
+    for key in sorted(set(base) & set(head), key=lambda k: (k[1], k[0])):
+        before, after = base[key]["median_s"], head[key]["median_s"]
+        ratio = after / before if before else float("inf")
+        if ratio > 1 + threshold:
+            status = "REGRESSION"
+        elif ratio < 1 / (1 + threshold):
+            status = "improved"
+        else:
+            status = ""
+        rows.append((key[0], key[1], before, after, ratio, status))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크 결과 비교")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.2, help="허용하는 느려짐 비율 (기본 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    base_meta, base = load_results(args.base)
+    head_meta, head = load_results(args.head)
+    rows = compare(base, head, args.threshold)
+
+    print(f"{base_meta.get('label')} → {head_meta.get('label')}")
+    print(f"{'benchmark':<24} {'line_items':>12} {'before(ms)':>12} {'after(ms)':>12} {'ratio':>7}")
+    for name, size, before, after, ratio, status in rows:
+        print(f"{name:<24} {size:>12,} {before * 1000:>12.2f} {after * 1000:>12.2f} {ratio:>7.2f} {status}")
+
+    if any(row[5] == "REGRESSION" for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
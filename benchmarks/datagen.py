@@ -0,0 +1,147 @@
+"""벤치마크용 합성 customers.json / items.json / transactions.json 생성
+
+    python -m benchmarks.datagen --line-items 100000 --output-dir /tmp/codai-bench
+
+거래 내역은 한 건씩 파일에 써서 1,000만 품목 행 규모도 메모리에 모두 올리지 않고 만든다.
+"""
+import argparse
+import json
+import os
+import random
+from datetime import date, timedelta
+
+from service import VAT_RATE, calc_points  # 측정 대상 코드와 같은 세율/적립률
+
+CATEGORIES = ["음료", "과자", "생활용품", "주류", "냉동식품", "문구", "세제", "라면"]
+SURNAMES = ["김", "이", "박", "최", "정", "강", "조", "윤", "장", "임"]
+
+
+def default_counts(line_items):
+    """품목 행 수에 맞춘 기본 거래처/품목 수"""
+    return max(100, line_items // 50), max(50, min(20000, line_items // 20))
+
+
+def make_customer_id(rng, n):
+    # 핸드폰번호와 사업자번호를 섞어서 생성
+    if rng.random() < 0.7:
+        return f"010-{1000 + n // 10000 % 9000:04d}-{n % 10000:04d}"
+    return f"{100 + n % 900:03d}-{n // 900 % 100:02d}-{n % 100000:05d}"
+
+
+def generate_customers(rng, count):
+    customers = {}
+    # 중복 거래처명이 생기도록 이름 풀을 거래처 수보다 작게 잡는다
+    name_pool = max(1, int(count * 0.8))
+    n = 0
+    while len(customers) < count:
+        customer_id = make_customer_id(rng, n)
+        n += 1
+        if customer_id in customers:
+            continue
+        name_no = rng.randrange(name_pool)
+        customers[customer_id] = {
+            "name": f"{SURNAMES[name_no % len(SURNAMES)]}상회{name_no}",
+            "points": 0
+        }
+    return customers
+
+
+def generate_items(count):
+    return {
+        f"P{i:06d}": {"name": f"{CATEGORIES[i % len(CATEGORIES)]} 상품 {i}", "category": CATEGORIES[i % len(CATEGORIES)]}
+        for i in range(count)
+    }
+
+
+def iter_transactions(rng, customers, items, line_items, items_per_transaction=3,
+                      start=date(2024, 1, 1), days=365):
+    """품목 행 합계가 line_items가 되도록 날짜 순 거래를 생성"""
+    customer_ids = list(customers)
+    item_codes = list(items)
+    transaction_count = max(1, line_items // items_per_transaction)
+    remaining = line_items
+    for n in range(transaction_count):
+        if n == transaction_count - 1:
+            size = remaining
+        else:
+            size = max(1, min(remaining - (transaction_count - n - 1), rng.randint(1, 2 * items_per_transaction - 1)))
+        remaining -= size
+
+        lines = []
+        for _ in range(size):
+            code = rng.choice(item_codes)
+            quantity = rng.randint(1, 20)
+            price = rng.randrange(500, 50000, 100)
+            supply_value = quantity * price
+            vat = supply_value * VAT_RATE
+            lines.append({
+                "item_code": code,
+                "item_name": items[code]["name"],
+                "quantity": quantity,
+                "price": price,
+                "supply_value": supply_value,
+                "vat": vat,
+                "total": supply_value + vat
+            })
+
+        customer_id = rng.choice(customer_ids)
+        total_amount = sum(line["total"] for line in lines)
+        yield {
+            "id": f"{n:012x}",
+            "date": (start + timedelta(days=n * days // transaction_count)).strftime("%Y-%m-%d"),
+            "customer_name": customers[customer_id]["name"],
+            "customer_id": customer_id,
+            "items": lines,
+            "total_supply_value": sum(line["supply_value"] for line in lines),
+            "total_vat": sum(line["vat"] for line in lines),
+            "total_amount": total_amount,
+            "points": calc_points(total_amount)
+        }
+
+
+def generate(output_dir, line_items, customers=None, items=None, seed=0):
+    """output_dir에 세 데이터 파일을 만들고 생성 건수를 반환"""
+    rng = random.Random(seed)
+    default_customers, default_items = default_counts(line_items)
+    customer_data = generate_customers(rng, customers or default_customers)
+    item_data = generate_items(items or default_items)
+
+    os.makedirs(output_dir, exist_ok=True)
+    transaction_count = 0
+    with open(os.path.join(output_dir, 'transactions.json'), 'w', encoding='utf-8') as f:
+        f.write("[")
+        for transaction in iter_transactions(rng, customer_data, item_data, line_items):
+            f.write(",\n" if transaction_count else "\n")
+            f.write(json.dumps(transaction, ensure_ascii=False))
+            customer_data[transaction["customer_id"]]["points"] += transaction["points"]
+            transaction_count += 1
+        f.write("\n]")
+
+    with open(os.path.join(output_dir, 'customers.json'), 'w', encoding='utf-8') as f:
+        json.dump(customer_data, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(output_dir, 'items.json'), 'w', encoding='utf-8') as f:
+        json.dump(item_data, f, ensure_ascii=False, indent=2)
+
+    return {
+        "line_items": line_items,
+        "transactions": transaction_count,
+        "customers": len(customer_data),
+        "items": len(item_data)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 데이터 파일 생성")
+    parser.add_argument("--line-items", type=int, default=10000, help="거래 품목 행 수")
+    parser.add_argument("--customers", type=int, help="거래처 수 (기본: 품목 행 수에 비례)")
+    parser.add_argument("--items", type=int, help="품목 수 (기본: 품목 행 수에 비례)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", default=".")
+    args = parser.parse_args()
+
+    counts = generate(args.output_dir, args.line_items, args.customers, args.items, args.seed)
+    print(json.dumps(counts, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""이카운트 판매 전송(SaveSale) 처리량/제한 시간 측정 (모의 서버 사용, 실제 서버 불필요)
+
+    python -m benchmarks.ecount_submit --requests 500 --concurrency 8 --latency 0.05 --jitter 0.2 --timeout 0.2
+
+ecount_mock 서버를 같은 프로세스에서 띄우고(--base-url을 주면 그 서버 사용) 로그인한 뒤,
+화면과 같은 ecount.call_api로 SaveSale 요청을 동시에 보내 결과별 건수, 응답 시간 백분위수, 초당 처리 건수를 기록한다.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+import ecount
+import ecount_mock
+
+COM_CODE = "000000"
+
+
+def sale_request(index, lines=3):
+    """app.py와 같은 형식의 SaveSale 요청 본문"""
+    return {"SaleList": [{
+        "BulkDatas": {
+            "UPLOAD_SER_NO": "", "WH_CD": "100", "CUST": f"010-0000-{index % 10000:04d}", "CUST_DES": f"고객{index}",
+            "PROD_CD": f"P{line:06d}", "QTY": "1", "PRICE": "1000", "SUPPLY_AMT": "1000", "VAT_AMT": "100",
+            "U_MEMO1": "0",
+        }
+    } for line in range(lines)]}
+
+
+def submit(url, body):
+    """(결과, 응답 시간). 결과는 ok, failed(이카운트 오류 응답), http_<상태 코드>, timeout, connection_error"""
+    start = time.perf_counter()
+    try:
+        response = ecount.call_api("SaveSale", url, json=body)
+    except requests.Timeout:
+        return "timeout", time.perf_counter() - start
+    except requests.ConnectionError:
+        return "connection_error", time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    if response.status_code != 200:
+        return f"http_{response.status_code}", elapsed
+    data = response.json()
+    if data.get("Error") or not (data.get("Data") or {}).get("SuccessCnt"):
+        return "failed", elapsed
+    return "ok", elapsed
+
+
+def percentiles(timings):
+    if len(timings) < 2:
+        return {"p50_s": timings[0] if timings else None, "p95_s": None, "p99_s": None}
+    cuts = statistics.quantiles(timings, n=100, method="inclusive")
+    return {"p50_s": cuts[49], "p95_s": cuts[94], "p99_s": cuts[98]}
+
+
+def run(base_url, requests_count, concurrency, lines):
+    os.environ[ecount.BASE_URL_ENV] = base_url
+    session_id = requests.post(
+        ecount.api_url("OAPILogin", ecount_mock.DEFAULT_ZONE),
+        json={"COM_CODE": COM_CODE, "USER_ID": "bench", "API_CERT_KEY": "bench", "ZONE": ecount_mock.DEFAULT_ZONE},
+        timeout=10,
+    ).json()["Data"]["Datas"]["SESSION_ID"]
+    url = f"{ecount.api_url('Sale/SaveSale', ecount_mock.DEFAULT_ZONE)}?SESSION_ID={session_id}"
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda index: submit(url, sale_request(index, lines)), range(requests_count)))
+    elapsed = time.perf_counter() - start
+
+    outcomes = {}
+    for outcome, _ in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    ok_timings = [timing for outcome, timing in results if outcome == "ok"]
+    return {
+        "requests": requests_count,
+        "elapsed_s": elapsed,
+        "ok_per_s": len(ok_timings) / elapsed if elapsed else None,
+        "outcomes": outcomes,
+        "latency": percentiles(sorted(timing for _, timing in results)),
+        "ok_latency": percentiles(sorted(ok_timings)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이카운트 판매 전송 처리량/제한 시간 측정")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 전송 수 (계산대 수)")
+    parser.add_argument("--lines", type=int, default=3, help="전송 한 건의 품목 줄 수")
+    parser.add_argument("--timeout", type=float, help="요청 제한 시간(초, 기본: ecount.DEFAULT_TIMEOUT)")
+    parser.add_argument("--base-url", help="이미 실행 중인 모의 서버 주소 (기본: 이 프로세스에서 모의 서버 실행)")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="ecount_submit.json")
+    args = parser.parse_args()
+    if args.timeout:
+        os.environ[ecount.TIMEOUT_ENV] = str(args.timeout)
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        mock = ecount_mock.MockEcount(
+            latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+            rate_limit=args.rate_limit, seed=args.seed,
+        )
+        server, base_url = ecount_mock.serve(mock)
+    try:
+        result = run(base_url, args.requests, args.concurrency, args.lines)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "base_url": args.base_url or "in-process mock",
+            "concurrency": args.concurrency,
+            "lines": args.lines,
+            "timeout_s": float(os.environ.get(ecount.TIMEOUT_ENV) or ecount.DEFAULT_TIMEOUT),
+            "latency_s": args.latency, "jitter_s": args.jitter,
+            "error_rate": args.error_rate, "rate_limit": args.rate_limit,
+        },
+        "result": result,
+    }
+    latency = result["latency"]
+    print(
+        f"{result['requests']:,}건 {result['elapsed_s']:.2f}초, 성공 {result['ok_per_s'] or 0:.1f}건/초, "
+        f"결과 {result['outcomes']}, p50 {latency['p50_s'] * 1000:.1f} ms, p99 {(latency['p99_s'] or 0) * 1000:.1f} ms",
+        file=sys.stderr
+    )
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+"""계산대 여러 대가 동시에 쓰는 부하 시험 (합성 데이터와 이카운트 모의 서버 사용)
+
+    python -m benchmarks.loadtest --cashiers 8 --checkouts 50 --line-items 100000
+    python -m benchmarks.loadtest --cashiers 8 --processes 2 --hot-customers 20 --redeem-rate 0.3
+    python -m benchmarks.loadtest --cashiers 4 --checkouts 20 --app
+
+임시 작업 폴더에 합성 데이터(benchmarks.datagen)를 만들고 ecount_mock 서버를 띄운 뒤,
+계산대마다 app.py의 거래 등록 화면과 같은 순서로 손님 한 명씩 처리한다.
+- lookup: 거래처명/번호로 거래처 찾기 (--app이면 아래 rerun 두 번 포함)
+- rerun: --app에서 거래처명/번호를 입력할 때마다 app.py를 AppTest로 다시 실행
+- item_search: 품목 검색 (품목 카탈로그)
+- basket: 장바구니 공급가액/부가세/합계와 적립 예정 포인트 계산
+- redeem: 포인트 사용 (--redeem-rate 비율)
+- ecount_send: 이카운트 판매 전송 (--ecount-rate 비율, 모의 서버)
+- register: 잠금 안에서 거래 등록과 거래처/거래 내역 저장
+계산대 하나는 Streamlit 세션 하나처럼 자기 DataStore를 가지고, 같은 프로세스의 계산대는 스레드로 동시에 실행한다.
+(--processes로 Streamlit 실행/API 서버 여러 개를 흉내 낸다.)
+
+끝나면 단계별 응답 시간 백분위수, 초당 처리 건수와 함께 데이터 무결성을 검사한다.
+- 등록한 거래가 거래 내역 파일에 한 번씩 모두 있는지 (lost writes)
+- 거래처별/전체 포인트 잔액 = 시작 잔액 + 적립 - 사용 (포인트 보존), 잔액 = 적립 묶음 합계
+- 이카운트로 보낸 전표가 모두 모의 서버에 저장되었고 거래에 기록되었는지
+검사에 실패하면 종료 코드 1.
+
+AppTest는 한 프로세스에서 동시에 실행할 수 없고 장바구니 편집기(st.data_editor) 값을 넣을 수 없으므로,
+--app에서도 장바구니 계산, 이카운트 요청 본문/응답 처리, 거래 등록은 app.py가 쓰는 basket 모듈 함수
+(compute_basket, sale_request, sale_result, register_basket)를 그 세션의 DataStore로 직접 호출한다.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+import requests
+
+import customer_ids
+import ecount
+import ecount_mock
+import service
+import storage
+from basket import item_options, compute_basket, basket_totals, sale_request, sale_result, register_basket
+from benchmarks import datagen
+from benchmarks.ecount_submit import COM_CODE, percentiles
+
+STEPS = ["rerun", "lookup", "item_search", "basket", "redeem", "ecount_send", "register"]
+DATA_FILES = [storage.CUSTOMERS_FILE, storage.TRANSACTIONS_FILE, storage.ITEMS_FILE, storage.POINT_RULES_FILE]
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+class Cashier:
+    """계산대 한 대 (Streamlit 세션 하나와 같은 캐시를 가진 스크립트 사용자)"""
+
+    def __init__(self, cashier_no, options, customers, save_url):
+        self.cashier_no = cashier_no
+        self.options = options
+        self.customers = customers  # 고를 거래처 [(번호, 거래처명)]
+        self.save_url = save_url
+        self.random = random.Random(options["seed"] * 1000 + cashier_no)
+        self.store = storage.DataStore()
+        self._variants = None
+        self._rules = None
+        self.timings = {}  # 단계 -> [초]
+        self.errors = {}  # 단계 -> {오류 메시지: 횟수}
+        self.registered = []  # [(거래 id, 거래처 번호, 적립 포인트, 전표 번호)]
+        self.redeemed = {}  # 거래처 번호 -> 사용 포인트
+        self.slips = []  # 이카운트에 저장된 전표 번호
+
+    def _timed(self, step, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        except (service.ServiceError, requests.RequestException) as e:
+            messages = self.errors.setdefault(step, {})
+            messages[str(e)] = messages.get(str(e), 0) + 1
+            return None
+        finally:
+            self.timings.setdefault(step, []).append(time.perf_counter() - start)
+
+    def _id_variants(self, customers):
+        version = self.store.version('customers')
+        if self._variants is None or self._variants[0] != version or self._variants[1] is not customers:
+            self._variants = (version, customers, customer_ids.variant_groups(customers))
+        return self._variants[2]
+
+    def _point_rules(self):
+        import accrual
+
+        rules = self.store.get('point_rules')
+        version = self.store.version('point_rules')
+        if self._rules is None or self._rules[0] != version:
+            self._rules = (version, accrual.compile_rules(rules))
+        return self._rules[1]
+
+    def _resolve(self, id_number):
+        customers = self.store.get('customers')
+        return service.resolve_customer_id(customers, id_number, self._id_variants(customers))
+
+    def _pick_customer(self, checkout_no):
+        if self.random.random() < self.options["new_customer_rate"]:
+            return f"010-9{self.cashier_no % 1000:03d}-{checkout_no % 10000:04d}", f"신규{self.cashier_no}-{checkout_no}"
+        return self.random.choice(self.customers)
+
+    def lookup(self, name, id_number):
+        """거래처명 검색 후 번호로 거래처와 잔액 확인 (app.py 상단부)"""
+        matches = service.find_customer_by_name(self.store.get('customers'), name)
+        if len(matches) > 1 and not any(match[0] == id_number for match in matches):
+            id_number = matches[0][0]
+        return self.store.get('customers').get(self._resolve(id_number), {}).get('points', 0)
+
+    def item_search(self):
+        catalog = storage.load_item_catalog()
+        term = str(self.random.randrange(len(catalog)))
+        return catalog.find(term)
+
+    def basket(self, date, id_number):
+        """편집기 결과와 같은 형식의 장바구니로 합계와 적립 예정 포인트 계산"""
+        catalog = storage.load_item_catalog()
+        labels = item_options(catalog)
+        size = self.random.randint(1, self.options["max_lines"])
+        basket = pd.DataFrame({
+            "item": [self.random.choice(labels) for _ in range(size)],
+            "quantity": [self.random.randint(1, 5) for _ in range(size)],
+            "price": [self.random.randrange(500, 50000, 100) for _ in range(size)],
+        })
+        lines = compute_basket(basket)
+        basket_totals(lines)
+        customer = self.store.get('customers').get(self._resolve(id_number), {})
+        self._point_rules().basket_points(lines.to_dict('records'), catalog, date, customer.get('tier', ''))
+        return lines
+
+    def redeem(self, id_number, points):
+        with storage.locked():
+            service.use_points(self.store.get('customers'), self._resolve(id_number), points)
+            self.store.save('customers')
+        customer_id = self._resolve(id_number)
+        self.redeemed[customer_id] = self.redeemed.get(customer_id, 0) + points
+
+    def ecount_send(self, date, name, id_number, lines, points):
+        """app.py의 "이카운트 전송 및 거래등록"과 같은 요청/응답 처리(basket.sale_request/sale_result). 전표 번호를 반환"""
+        request_data = sale_request(lines, date, self._resolve(id_number), name, points)
+        response = ecount.call_api("SaveSale", self.save_url, json=request_data)
+        if response.status_code != 200:
+            raise service.ServiceError(f"이카운트 전송 실패: HTTP {response.status_code}")
+        slip_no, errors = sale_result(response.json())
+        if errors or not slip_no:
+            raise service.ServiceError(" ".join(errors) or "이카운트 전송 실패: 전표 번호 없음")
+        self.slips.append(slip_no)
+        return slip_no
+
+    def register(self, date, name, id_number, lines, slip_no=None):
+        """app.py와 같은 basket.register_basket (세션의 DataStore로 잠금 안에서 등록/저장)"""
+        transaction = register_basket(
+            self.store, id_number, name, date, lines, rules=self._point_rules(), items=storage.load_item_catalog(),
+            slip_no=slip_no, resolve=self._resolve
+        )
+        self.registered.append((transaction["id"], transaction["customer_id"], transaction["points"], slip_no))
+        return transaction
+
+    def checkout(self, checkout_no):
+        """손님 한 명: 거래처 확인 → 품목 검색 → 장바구니 → (포인트 사용) → (이카운트 전송) → 거래 등록"""
+        date = datetime.now().strftime("%Y-%m-%d")
+        id_number, name = self._pick_customer(checkout_no)
+        points = self._timed("lookup", self.lookup, name, id_number) or 0
+        for _ in range(self.options["searches"]):
+            self._timed("item_search", self.item_search)
+        lines = self._timed("basket", self.basket, date, id_number)
+        if lines is None or lines.empty:
+            return
+        if points > 0 and self.random.random() < self.options["redeem_rate"]:
+            self._timed("redeem", self.redeem, id_number, self.random.randint(1, points))
+        slip_no = None
+        if self.save_url and self.random.random() < self.options["ecount_rate"]:
+            slip_no = self._timed("ecount_send", self.ecount_send, date, name, id_number, lines, points)
+            if slip_no is None:
+                return  # 화면에서도 전송에 실패하면 거래를 등록하지 않는다
+        self._timed("register", self.register, date, name, id_number, lines, slip_no)
+
+    def run(self, start_event=None):
+        if start_event is not None:
+            start_event.wait()
+        for checkout_no in range(self.options["checkouts"]):
+            self.checkout(checkout_no)
+            if self.options["think"]:
+                time.sleep(self.random.uniform(0, 2 * self.options["think"]))
+        return self.log()
+
+    def log(self):
+        return {
+            "cashier": self.cashier_no,
+            "timings": self.timings,
+            "errors": self.errors,
+            "registered": self.registered,
+            "redeemed": self.redeemed,
+            "slips": self.slips,
+        }
+
+
+class AppCashier(Cashier):
+    """app.py를 AppTest로 실행하는 계산대. 거래처 입력마다 화면 전체를 다시 실행하고 그 세션의 DataStore를 쓴다"""
+
+    def __init__(self, cashier_no, options, customers, save_url):
+        from streamlit.testing.v1 import AppTest
+
+        super().__init__(cashier_no, options, customers, save_url)
+        self.app = AppTest.from_file(APP_SCRIPT, default_timeout=options["app_timeout"])
+        self.app.session_state["data_store"] = self.store  # 화면과 등록이 같은 세션 캐시를 쓰도록
+        self._timed("rerun", self._rerun, self.app.run)
+
+    def _rerun(self, run):
+        run()
+        if self.app.exception:
+            raise service.ServiceError(self.app.exception[0].value)
+
+    def lookup(self, name, id_number):
+        # 계산대에서 거래처명과 번호를 차례로 입력하면 입력마다 화면이 다시 실행된다
+        self._timed("rerun", self._rerun, self.app.text_input(key="customer_name_input").input(name).run)
+        self._timed("rerun", self._rerun, self.app.text_input(key="id_number_input").input(id_number).run)
+        return super().lookup(name, id_number)
+
+
+def _run_process(cashier_nos, options, customers, save_url):
+    """계산대 묶음을 한 프로세스에서 스레드로 동시에 실행"""
+    cashier_class = AppCashier if options["app"] else Cashier
+    cashiers = [cashier_class(cashier_no, options, customers, save_url) for cashier_no in cashier_nos]
+    start_event = threading.Event()
+    with ThreadPoolExecutor(max_workers=len(cashiers)) as pool:
+        futures = [pool.submit(cashier.run, start_event) for cashier in cashiers]
+        start_event.set()
+        return [future.result() for future in futures]
+
+
+def prepare(work_dir, data_dir, line_items, customer_count, item_count, seed):
+    """작업 폴더에 데이터 파일 준비 (data_dir가 있으면 복사, 없으면 합성). 포인트 묶음 변환까지 저장해 둔다"""
+    if data_dir:
+        for name in DATA_FILES:
+            if os.path.exists(os.path.join(data_dir, name)):
+                shutil.copy(os.path.join(data_dir, name), os.path.join(work_dir, name))
+    else:
+        datagen.generate(work_dir, line_items, customer_count, item_count, seed)
+    with storage.locked():
+        storage.save_customers(storage.load_customers())
+    storage.load_item_catalog()
+
+
+def check_integrity(initial_customers, initial_transactions, logs, mock):
+    """부하 시험 뒤 파일 내용 검사. (검사 결과 dict, 모두 통과 여부)"""
+    customers = storage.load_customers()
+    transactions = storage.load_transactions()
+    registered = [entry for log in logs for entry in log["registered"]]
+    redeemed = {}
+    for log in logs:
+        for customer_id, points in log["redeemed"].items():
+            redeemed[customer_id] = redeemed.get(customer_id, 0) + points
+
+    # 등록한 거래가 모두 한 번씩 저장되었는지
+    counts = {}
+    for transaction in transactions:
+        counts[transaction.get("id")] = counts.get(transaction.get("id"), 0) + 1
+    missing = [entry[0] for entry in registered if entry[0] not in counts]
+    duplicated = [transaction_id for transaction_id, count in counts.items() if transaction_id and count > 1]
+
+    # 거래처별 포인트 보존
+    expected = {customer_id: info.get("points", 0) for customer_id, info in initial_customers.items()}
+    for _, customer_id, points, _ in registered:
+        expected[customer_id] = expected.get(customer_id, 0) + points
+    for customer_id, points in redeemed.items():
+        expected[customer_id] = expected.get(customer_id, 0) - points
+    mismatched = {
+        customer_id: {"expected": points, "actual": customers.get(customer_id, {}).get("points")}
+        for customer_id, points in expected.items() if customers.get(customer_id, {}).get("points") != points
+    }
+    lot_mismatched = [
+        customer_id for customer_id, info in customers.items()
+        if info.get("points", 0) >= 0 and sum(lot[1] for lot in service.point_lots(info)) != info.get("points", 0)
+    ]
+
+    # 이카운트 전표
+    sent = [slip for log in logs for slip in log["slips"]]
+    recorded = [entry[3] for entry in registered if entry[3]]
+    mock_slips = {sale["slip_no"] for sale in mock.sales} if mock is not None else set(sent)
+
+    checks = {
+        "transactions": {
+            "initial": initial_transactions, "registered": len(registered), "final": len(transactions),
+            "missing": missing[:20], "duplicated": duplicated[:20],
+            "ok": not missing and not duplicated and len(transactions) == initial_transactions + len(registered),
+        },
+        "points": {
+            "initial_total": sum(info.get("points", 0) for info in initial_customers.values()),
+            "earned": sum(entry[2] for entry in registered),
+            "redeemed": sum(redeemed.values()),
+            "final_total": sum(info.get("points", 0) for info in customers.values()),
+            "mismatched": dict(list(mismatched.items())[:20]),
+            "lot_mismatched": lot_mismatched[:20],
+            "ok": not mismatched and not lot_mismatched,
+        },
+        "ecount": {
+            "sent": len(sent), "recorded": len(recorded),
+            "unsaved": sorted(set(sent) - mock_slips)[:20],
+            "unrecorded": sorted(set(sent) - set(recorded))[:20],
+            "ok": set(sent) <= mock_slips and sorted(sent) == sorted(recorded),
+        },
+    }
+    checks["points"]["ok"] = checks["points"]["ok"] and checks["points"]["final_total"] == (
+        checks["points"]["initial_total"] + checks["points"]["earned"] - checks["points"]["redeemed"]
+    )
+    return checks, all(check["ok"] for check in checks.values())
+
+
+def summarize(logs, elapsed):
+    steps = {}
+    for step in STEPS:
+        timings = sorted(timing for log in logs for timing in log["timings"].get(step, []))
+        errors = {}
+        for log in logs:
+            for message, count in log["errors"].get(step, {}).items():
+                errors[message] = errors.get(message, 0) + count
+        if timings:
+            steps[step] = {"count": len(timings), "errors": errors, "mean_s": sum(timings) / len(timings),
+                           **percentiles(timings), "max_s": timings[-1]}
+    registered = sum(len(log["registered"]) for log in logs)
+    return {
+        "elapsed_s": elapsed,
+        "registered": registered,
+        "registered_per_s": registered / elapsed if elapsed else None,
+        "steps": steps,
+    }
+
+
+def login(base_url):
+    """모의 서버 로그인 후 SaveSale 주소"""
+    os.environ[ecount.BASE_URL_ENV] = base_url
+    session_id = requests.post(
+        ecount.api_url("OAPILogin", ecount_mock.DEFAULT_ZONE),
+        json={"COM_CODE": COM_CODE, "USER_ID": "loadtest", "API_CERT_KEY": "loadtest", "ZONE": ecount_mock.DEFAULT_ZONE},
+        timeout=10,
+    ).json()["Data"]["Datas"]["SESSION_ID"]
+    return f"{ecount.api_url('Sale/SaveSale', ecount_mock.DEFAULT_ZONE)}?SESSION_ID={session_id}"
+
+
+def run(options, base_url=None, mock=None):
+    """현재 작업 폴더의 데이터로 부하 시험. (결과, 무결성 검사, 통과 여부)"""
+    initial_customers = storage.load_customers()
+    initial_transactions = len(storage.load_transactions())
+    customers = sorted((customer_id, info.get("name", "")) for customer_id, info in initial_customers.items())
+    if options["hot_customers"]:
+        customers = random.Random(options["seed"]).sample(customers, min(options["hot_customers"], len(customers)))
+    save_url = login(base_url) if base_url else None
+
+    cashier_nos = list(range(options["cashiers"]))
+    processes = options["cashiers"] if options["app"] else max(1, min(options["processes"], options["cashiers"]))
+    groups = [cashier_nos[index::processes] for index in range(processes)]
+
+    start = time.perf_counter()
+    if processes == 1 and not options["app"]:
+        logs = _run_process(groups[0], options, customers, save_url)
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [pool.submit(_run_process, group, options, customers, save_url) for group in groups]
+            logs = [log for future in futures for log in future.result()]
+    elapsed = time.perf_counter() - start
+
+    result = summarize(logs, elapsed)
+    result["processes"] = processes
+    if mock is not None:
+        result["ecount_mock"] = mock.stats()
+    checks, passed = check_integrity(initial_customers, initial_transactions, logs, mock)
+    return result, checks, passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="계산대 여러 대 동시 사용 부하 시험")
+    parser.add_argument("--cashiers", type=int, default=8, help="동시에 쓰는 계산대(세션) 수")
+    parser.add_argument("--checkouts", type=int, default=50, help="계산대마다 처리할 손님 수")
+    parser.add_argument("--processes", type=int, default=1, help="계산대를 나눠 실행할 프로세스 수 (Streamlit 실행 여러 개)")
+    parser.add_argument("--app", action="store_true", help="거래처 입력마다 app.py를 AppTest로 다시 실행 (계산대마다 프로세스 하나)")
+    parser.add_argument("--app-timeout", type=float, default=120, help="--app 화면 실행 한 번의 제한 시간(초)")
+    parser.add_argument("--line-items", type=int, default=100000, help="합성 거래 품목 행 수")
+    parser.add_argument("--customers", type=int, help="합성 거래처 수 (기본: 품목 행 수에 비례)")
+    parser.add_argument("--items", type=int, help="합성 품목 수 (기본: 품목 행 수에 비례)")
+    parser.add_argument("--data-dir", help="합성 데이터 대신 복사해서 쓸 데이터 폴더")
+    parser.add_argument("--work-dir", help="작업 폴더 (기본: 임시 폴더, 끝나면 삭제)")
+    parser.add_argument("--hot-customers", type=int, default=0, help="이 수만큼의 거래처에 손님을 몰아서 경합을 늘림")
+    parser.add_argument("--new-customer-rate", type=float, default=0.05, help="처음 오는 거래처 비율")
+    parser.add_argument("--redeem-rate", type=float, default=0.2, help="포인트를 사용하는 손님 비율")
+    parser.add_argument("--ecount-rate", type=float, default=0.5, help="이카운트로 전송하는 거래 비율 (0이면 모의 서버 없음)")
+    parser.add_argument("--searches", type=int, default=2, help="손님마다 품목 검색 횟수")
+    parser.add_argument("--max-lines", type=int, default=5, help="장바구니 최대 품목 줄 수")
+    parser.add_argument("--think", type=float, default=0.0, help="손님 사이 평균 대기 시간(초)")
+    parser.add_argument("--latency", type=float, default=0.05, help="모의 서버 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="loadtest.json")
+    args = parser.parse_args()
+
+    options = {
+        "cashiers": args.cashiers, "checkouts": args.checkouts, "processes": args.processes,
+        "app": args.app, "app_timeout": args.app_timeout, "hot_customers": args.hot_customers,
+        "new_customer_rate": args.new_customer_rate, "redeem_rate": args.redeem_rate,
+        "ecount_rate": args.ecount_rate, "searches": args.searches, "max_lines": args.max_lines,
+        "think": args.think, "seed": args.seed,
+    }
+    output = os.path.abspath(args.output)
+    work_dir = os.path.abspath(args.work_dir) if args.work_dir else tempfile.mkdtemp(prefix="codai-loadtest-")
+    os.makedirs(work_dir, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(work_dir)  # 데이터 파일 경로는 작업 폴더 기준
+    server = mock = None
+    try:
+        prepare(work_dir, args.data_dir and os.path.join(cwd, args.data_dir), args.line_items, args.customers,
+                args.items, args.seed)
+        if args.ecount_rate > 0:
+            mock = ecount_mock.MockEcount(
+                products=ecount_mock.load_products(storage.ITEMS_FILE),
+                latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed,
+            )
+            server, base_url = ecount_mock.serve(mock)
+        result, checks, passed = run(options, base_url if server else None, mock)
+    finally:
+        if server is not None:
+            server.shutdown()
+        os.chdir(cwd)
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "data": args.data_dir or f"datagen --line-items {args.line_items} --seed {args.seed}",
+            "format": storage.DATA_FORMAT,
+            **{key: value for key, value in options.items() if key != "app_timeout"},
+            "latency_s": args.latency, "jitter_s": args.jitter, "error_rate": args.error_rate,
+        },
+        "result": result,
+        "integrity": checks,
+        "passed": passed,
+    }
+    for step, stat in result["steps"].items():
+        errors = sum(stat["errors"].values())
+        print(
+            f"{step:12} {stat['count']:6,}회  p50 {stat['p50_s'] * 1000:8.1f} ms  p95 {(stat['p95_s'] or 0) * 1000:8.1f} ms"
+            f"  p99 {(stat['p99_s'] or 0) * 1000:8.1f} ms" + (f"  오류 {errors:,}회" if errors else ""),
+            file=sys.stderr
+        )
+    print(
+        f"계산대 {args.cashiers}대(프로세스 {result['processes']}개), 거래 {result['registered']:,}건 "
+        f"{result['elapsed_s']:.2f}초, {result['registered_per_s'] or 0:.1f}건/초",
+        file=sys.stderr
+    )
+    for name, check in checks.items():
+        print(f"무결성 {name}: {'통과' if check['ok'] else '실패'}", file=sys.stderr)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {output}", file=sys.stderr)
+    if not passed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""주요 처리 구간 벤치마크
+
+    python -m benchmarks.run --sizes 10000,100000 --output bench_results.json
+
+크기(거래 품목 행 수)별로 합성 데이터를 만든 뒤 각 구간의 실행 시간을 측정하여 JSON으로 저장한다.
+버전 간 비교는 python -m benchmarks.compare 이전.json 이후.json
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import accrual
+import duplicates
+import expiry
+import history
+import serializers
+import service
+import storage
+from benchmarks import datagen
+
+LOOKUPS = 100  # 검색 구간에서 한 번 측정할 때 수행하는 검색 횟수
+
+
+def measure(func, repeat, ops=1):
+    """func를 repeat번 실행한 시간 통계 (초)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        "repeat": repeat,
+        "ops": ops,
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "mean_s": statistics.mean(timings),
+        "max_s": max(timings),
+    }
+
+
+def bench_size(line_items, repeat, work_dir, seed=0):
+    """한 크기의 데이터에 대해 모든 구간을 측정 (데이터 파일은 storage.DATA_FORMAT 형식)"""
+    counts = datagen.generate(work_dir, line_items, seed=seed)
+    counts["format"] = storage.DATA_FORMAT
+    results = []
+
+    def record(name, stats):
+        results.append({"benchmark": name, **counts, **stats})
+        print(f"  {name:<24} median {stats['median_s'] * 1000:10.2f} ms", file=sys.stderr)
+
+    # 지연 import 시간이 첫 측정에 섞이지 않도록 미리 불러온다
+    importlib.import_module("pandas")
+
+    cwd = os.getcwd()
+    os.chdir(work_dir)  # storage의 데이터 파일 경로는 현재 디렉터리 기준
+    try:
+        # 생성기는 일반 JSON으로 만들므로 측정 전에 지정 형식으로 한 번 다시 저장한다
+        storage.save_data(*storage.load_or_create_data())
+        counts["data_bytes"] = sum(
+            os.path.getsize(path) for path in (storage.CUSTOMERS_FILE, storage.TRANSACTIONS_FILE, storage.ITEMS_FILE)
+        )
+        print(f"  데이터 파일 {counts['data_bytes'] / 1e6:.1f} MB ({storage.DATA_FORMAT})", file=sys.stderr)
+
+        data = {}
+
+        def load():
+            data['customers'], data['transactions'], data['items'], data['api_config'] = storage.load_or_create_data()
+
+        record("load_or_create_data", measure(load, repeat))
+        customers, transactions, items = data['customers'], data['transactions'], data['items']
+
+        record("save_data", measure(
+            lambda: storage.save_data(customers, transactions, items, data['api_config']), repeat
+        ))
+
+        names = [info["name"] for info in list(customers.values())[:LOOKUPS]]
+        record("find_customer_by_name", measure(
+            lambda: [service.find_customer_by_name(customers, name) for name in names], repeat, ops=len(names)
+        ))
+
+        codes = list(items)[:LOOKUPS // 2]
+        terms = codes + [items[code]["name"].split()[-1] for code in codes]
+        record("find_item", measure(
+            lambda: [service.find_item(items, term) for term in terms], repeat, ops=len(terms)
+        ))
+        item_catalog = storage.load_item_catalog()  # save_data에서 만든 카탈로그 (mmap)
+        record("catalog_find_item", measure(
+            lambda: [item_catalog.find(term) for term in terms], repeat, ops=len(terms)
+        ))
+
+        record("build_transactions_df", measure(
+            lambda: history.build_transactions_df(transactions), repeat
+        ))
+
+        # 거래 내역 조회 화면: 날짜순 색인 생성 → 기간 조회 후 해당 범위만 표로 변환
+        record("transaction_index_build", measure(
+            lambda: history.TransactionIndex(transactions), repeat
+        ))
+        index = history.TransactionIndex(transactions)
+        _, last = index.bounds()
+
+        def range_query():
+            positions = index.range(last, last)  # 가장 최근 하루
+            history.build_transactions_df([transactions[position] for position in positions])
+
+        record("index_range_query", measure(range_query, repeat))
+
+        # 적립 규칙 모의 계산: 전체 거래를 한 번 펼친 뒤 규칙별로 계산
+        record("accrual_flatten", measure(lambda: accrual.flatten_lines(transactions, customers), repeat))
+        lines = accrual.flatten_lines(transactions, customers)
+        what_if = accrual.compile_rules({
+            "base_rate": 0.01,
+            "categories": {category: 0.02 for category in datagen.CATEGORIES[:3]},
+            "promotions": [{"start": "2024-07-01", "end": "2024-08-31", "multiplier": 2,
+                            "categories": datagen.CATEGORIES[:1]}],
+            "max_points": 5000,
+        })
+        record("accrual_evaluate", measure(lambda: what_if.evaluate(lines, items), repeat))
+
+        # 포인트 소멸 일괄 처리 (합성 거래는 2024년 한 해이므로 기준일을 2025년 중반으로 잡아 절반가량이 소멸 대상)
+        record("expire_points", measure(
+            lambda: expiry.run_expiry(customers, "2025-06-30", apply=False), repeat,
+            ops=sum(len(info.get("lots", ())) for info in customers.values())
+        ))
+
+        # 중복 거래처 찾기 (블록 단위 비교)
+        record("find_duplicates", measure(
+            lambda: duplicates.find_duplicates(customers, transactions), repeat, ops=len(customers)
+        ))
+
+        # 거래 내역 조회 화면의 삭제 흐름: 위치 검색 → 삭제/포인트 차감 → 저장
+        def delete_middle():
+            target = transactions[len(transactions) // 2]
+            idx = service.find_transaction_index(transactions, target["date"], target["customer_name"])
+            service.delete_transaction(customers, transactions, idx)
+            storage.save_customers(customers)
+            storage.save_transactions(transactions)
+
+        record("delete_transaction", measure(delete_middle, repeat))
+    finally:
+        os.chdir(cwd)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="코다이포인트 벤치마크")
+    parser.add_argument("--sizes", default="10000,100000",
+                        help="쉼표로 구분한 거래 품목 행 수 (예: 10000,100000,1000000,10000000)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--label", help="결과에 기록할 버전 이름 (기본: git 커밋)")
+    parser.add_argument("--work-dir", help="합성 데이터를 만들 디렉터리 (기본: 임시 디렉터리, 측정 후 삭제)")
+    parser.add_argument("--format", default=storage.DATA_FORMAT,
+                        help="데이터 파일 저장 형식 (예: json, orjson, msgpack, msgpack+gzip)")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+    storage.DATA_FORMAT = serializers.normalize_format(args.format)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    revision = git_revision()
+    report = {
+        "meta": {
+            "label": args.label or revision,
+            "git_revision": revision,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "format": storage.DATA_FORMAT,
+        },
+        "results": [],
+    }
+
+    for size in sizes:
+        print(f"[{size:,} 품목 행]", file=sys.stderr)
+        work_dir = os.path.join(args.work_dir, str(size)) if args.work_dir else tempfile.mkdtemp(prefix="codai-bench-")
+        try:
+            report["results"].extend(bench_size(size, args.repeat, work_dir, args.seed))
+        finally:
+            if not args.work_dir:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""품목 카탈로그 파일 (메모리 매핑, 여러 프로세스/세션이 공유하는 읽기 전용 품목 정보)
+
+    catalog.publish("items.catalog", items, source_version)   # 새 버전 작성 후 원자적으로 교체
+    items = catalog.shared("items.catalog")                    # 프로세스 내 공유, 파일이 바뀌면 다시 엶
+    items["P000001"]["name"], "P000001" in items, items.find("커피")
+
+품목 정보를 dict로 세션마다 들고 있지 않고, 품목코드순으로 정렬한 파일을 mmap으로 열어
+운영체제 페이지 캐시 하나를 모든 Streamlit/API 프로세스가 함께 쓴다.
+품목코드 조회는 오프셋 표 이진 탐색, 품목명 검색은 소문자 품목명 영역을 mmap.find로 훑는다.
+
+파일 구성 (이 기계의 바이트 순서. 품목 파일에서 언제든 다시 만들 수 있으므로 다른 기계로 옮기지 않는다)
+- 머리말: MAGIC, 파일 형식 버전, 품목 수, 원본 품목 파일 버전(수정 시각, 크기)
+- 품목코드 / 품목명 / 분류 / 검색용 소문자 품목명: 영역마다 uint32 오프셋 표(품목 수 + 1) 뒤에 UTF-8 내용
+  (검색용 영역은 검색어가 두 품목에 걸쳐 일치하지 않도록 품목 사이에 NUL을 넣음)
+오프셋 표는 mmap 위의 memoryview로 바로 읽으므로 열 때 품목 정보를 복사하지 않는다.
+"""
+import bisect
+import mmap
+import os
+import struct
+import threading
+from array import array
+from itertools import accumulate
+
+import metrics
+
+MAGIC = b"CDCT"
+FILE_VERSION = 1
+_HEADER = struct.Struct("=4sBxxxIqq")  # MAGIC, 파일 형식 버전, 품목 수, 원본 수정 시각(ns), 원본 크기
+_SECTIONS = ('codes', 'names', 'categories', 'search')
+_OFFSET_LIMIT = 1 << 32
+_OFFSET_SIZE = array('I').itemsize
+
+
+class CatalogError(ValueError):
+    """카탈로그 파일 형식이 아니거나 잘림"""
+
+
+def _section(values):
+    content = b"".join(values)
+    if len(content) >= _OFFSET_LIMIT:
+        raise CatalogError("카탈로그 영역이 4 GB를 넘습니다")
+    offsets = array('I', accumulate((len(value) for value in values), initial=0))
+    return offsets.tobytes() + content
+
+
+def build(items, source_version=None):
+    """품목 dict({품목코드: {"name", "category"}})를 카탈로그 파일 내용(bytes)으로 변환"""
+    codes = sorted(items)  # UTF-8 바이트 순서는 문자열 순서와 같으므로 파일에서 바이트로 이진 탐색
+    names = [str(items[code].get('name', '')) for code in codes]
+    sections = [
+        [code.encode('utf-8') for code in codes],
+        [name.encode('utf-8') for name in names],
+        [str(items[code].get('category') or '').encode('utf-8') for code in codes],
+        [name.lower().encode('utf-8') + b"\0" for name in names],
+    ]
+    mtime_ns, size = source_version or (0, -1)
+    return _HEADER.pack(MAGIC, FILE_VERSION, len(codes), mtime_ns, size) + b"".join(
+        _section(values) for values in sections
+    )
+
+
+@metrics.timed("catalog.publish")
+def publish(path, items, source_version=None):
+    """새 카탈로그를 임시 파일에 쓴 뒤 교체. 이미 열려 있는 이전 버전은 닫힐 때까지 그대로 읽을 수 있다"""
+    tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(build(items, source_version))
+    os.replace(tmp_path, path)
+
+
+class _Codes:
+    """이진 탐색용 품목코드 목록 (해당 위치의 코드만 읽음)"""
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+
+    def __len__(self):
+        return len(self._catalog)
+
+    def __getitem__(self, index):
+        return self._catalog._raw('codes', index)
+
+
+class Catalog:
+    """읽기 전용 품목 정보 (dict처럼 in, [], get, 품목코드순 반복 지원)"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.file_version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+        if len(self._map) < _HEADER.size:
+            raise CatalogError("카탈로그 파일 머리말이 잘렸습니다")
+        magic, version, count, mtime_ns, size = _HEADER.unpack_from(self._map)
+        if magic != MAGIC or version > FILE_VERSION:
+            raise CatalogError("품목 카탈로그 파일 형식이 아닙니다")
+        self.source_version = (mtime_ns, size) if size >= 0 else None
+        self._count = count
+        self._offsets = {}  # 영역 이름 -> (오프셋 표(mmap 위의 memoryview), 내용 시작 위치)
+        view = memoryview(self._map)
+        position = _HEADER.size
+        for name in _SECTIONS:
+            start = position + _OFFSET_SIZE * (count + 1)
+            if start > len(self._map):
+                raise CatalogError("카탈로그 파일이 잘렸습니다")
+            offsets = view[position:start].cast('I')
+            self._offsets[name] = (offsets, start)
+            position = start + offsets[-1]
+        if position > len(self._map):
+            raise CatalogError("카탈로그 파일이 잘렸습니다")
+        self._labels = {}
+
+    def __len__(self):
+        return self._count
+
+    def _raw(self, section, index):
+        offsets, start = self._offsets[section]
+        return self._map[start + offsets[index]:start + offsets[index + 1]]
+
+    def _text(self, section, index):
+        return self._raw(section, index).decode('utf-8')
+
+    def index(self, code):
+        """품목코드의 위치, 없으면 -1"""
+        key = code.encode('utf-8')
+        index = bisect.bisect_left(_Codes(self), key)
+        return index if index < self._count and self._raw('codes', index) == key else -1
+
+    def _info(self, index):
+        info = {"name": self._text('names', index)}
+        category = self._text('categories', index)
+        if category:
+            info["category"] = category
+        return info
+
+    def __contains__(self, code):
+        return isinstance(code, str) and self.index(code) >= 0
+
+    def __getitem__(self, code):
+        index = self.index(code) if isinstance(code, str) else -1
+        if index < 0:
+            raise KeyError(code)
+        return self._info(index)
+
+    def get(self, code, default=None):
+        index = self.index(code) if isinstance(code, str) else -1
+        return self._info(index) if index >= 0 else default
+
+    def __iter__(self):
+        return (self._text('codes', index) for index in range(self._count))
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        return ((self._text('codes', index), self._info(index)) for index in range(self._count))
+
+    def labels(self, sep):
+        """"품목코드{sep}품목명" 목록 (품목코드순). 같은 카탈로그를 쓰는 세션끼리 공유"""
+        if sep not in self._labels:
+            self._labels[sep] = [
+                f"{self._text('codes', index)}{sep}{self._text('names', index)}" for index in range(self._count)
+            ]
+        return self._labels[sep]
+
+    @metrics.timed("search.item")
+    def find(self, search_term):
+        """service.find_item과 같은 결과: 품목코드 일치 또는 품목명에 검색어가 포함된 (품목코드, 품목 정보) 목록"""
+        matches = []
+        exact = self.index(search_term)
+        if exact >= 0:
+            matches.append((search_term, self._info(exact)))
+
+        term = search_term.lower().encode('utf-8')
+        if not term or b"\0" in term:
+            indexes = range(self._count) if not term else ()
+        else:
+            offsets, start = self._offsets['search']
+            end = start + offsets[-1]
+            indexes = []
+            position = self._map.find(term, start, end)
+            while position >= 0:
+                index = bisect.bisect_right(offsets, position - start) - 1
+                indexes.append(index)
+                position = self._map.find(term, start + offsets[index + 1], end)  # 다음 품목부터
+        matches.extend((self._text('codes', index), self._info(index)) for index in indexes if index != exact)
+        return matches
+
+
+_shared = {}  # 경로 -> 열려 있는 Catalog (프로세스 내 모든 세션이 공유)
+_shared_lock = threading.Lock()
+
+
+def shared(path):
+    """프로세스에서 공유하는 카탈로그. 파일이 교체되었으면 새 파일을 열고, 없으면 None"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    catalog = _shared.get(path)
+    if catalog is not None and catalog.file_version == version:
+        return catalog
+    with _shared_lock:
+        catalog = _shared.get(path)
+        if catalog is None or catalog.file_version != version:
+            # 이전 카탈로그는 쓰는 곳이 없어지면 매핑이 닫힘
+            catalog = _shared[path] = Catalog(path)
+    return catalog
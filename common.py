@@ -0,0 +1,257 @@
+import os
+from collections import deque
+
+import streamlit as st
+
+import backup
+import customer_ids
+import metrics
+import service
+import storage
+import stores
+from history import TransactionIndex
+
+APP_TITLE = "코다이포인트 (CodaiPoint) v1.0"
+
+METRICS_PANEL_ENV = 'CODAIPOINT_METRICS_PANEL'  # 1이면 사이드바에 실행 시간 패널 표시
+RUN_HISTORY = 50  # 세션별로 보관하는 최근 페이지 실행 기록 수
+# 매장을 바꾸면 지우는 세션 값 (이카운트 로그인 등 매장별 상태)
+STORE_SESSION_KEYS = ('api_session_id', 'test_session_id', 'zone', 'show_api_settings', 'reconcile_report')
+
+backup.start_from_env()  # CODAIPOINT_BACKUP_DIR 지정 시 저장 후 백그라운드 백업
+
+
+def setup_page(label):
+    """모든 페이지 공통 설정 (각 페이지의 첫 Streamlit 호출이어야 함)
+
+    페이지 끝에서 finish_page()를 호출하면 이번 실행의 구간별 시간이 기록된다.
+    """
+    st.set_page_config(
+        page_title="코다이포인트 v1.0",
+        page_icon="💰",
+        layout="wide"
+    )
+
+    # 직전 실행이 st.rerun()/st.stop()으로 끝나 finish_page()를 거치지 않은 경우 구간 기록만 보관
+    pending = st.session_state.get('metrics_run')
+    if pending is not None and pending["total"] is None:
+        _keep_run(pending)
+    st.session_state.metrics_run = metrics.start_run(label)
+
+    select_store()
+    st.title(APP_TITLE)
+
+
+def select_store():
+    """사이드바 매장 선택 (매장을 등록한 경우에만 표시). 이번 실행의 매장별 데이터는 선택한 매장의 파일을 쓴다"""
+    registered = storage.load_stores()
+    code = st.session_state.get('store', storage.DEFAULT_STORE)
+    if code not in registered:
+        code = storage.DEFAULT_STORE  # 매장 목록에서 빠진 매장
+    st.session_state.store = code
+    if registered:
+        # 위젯 값은 페이지마다 따로이므로 고른 매장은 'store'에 두고 매 실행 위젯에 다시 넣는다
+        st.session_state.store_select = code
+        st.sidebar.selectbox(
+            "매장", storage.store_codes(), key='store_select', on_change=_change_store,
+            format_func=lambda x: stores.store_label(registered, x)
+        )
+    storage.set_store(code)
+
+
+def _change_store():
+    st.session_state.store = st.session_state.store_select
+    for key in STORE_SESSION_KEYS:
+        st.session_state.pop(key, None)
+
+
+def finish_page():
+    """페이지 실행 시간 기록 및 (설정된 경우) 사이드바 실행 시간 패널 표시"""
+    run = st.session_state.get('metrics_run')
+    if run is None or run["total"] is not None:
+        return
+    metrics.finish_run(run)
+    _keep_run(run)
+    if metrics_panel_enabled():
+        render_run_panel(run)
+
+
+def _keep_run(run):
+    if 'metrics_runs' not in st.session_state:
+        st.session_state.metrics_runs = deque(maxlen=RUN_HISTORY)
+    st.session_state.metrics_runs.append(run)
+
+
+def metrics_panel_enabled():
+    return os.environ.get(METRICS_PANEL_ENV) == '1'
+
+
+def render_run_panel(run):
+    """이번 페이지 실행의 구간별 시간 (사이드바)"""
+    with st.sidebar.expander("⏱ 실행 시간", expanded=True):
+        st.caption(f"{run['label']} · 전체 {run['total'] * 1000:,.1f} ms")
+        sections = metrics.summarize_run(run)
+        lines = [f"- `{name}` {count}회 · {total * 1000:,.1f} ms" for name, count, total in sections]
+        # 측정 구간 밖의 시간은 대부분 화면 구성(위젯, 표 전송)에 쓰인 시간
+        other = run['total'] - sum(total for _, _, total in sections)
+        lines.append(f"- 그 외 (화면 구성 등) · {max(other, 0) * 1000:,.1f} ms")
+        st.markdown("\n".join(lines))
+
+
+# 세션 상태 지연 로드 - 각 페이지는 필요한 데이터만 불러온다.
+# 다른 세션이나 API 서버가 파일을 바꾸면 다음 접근 시 다시 읽는다.
+def _data_store():
+    if 'data_store' not in st.session_state:
+        st.session_state.data_store = storage.DataStore()
+    return st.session_state.data_store
+
+
+def get_customers():
+    return _data_store().get('customers')
+
+
+def get_transactions():
+    return _data_store().get('transactions')
+
+
+def get_all_transactions():
+    """모든 매장의 거래 내역 {매장 코드: 거래 목록} (매장 공용인 거래처를 합칠 때)"""
+    by_store = {}
+    for code in storage.store_codes():
+        with storage.using_store(code):
+            by_store[code] = get_transactions()
+    return by_store
+
+
+def get_items():
+    """수정용 품목 dict (세션마다 따로 읽음). 조회/검색만 할 때는 get_item_catalog()"""
+    return _data_store().get('items')
+
+
+def get_item_catalog():
+    """읽기 전용 품목 카탈로그 (세션 상태에 두지 않고 프로세스 내 모든 세션이 공유)"""
+    return storage.load_item_catalog()
+
+
+def get_api_config():
+    return _data_store().get('api_config')
+
+
+def data_version(name):
+    """마지막으로 읽거나 저장한 데이터 파일의 버전 (계산 결과 캐시 판단용)"""
+    return _data_store().version(name)
+
+
+def get_transaction_index():
+    """거래일자 순 거래 색인 (거래 데이터가 바뀐 경우에만 새로 만든다)"""
+    transactions = get_transactions()
+    version = _data_store().version('transactions')
+    indexes = st.session_state.setdefault('transaction_indexes', {})  # 매장 코드 -> (버전, 거래 목록, 색인)
+    cached = indexes.get(storage.current_store())
+    if cached is None or cached[0] != version or cached[1] is not transactions:
+        cached = indexes[storage.current_store()] = (version, transactions, TransactionIndex(transactions))
+    return cached[2]
+
+
+def get_id_variants():
+    """표준 표기가 같은 거래처 번호 묶음 (거래처 데이터가 바뀔 때만 다시 계산)"""
+    customers = get_customers()
+    version = _data_store().version('customers')
+    cached = st.session_state.get('id_variants')
+    if cached is None or cached[0] != version or cached[1] is not customers:
+        cached = st.session_state.id_variants = (version, customers, customer_ids.variant_groups(customers))
+    return cached[2]
+
+
+def get_point_rules_config():
+    """포인트 적립 규칙 파일 내용 (변환 전)"""
+    return _data_store().get('point_rules')
+
+
+def get_point_rules():
+    """검사/변환을 마친 포인트 적립 규칙 (규칙 파일이 바뀔 때만 다시 변환)"""
+    import accrual  # numpy를 쓰므로 필요한 화면에서만 로드
+
+    rules = _data_store().get('point_rules')
+    version = _data_store().version('point_rules')
+    cached = st.session_state.get('point_rules')
+    if cached is None or cached[0] != version:
+        try:
+            compiled = accrual.compile_rules(rules)
+        except accrual.RuleError as e:
+            st.error(f"적립 규칙 파일({storage.POINT_RULES_FILE}) 오류로 기본 규칙(총액의 1%)을 사용합니다: {e}")
+            compiled = accrual.compile_rules()
+        cached = st.session_state.point_rules = (version, compiled)
+    return cached[1]
+
+
+def register_basket_transaction(id_number, customer_name, date, lines, slip_no=None):
+    """장바구니(compute_basket 결과)를 이 세션의 데이터로 거래 등록 (부하 시험도 같은 basket.register_basket 사용)"""
+    from basket import register_basket as register  # pandas를 쓰므로 거래 등록 화면에서만 로드
+
+    return register(
+        _data_store(), id_number, customer_name, date, lines,
+        rules=get_point_rules(), items=get_item_catalog(), slip_no=slip_no, resolve=resolve_customer_id
+    )
+
+
+def save_customers():
+    _data_store().save('customers')
+
+
+def save_transactions(transactions=None):
+    _data_store().save('transactions', transactions)
+
+
+def save_all_transactions():
+    for code in storage.store_codes():
+        with storage.using_store(code):
+            save_transactions()
+
+
+def save_items(items=None):
+    _data_store().save('items', items)
+
+
+def save_point_rules(rules=None):
+    _data_store().save('point_rules', rules)
+
+
+def save_api_config(api_config=None):
+    _data_store().save('api_config', api_config)
+
+
+def is_api_connected():
+    return st.session_state.get('api_session_id') is not None or st.session_state.get('test_session_id') is not None
+
+
+# 고객 정보 검색
+def resolve_customer_id(id_number):
+    """입력한 번호의 거래처 키 (표기가 달라도 표준 표기가 같으면 같은 거래처)"""
+    return service.resolve_customer_id(get_customers(), id_number, get_id_variants())
+
+
+def find_customer(id_number):
+    """번호로 거래처 찾기 (표기가 달라도 표준 표기가 같으면 같은 거래처)"""
+    customers = get_customers()
+    id_number = resolve_customer_id(id_number)
+    customer = customers.get(id_number, {})
+    if isinstance(customer, int):  # 이전 형식의 데이터인 경우
+        customer = {
+            "name": "Unknown",
+            "points": customer
+        }
+        customers[id_number] = customer
+    return customer
+
+
+# 품목 정보 검색
+def find_item(search_term):
+    """품목코드나 품목명으로 품목을 검색하는 함수"""
+    return get_item_catalog().find(search_term)
+
+
+# 거래처명으로 사업자번호 찾기
+def find_customer_by_name(name):
+    """거래처명으로 사업자번호 목록을 찾는 함수"""
+    return service.find_customer_by_name(get_customers(), name)
@@ -0,0 +1,92 @@
+"""사업자번호/핸드폰번호 표기 통일
+
+"01012345678", "010 1234 5678", "+82-10-1234-5678"은 모두 "010-1234-5678",
+"1234567890"은 "123-45-67890" 으로 바꾼다. 거래처 데이터는 이 표준 표기를 키로 쓴다.
+
+    python -m customer_ids --dry-run   # 표기만 다른 거래처 확인
+    python -m customer_ids             # 표준 표기로 합치고 거래 내역의 번호도 바꿈
+"""
+import argparse
+import re
+import sys
+
+_NON_DIGITS = re.compile(r"\D")
+_ALLOWED = re.compile(r"^[\d\s\-().+]+$")  # 번호로 볼 수 있는 입력 (숫자, 공백, -, ., 괄호, +)
+_MOBILE = re.compile(r"^01[016789]\d{7,8}$")
+_BUSINESS = re.compile(r"^[1-9]\d{9}$")  # 사업자등록번호 앞 세 자리(세무서 코드)는 0으로 시작하지 않음
+_PHONE = re.compile(r"^(02\d{7,8}|0[3-9]\d{8,9})$")
+
+KIND_MOBILE = "mobile"
+KIND_PHONE = "phone"
+KIND_BUSINESS = "business"
+KIND_OTHER = "other"
+
+
+def _digits(raw):
+    digits = _NON_DIGITS.sub("", raw)
+    if raw.lstrip().startswith("+82"):  # 국가번호 표기는 국내 번호로
+        digits = "0" + digits[2:].lstrip("0")
+    return digits
+
+
+def classify(raw):
+    """(종류, 숫자만 남긴 번호). 번호로 볼 수 없는 입력은 (KIND_OTHER, 앞뒤 공백을 뺀 입력)"""
+    raw = str(raw).strip()
+    if not raw or not _ALLOWED.match(raw):
+        return KIND_OTHER, raw
+    digits = _digits(raw)
+    if _MOBILE.match(digits):
+        return KIND_MOBILE, digits
+    if _BUSINESS.match(digits):
+        return KIND_BUSINESS, digits
+    if _PHONE.match(digits):
+        return KIND_PHONE, digits
+    return KIND_OTHER, raw
+
+
+def normalize_customer_id(raw):
+    """거래처 번호의 표준 표기 (휴대폰 010-1234-5678, 전화 02-123-4567, 사업자 123-45-67890)"""
+    kind, digits = classify(raw)  # KIND_OTHER이면 digits는 입력 그대로
+    if kind == KIND_BUSINESS:
+        return f"{digits[:3]}-{digits[3:5]}-{digits[5:]}"
+    if kind == KIND_MOBILE or (kind == KIND_PHONE and not digits.startswith("02")):
+        return f"{digits[:3]}-{digits[3:-4]}-{digits[-4:]}"
+    if kind == KIND_PHONE:
+        return f"{digits[:2]}-{digits[2:-4]}-{digits[-4:]}"
+    return digits
+
+
+def variant_groups(customer_ids):
+    """표준 표기가 같은 거래처 번호 묶음 {표준 표기: [번호, ...]} (표기가 하나뿐이고 이미 표준이면 제외)"""
+    groups = {}
+    for customer_id in customer_ids:
+        groups.setdefault(normalize_customer_id(customer_id), []).append(customer_id)
+    return {key: ids for key, ids in groups.items() if ids != [key]}
+
+
+def main():
+    import service
+    import storage
+
+    parser = argparse.ArgumentParser(description="거래처 번호 표기 통일")
+    parser.add_argument("--dry-run", action="store_true", help="합칠 거래처만 확인하고 저장하지 않음")
+    args = parser.parse_args()
+
+    with storage.locked():
+        customers = storage.load_customers()
+        by_store = storage.load_all_transactions()  # 거래처는 모든 매장이 함께 씀
+        groups = variant_groups(customers)
+        for key, ids in sorted(groups.items()):
+            print(f"{key} <- {', '.join(ids)}", file=sys.stderr)
+        if args.dry_run:
+            return
+        merged, relinked = service.migrate_customer_ids(
+            customers, [transaction for transactions in by_store.values() for transaction in transactions]
+        )
+        storage.save_customers(customers)
+        storage.save_all_transactions(by_store)
+    print(f"거래처 {merged:,}건을 표준 번호로 합치고 거래 {relinked:,}건의 번호를 바꿨습니다.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""중복 거래처 찾기/합치기
+
+    python -m duplicates --report duplicates.csv   # 중복 후보 묶음만 확인
+    python -m duplicates --apply                   # 후보 묶음을 모두 합침
+
+모든 거래처 쌍을 비교하지 않고, 정규화한 거래처명과 번호 일부가 같은 거래처끼리만 묶어(blocking)
+거래처명/번호 유사도를 계산한다. 묶음이 큰 경우(흔한 이름)에는 번호 순으로 정렬해 가까운 거래처끼리만 비교한다.
+"""
+import argparse
+import csv
+import re
+import sys
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+from itertools import combinations
+
+import metrics
+import service
+from customer_ids import classify
+
+DEFAULT_THRESHOLD = 0.85  # 점수(거래처명 유사도 × 번호 유사도)가 이 이상인 거래처 쌍을 중복 후보로 본다
+BLOCK_WINDOW = 8  # 큰 묶음에서 번호 순으로 앞뒤 몇 개까지 비교할지
+TAIL_DIGITS = 4  # 번호 블록 키로 쓰는 끝자리 수
+
+REPORT_COLUMNS = ["group", "customer_id", "name", "points", "transactions", "keep", "score"]
+
+_COMPANY_MARKS = re.compile(r"\(주\)|\(유\)|\(사\)|주식회사|유한회사")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_name(name):
+    """비교용 거래처명 (전각/반각 통일, 소문자, 회사 형태 표기/공백/기호 제거)"""
+    name = unicodedata.normalize("NFKC", str(name)).lower()  # ㈜ -> (주)
+    return _NON_WORD.sub("", _COMPANY_MARKS.sub("", name))
+
+
+def _number_digits(customer_id):
+    _, digits = classify(customer_id)
+    return digits if digits.isdigit() else customer_id
+
+
+def similarity(a, b):
+    """두 문자열의 유사도 (0~1)"""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def number_similarity(a, b):
+    """두 번호의 유사도 (0~1). 길이가 같으면 1 - 다른 자리 수 / 길이 (이웃한 두 자리 뒤바뀜은 한 자리로 침)
+
+    후보 쌍 대부분이 길이가 같은 번호라 SequenceMatcher 없이 자리별로 비교한다.
+    """
+    if len(a) != len(b):
+        return similarity(a, b)
+    diffs = [i for i, (x, y) in enumerate(zip(a, b)) if x != y]
+    edits = len(diffs)
+    if edits == 2 and diffs[1] == diffs[0] + 1 and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]]:
+        edits = 1
+    return 1.0 - edits / len(a) if a else 1.0
+
+
+def _blocks(keys):
+    """블록 키 -> 거래처 위치 목록
+
+    정규화한 거래처명이 같은 거래처(번호 오타), 이름 첫 글자와 번호 길이/끝자리가 같은 거래처(앞자리 오타,
+    이름 표기 차이)끼리 묶는다.
+    """
+    blocks = {}
+    for position, (name, digits) in enumerate(keys):
+        if name:
+            blocks.setdefault(("name", name), []).append(position)
+        if len(digits) > TAIL_DIGITS:
+            blocks.setdefault(("tail", name[:1], len(digits), digits[-TAIL_DIGITS:]), []).append(position)
+    return blocks
+
+
+def _candidate_pairs(blocks, keys):
+    pairs = set()
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        if len(members) <= BLOCK_WINDOW + 1:
+            pairs.update(combinations(sorted(members), 2))
+            continue
+        # 흔한 이름은 번호 순으로 정렬해 앞뒤 BLOCK_WINDOW개와만 비교 (sorted neighbourhood)
+        members = sorted(members, key=lambda position: keys[position][1])
+        for i, position in enumerate(members):
+            for other in members[i + 1:i + 1 + BLOCK_WINDOW]:
+                pairs.add((position, other) if position < other else (other, position))
+    return pairs
+
+
+def _find_root(parents, position):
+    while parents[position] != position:
+        parents[position] = parents[parents[position]]
+        position = parents[position]
+    return position
+
+
+@metrics.timed("customers.duplicates")
+def find_duplicates(customers, transactions=(), threshold=DEFAULT_THRESHOLD):
+    """중복 후보 묶음 목록 [{"keep", "members", "score"}]
+
+    members는 남길 거래처(keep)를 포함한 번호 목록, score는 묶음 안에서 연결된 쌍의 가장 낮은 점수.
+    남길 거래처는 거래가 가장 많은 거래처 (같으면 포인트가 많은 거래처).
+    """
+    customer_ids = list(customers)
+    keys = [
+        (normalize_name(customers[customer_id].get('name', '')), _number_digits(customer_id))
+        for customer_id in customer_ids
+    ]
+
+    parents = list(range(len(customer_ids)))
+    edge_scores = {}
+    for a, b in _candidate_pairs(_blocks(keys), keys):
+        (name_a, digits_a), (name_b, digits_b) = keys[a], keys[b]
+        score = number_similarity(digits_a, digits_b)
+        if score < threshold:  # 두 유사도 모두 1 이하이므로 번호만으로 걸러낼 수 있음
+            continue
+        score *= similarity(name_a, name_b)
+        if score < threshold:
+            continue
+        root_a, root_b = _find_root(parents, a), _find_root(parents, b)
+        if root_a != root_b:
+            parents[root_b] = root_a
+        edge_scores[(a, b)] = score
+
+    groups = {}
+    for position in {position for edge in edge_scores for position in edge}:
+        groups.setdefault(_find_root(parents, position), []).append(position)
+    group_scores = {}
+    for (a, _), score in edge_scores.items():
+        root = _find_root(parents, a)
+        group_scores[root] = min(score, group_scores.get(root, 1.0))
+
+    counts = Counter(transaction.get('customer_id') for transaction in transactions)
+    result = []
+    for root, members in groups.items():
+        members = sorted(
+            (customer_ids[position] for position in members),
+            key=lambda customer_id: (-counts[customer_id], -customers[customer_id].get('points', 0), customer_id)
+        )
+        result.append({"keep": members[0], "members": members, "score": round(group_scores[root], 3)})
+    result.sort(key=lambda group: (-group["score"], group["keep"]))
+    return result
+
+
+def merge_mapping(groups):
+    """중복 묶음 목록을 service.merge_customers에 넘길 {합쳐질 번호: 남길 번호}로"""
+    return {
+        customer_id: group["keep"]
+        for group in groups for customer_id in group["members"] if customer_id != group["keep"]
+    }
+
+
+def merge_groups(customers, transactions, groups):
+    """중복 묶음을 남길 거래처로 합친다. 포인트/묶음을 더하고 거래 내역은 한 번 훑어 번호를 바꾼다
+
+    (합쳐진 거래처 수, 번호가 바뀐 거래 수)를 반환. 저장은 호출하는 쪽에서 한 번에 한다.
+    """
+    mapping = merge_mapping(groups)
+    merged = sum(1 for customer_id in mapping if customer_id in customers)
+    return merged, service.merge_customers(customers, transactions, mapping)
+
+
+def write_report(groups, customers, transactions, path):
+    counts = Counter(transaction.get('customer_id') for transaction in transactions)
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:  # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+        writer = csv.writer(f)
+        writer.writerow(REPORT_COLUMNS)
+        for number, group in enumerate(groups, 1):
+            for customer_id in group["members"]:
+                customer = customers.get(customer_id, {})
+                writer.writerow([
+                    number, customer_id, customer.get('name', ''), customer.get('points', 0),
+                    counts[customer_id], customer_id == group["keep"], group["score"],
+                ])
+
+
+def main():
+    import storage
+
+    parser = argparse.ArgumentParser(description="중복 거래처 찾기/합치기")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="중복 후보 점수 기준 (0~1)")
+    parser.add_argument("--apply", action="store_true", help="찾은 묶음을 모두 합치고 저장")
+    parser.add_argument("--report", help="중복 후보 묶음 CSV 경로")
+    args = parser.parse_args()
+
+    with storage.locked():
+        customers = storage.load_customers()
+        by_store = storage.load_all_transactions()  # 거래처는 모든 매장이 함께 씀
+        transactions = [transaction for store_transactions in by_store.values() for transaction in store_transactions]
+        groups = find_duplicates(customers, transactions, args.threshold)
+        if args.report:
+            write_report(groups, customers, transactions, args.report)
+        members = sum(len(group["members"]) for group in groups)
+        print(f"중복 후보 {len(groups):,}묶음 (거래처 {members:,}곳)", file=sys.stderr)
+        if not args.apply or not groups:
+            return
+        merged, relinked = merge_groups(customers, transactions, groups)
+        storage.save_customers(customers)
+        storage.save_all_transactions(by_store)
+    print(f"거래처 {merged:,}곳을 합치고 거래 {relinked:,}건의 번호를 바꿨습니다.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
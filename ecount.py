@@ -0,0 +1,152 @@
+import os
+
+import streamlit as st
+from datetime import datetime, timedelta
+import requests  # API 호출을 위한 라이브러리
+
+import metrics
+
+# 이카운트 서버 주소 대신 쓸 주소 (예: http://127.0.0.1:8900 - ecount_mock 모의 서버). 없으면 실제 서버
+BASE_URL_ENV = 'CODAIPOINT_ECOUNT_BASE_URL'
+TIMEOUT_ENV = 'CODAIPOINT_ECOUNT_TIMEOUT'  # 요청 제한 시간(초)
+DEFAULT_TIMEOUT = 30
+
+
+def base_url(zone="", is_test=True):
+    """이카운트 API 서버 주소. TestKey 세션은 sboapi, APIKey 세션은 oapi (Zone 조회는 zone 없이 sboapi)"""
+    override = os.environ.get(BASE_URL_ENV)
+    if override:
+        return override.rstrip("/")
+    return f"https://{'sboapi' if is_test else 'oapi'}{zone}.ecount.com"
+
+
+def api_url(path, zone="", is_test=True):
+    """이카운트 API 주소 (path 예: "Sale/SaveSale")"""
+    return f"{base_url(zone, is_test)}/OAPI/V2/{path}"
+
+
+def call_api(endpoint, url, **kwargs):
+    """이카운트 API POST 호출 (응답 시간을 endpoint 이름으로 기록)"""
+    kwargs.setdefault("timeout", float(os.environ.get(TIMEOUT_ENV) or DEFAULT_TIMEOUT))
+    with metrics.timer("http.ecount", endpoint=endpoint):
+        return requests.post(url, headers={"Content-Type": "application/json"}, **kwargs)
+
+
+class LoginError(RuntimeError):
+    """Zone 조회/로그인 실패 (이카운트 오류 메시지 포함)"""
+
+
+# API 엔드포인트 설정
+def request_zone(code):
+    """Zone 조회. 실패하면 LoginError (화면 밖 명령행에서 오류 내용을 출력할 때)"""
+    request_data = {"COM_CODE": code}
+
+    try:
+        response = call_api("Zone", api_url("Zone"), json=request_data)
+        if response.status_code != 200:
+            raise LoginError(f"Zone 정보 조회 실패: HTTP {response.status_code}")
+        response_data = response.json()
+    except (requests.RequestException, ValueError) as e:
+        raise LoginError(f"Zone 정보 조회 중 오류 발생: {str(e)}") from e
+
+    if response_data.get("Error") and response_data["Error"].get("Message"):
+        raise LoginError(f"API 오류: {response_data['Error']['Message']}")
+    zone = (response_data.get("Data") or {}).get("ZONE")
+    if not zone:
+        raise LoginError("Zone 정보를 찾을 수 없습니다.")
+    return zone
+
+
+def request_session_id(code, user_id, api_key, zone, is_test=False):
+    """로그인하여 세션 ID를 반환. 실패하면 LoginError"""
+    # TestKey는 sboapi로, APIKey는 oapi로 연결
+    login_url = api_url("OAPILogin", zone, is_test)
+
+    request_data = {
+        "COM_CODE": code,
+        "USER_ID": user_id,
+        "API_CERT_KEY": api_key,
+        "LAN_TYPE": "ko-KR",
+        "ZONE": zone
+    }
+
+    try:
+        response = call_api("OAPILogin", login_url, json=request_data)
+        response_data = response.json()
+    except (requests.RequestException, ValueError) as e:
+        raise LoginError(f"세션 ID 조회 중 오류 발생: {str(e)}") from e
+
+    # 오류 메시지 처리
+    if response_data.get("Error") and response_data["Error"].get("Message"):
+        raise LoginError(f"API 오류: {response_data['Error']['Message']}")
+
+    if response_data.get("Errors"):
+        error_msg = response_data["Errors"][0].get("Message", "알 수 없는 오류가 발생했습니다.")
+        raise LoginError(f"API 오류: {error_msg}")
+
+    # 데이터 확인
+    if response_data.get("Data"):
+        if response_data["Data"].get("Datas") and response_data["Data"]["Datas"].get("SESSION_ID"):
+            return response_data["Data"]["Datas"]["SESSION_ID"]
+        elif response_data["Data"].get("Message"):
+            raise LoginError(f"API 오류: {response_data['Data']['Message']}")
+
+    raise LoginError("세션 ID를 찾을 수 없습니다.")
+
+
+def get_zone_info(code):
+    """Zone 정보를 가져오는 함수 (실패하면 화면에 오류 표시 후 None)"""
+    try:
+        return request_zone(code)
+    except LoginError as e:
+        st.error(str(e))
+        return None
+
+def get_session_id(code, user_id, api_key, zone, is_test=False):
+    """세션 ID를 가져오는 함수 (실패하면 화면에 오류 표시 후 None)"""
+    try:
+        return request_session_id(code, user_id, api_key, zone, is_test)
+    except LoginError as e:
+        st.error(str(e))
+        return None
+
+def get_products_list(session_id, zone, is_test=True):
+    """품목 목록을 가져오는 함수"""
+    # 마지막 API 호출 시간 확인
+    last_call_time = getattr(st.session_state, 'last_api_call_time', None)
+    if last_call_time and datetime.now() - last_call_time < timedelta(minutes=10):
+        remaining_time = timedelta(minutes=10) - (datetime.now() - last_call_time)
+        st.error(f"API 호출 제한: {remaining_time.seconds // 60}분 {remaining_time.seconds % 60}초 후에 다시 시도해주세요.")
+        return None
+
+    # TestKey로 받은 세션ID는 sboapi로, APIKey로 받은 세션ID는 oapi로 연결
+    products_url = api_url("InventoryBasic/GetBasicProductsList", zone, is_test)
+    st.info(f"연결 URL: {products_url}")  # URL 확인을 위한 로그
+    
+    params = {
+        "SESSION_ID": session_id
+    }
+    
+    request_data = {
+        "PROD_CD": ""
+    }
+    
+    try:
+        response = call_api("GetBasicProductsList", products_url, params=params, json=request_data)
+        
+        if response.status_code == 200:
+            response_data = response.json()
+            if response_data.get("Data") and response_data["Data"].get("Result"):
+                # API 호출 시간 업데이트
+                st.session_state.last_api_call_time = datetime.now()
+                return response_data["Data"]["Result"]
+            else:
+                st.error(f"API 응답 오류: {response_data.get('Error', {}).get('Message', '알 수 없는 오류가 발생했습니다.')}")
+                st.error(f"전체 응답: {response_data}")  # 전체 응답 확인을 위한 로그
+        else:
+            st.error(f"API 요청 실패: {response.status_code}")
+            st.error(f"응답 내용: {response.text}")  # 응답 내용 확인을 위한 로그
+        return None
+    except Exception as e:
+        st.error(f"품목 목록 조회 중 오류 발생: {str(e)}")
+        return None
@@ -0,0 +1,419 @@
+"""이카운트 OAPI 모의 서버 (실제 서버 없이 전송/부하/제한 시간 테스트용)
+
+    python -m ecount_mock --port 8900 --latency 0.05 --jitter 0.1 --error-rate 0.01 --rate-limit 10
+    CODAIPOINT_ECOUNT_BASE_URL=http://127.0.0.1:8900 streamlit run app.py
+
+Zone, OAPILogin, InventoryBasic/GetBasicProductsList, Sale/SaveSale과 대사(reconcile.py)용 판매 조회
+Sale/GetSaleList(기간, 페이지 단위)를 구현한다.
+응답 지연(--latency, --jitter), 오류(--error-rate, HTTP 500), API별 초당 호출 제한(--rate-limit, HTTP 429)을
+넣을 수 있다.
+
+    python -m ecount_mock --record ecount.jsonl --upstream "https://sboapi{zone}.ecount.com"
+    python -m ecount_mock --replay ecount.jsonl --latency 0.2
+
+--record는 요청을 실제 서버로 전달하고 요청/응답을 JSON lines로 기록하며(API_CERT_KEY는 가려서 기록),
+--replay는 기록한 응답을 같은 요청(같은 API, 같은 본문)에 돌려준다. 같은 요청이 없으면 그 API의 기록을 차례로 쓴다.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import cycle
+from urllib.parse import parse_qs, urlsplit
+
+API_PREFIX = "/OAPI/V2/"
+MASKED_FIELDS = ("API_CERT_KEY",)  # 기록 파일에 남기지 않는 요청 값
+DEFAULT_ZONE = "CC"
+MAX_PAGE_SIZE = 1000  # Sale/GetSaleList 한 번에 돌려주는 최대 줄 수
+SALE_FIELDS = ("CUST", "CUST_DES", "WH_CD", "PROD_CD", "PROD_DES", "QTY", "PRICE", "SUPPLY_AMT", "VAT_AMT")
+
+
+def _masked(body):
+    if not isinstance(body, dict):
+        return body
+    return {key: ("***" if key in MASKED_FIELDS else value) for key, value in body.items()}
+
+
+def _request_key(endpoint, body):
+    return endpoint, json.dumps(_masked(body), ensure_ascii=False, sort_keys=True)
+
+
+def _error(message, code=999):
+    return {"Data": None, "Status": "500", "Error": {"Code": code, "Message": message}}
+
+
+def _ok(data):
+    return {"Data": data, "Status": "200", "Error": None, "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+
+
+class MockEcount:
+    """모의 서버 상태와 응답 (HTTP 처리와 분리되어 있어 직접 호출해도 된다)
+
+    handle(endpoint, query, body)는 (HTTP 상태 코드, 응답 JSON)을 반환한다.
+    endpoint는 "/OAPI/V2/" 뒤의 경로 (예: "Sale/SaveSale").
+    """
+
+    def __init__(self, products=None, zone=DEFAULT_ZONE, latency=0.0, jitter=0.0, error_rate=0.0,
+                 rate_limit=0, seed=None, record=None, upstream=None, replay=None):
+        self.products = list(products or [])
+        self.product_codes = {product["PROD_CD"] for product in self.products}
+        self.zone = zone
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit  # API별 초당 최대 호출 수 (0이면 제한 없음)
+        self.random = random.Random(seed)
+        self.sessions = set()
+        self.sales = []  # 저장된 판매 전표 [{"slip_no", "io_date", "lines"}]
+        self.counts = {}  # (endpoint, 결과) -> 횟수
+        self.lock = threading.Lock()
+        self._calls = {}  # endpoint -> 최근 1초 안의 호출 시각
+        self._slip_seq = {}  # 일자 -> 마지막 전표 번호
+        self._sale_rows = None  # 조회용 전표 줄 목록 (_rows)
+
+        self.upstream = upstream
+        self._record_file = open(record, "a", encoding="utf-8") if record else None
+        self._replay = None
+        if replay:
+            self._load_replay(replay)
+
+    def close(self):
+        if self._record_file:
+            self._record_file.close()
+            self._record_file = None
+
+    def stats(self):
+        """API별 결과 횟수 {endpoint: {결과: 횟수}} 와 저장된 전표 수"""
+        with self.lock:
+            by_endpoint = {}
+            for (endpoint, outcome), count in self.counts.items():
+                by_endpoint.setdefault(endpoint, {})[outcome] = count
+            return {"requests": by_endpoint, "sales": len(self.sales)}
+
+    def _count(self, endpoint, outcome):
+        with self.lock:
+            self.counts[endpoint, outcome] = self.counts.get((endpoint, outcome), 0) + 1
+
+    # 요청 처리
+    def handle(self, endpoint, query, body):
+        if self._record_file is not None:
+            status, payload = self._forward(endpoint, query, body)
+            self._count(endpoint, str(status))
+            return status, payload
+
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        if self._rate_limited(endpoint):
+            self._count(endpoint, "rate_limited")
+            return 429, _error("API 호출 허용 횟수를 초과했습니다. 잠시 후 다시 시도해주세요.", code=429)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self._count(endpoint, "error")
+            return 500, _error("모의 서버 오류")
+
+        if self._replay is not None:
+            status, payload = self._replayed(endpoint, body)
+        else:
+            handler = self.HANDLERS.get(endpoint)
+            if handler is None:
+                status, payload = 404, _error(f"지원하지 않는 API: {endpoint}", code=404)
+            else:
+                status, payload = handler(self, query, body or {})
+        self._count(endpoint, "ok" if status == 200 and not payload.get("Error") else "failed")
+        return status, payload
+
+    def _rate_limited(self, endpoint):
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            calls = self._calls.setdefault(endpoint, deque())
+            while calls and now - calls[0] >= 1.0:
+                calls.popleft()
+            if len(calls) >= self.rate_limit:
+                return True
+            calls.append(now)
+            return False
+
+    def _session_error(self, query):
+        session_id = (query.get("SESSION_ID") or [""])[0]
+        with self.lock:
+            valid = session_id in self.sessions
+        if not valid:
+            return 200, _error("세션이 만료되었거나 올바르지 않습니다. 다시 로그인해주세요.", code=20)
+        return None
+
+    def zone_info(self, query, body):
+        if not body.get("COM_CODE"):
+            return 200, _error("회사코드(COM_CODE)를 입력해주세요.", code=1)
+        return 200, _ok({"EXPIRE_DATE": "", "ZONE": self.zone, "DOMAIN": ".ecount.com"})
+
+    def login(self, query, body):
+        if not (body.get("COM_CODE") and body.get("USER_ID") and body.get("API_CERT_KEY")):
+            return 200, _ok({"Code": "20", "Datas": None, "Message": "인증키 또는 사용자 정보가 올바르지 않습니다."})
+        session_id = uuid.uuid4().hex
+        with self.lock:
+            self.sessions.add(session_id)
+        return 200, _ok({
+            "Code": "00",
+            "Datas": {"COM_CODE": body["COM_CODE"], "USER_ID": body["USER_ID"], "SESSION_ID": session_id},
+            "Message": "",
+        })
+
+    def products_list(self, query, body):
+        error = self._session_error(query)
+        if error:
+            return error
+        code = body.get("PROD_CD") or ""
+        result = [product for product in self.products if not code or product.get("PROD_CD") == code]
+        return 200, _ok({"Result": result, "TotalCnt": len(result)})
+
+    def save_sale(self, query, body):
+        error = self._session_error(query)
+        if error:
+            return error
+        sale_list = body.get("SaleList") or []
+        details = []
+        for line_no, sale in enumerate(sale_list):
+            data = sale.get("BulkDatas") or {}
+            errors = []
+            if not data.get("PROD_CD"):
+                errors.append({"ColCd": "PROD_CD", "Message": "품목코드는 필수입니다."})
+            elif self.product_codes and data["PROD_CD"] not in self.product_codes:
+                errors.append({"ColCd": "PROD_CD", "Message": f"등록되지 않은 품목코드입니다: {data['PROD_CD']}"})
+            if not data.get("QTY"):
+                errors.append({"ColCd": "QTY", "Message": "수량은 필수입니다."})
+            details.append({
+                "Line": str(line_no), "IsSuccess": not errors, "TotalError": "; ".join(e["Message"] for e in errors),
+                "Errors": errors, "Code": None,
+            })
+        failed = sum(1 for detail in details if not detail["IsSuccess"])
+        if not sale_list:
+            return 200, _error("SaleList가 비어 있습니다.", code=1)
+        if failed:  # 한 줄이라도 실패하면 전표를 저장하지 않는다
+            return 200, _ok({"SuccessCnt": 0, "FailCnt": failed, "ResultDetails": details, "SlipNos": []})
+
+        # 같은 UPLOAD_SER_NO(와 일자)의 줄을 한 전표로 저장
+        slips = {}
+        for sale in sale_list:
+            data = sale["BulkDatas"]
+            io_date = data.get("IO_DATE") or datetime.now().strftime("%Y%m%d")
+            slips.setdefault((io_date, data.get("UPLOAD_SER_NO", "")), []).append(data)
+        slip_nos = [self.add_sale(io_date, lines) for (io_date, _), lines in slips.items()]
+        return 200, _ok({"SuccessCnt": len(sale_list), "FailCnt": 0, "ResultDetails": details, "SlipNos": slip_nos})
+
+    def add_sale(self, io_date, lines):
+        """판매 전표 저장 (lines는 SaveSale의 BulkDatas 목록, io_date는 "YYYYMMDD"). 전표 번호를 반환"""
+        with self.lock:
+            self._slip_seq[io_date] = self._slip_seq.get(io_date, 0) + 1
+            slip_no = f"{io_date}-{self._slip_seq[io_date]}"
+            self.sales.append({"slip_no": slip_no, "io_date": io_date, "lines": lines})
+            self._sale_rows = None
+            return slip_no
+
+    def _rows(self):
+        """전표 줄 목록 (일자, 전표 번호, 줄 순서로 정렬. 전표가 추가될 때만 다시 만든다)"""
+        with self.lock:
+            if self._sale_rows is None:
+                rows = []
+                for sale in self.sales:
+                    for line_no, data in enumerate(sale["lines"], 1):
+                        rows.append({
+                            "IO_DATE": sale["io_date"], "SLIP_NO": sale["slip_no"], "LINE_NO": line_no,
+                            **{field: data.get(field, "") for field in SALE_FIELDS},
+                        })
+                rows.sort(key=lambda row: (row["IO_DATE"], int(row["SLIP_NO"].rsplit("-", 1)[1]), row["LINE_NO"]))
+                self._sale_rows = (rows, [row["IO_DATE"] for row in rows])
+            return self._sale_rows
+
+    def sale_list(self, query, body):
+        """기간(FROM_DATE~TO_DATE, "YYYYMMDD")의 판매 전표 줄을 PAGE_SIZE개씩 나누어 PAGE_NO번째 묶음을 돌려준다"""
+        error = self._session_error(query)
+        if error:
+            return error
+        try:
+            page_no = int(body.get("PAGE_NO") or 1)
+            page_size = min(int(body.get("PAGE_SIZE") or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+        except (TypeError, ValueError):
+            return 200, _error("PAGE_NO, PAGE_SIZE는 숫자여야 합니다.", code=1)
+        if page_no < 1 or page_size < 1:
+            return 200, _error("PAGE_NO, PAGE_SIZE는 1 이상이어야 합니다.", code=1)
+        rows, dates = self._rows()
+        first = bisect_left(dates, body.get("FROM_DATE") or "")
+        last = bisect_right(dates, body.get("TO_DATE") or "99999999")
+        start = first + (page_no - 1) * page_size
+        return 200, _ok({
+            "Result": rows[start:min(start + page_size, last)], "TotalCnt": last - first,
+            "PAGE_NO": page_no, "PAGE_SIZE": page_size,
+        })
+
+    HANDLERS = {
+        "Zone": zone_info,
+        "OAPILogin": login,
+        "InventoryBasic/GetBasicProductsList": products_list,
+        "Sale/SaveSale": save_sale,
+        "Sale/GetSaleList": sale_list,
+    }
+
+    # 기록/재생
+    def _forward(self, endpoint, query, body):
+        import requests  # 기록 모드에서만 필요
+
+        zone = "" if endpoint == "Zone" else self.zone
+        url = f"{self.upstream.format(zone=zone).rstrip('/')}{API_PREFIX}{endpoint}"
+        params = {key: values[0] for key, values in query.items()}
+        try:
+            response = requests.post(url, params=params, json=body, timeout=60)
+            status = response.status_code
+            payload = response.json()
+        except (requests.RequestException, ValueError) as e:
+            status, payload = 502, _error(f"실제 서버 연결 실패: {e}", code=502)
+        if endpoint == "Zone" and status == 200 and (payload.get("Data") or {}).get("ZONE"):
+            self.zone = payload["Data"]["ZONE"]  # 이후 요청은 조회한 Zone 서버로 전달
+        with self.lock:
+            self._record_file.write(json.dumps({
+                "endpoint": endpoint, "body": _masked(body), "status": status, "response": payload,
+            }, ensure_ascii=False) + "\n")
+            self._record_file.flush()
+        return status, payload
+
+    def _load_replay(self, path):
+        by_request = {}
+        by_endpoint = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                answer = (entry["status"], entry["response"])
+                by_request.setdefault(_request_key(entry["endpoint"], entry.get("body")), deque()).append(answer)
+                by_endpoint.setdefault(entry["endpoint"], []).append(answer)
+        self._replay = (by_request, {endpoint: cycle(answers) for endpoint, answers in by_endpoint.items()})
+
+    def _replayed(self, endpoint, body):
+        by_request, by_endpoint = self._replay
+        with self.lock:
+            answers = by_request.get(_request_key(endpoint, body))
+            if answers:
+                answer = answers[0]
+                if len(answers) > 1:  # 같은 요청이 여러 번 기록된 경우 기록 순서대로, 마지막 응답은 계속 사용
+                    answers.popleft()
+                return answer
+            if endpoint in by_endpoint:
+                return next(by_endpoint[endpoint])
+        return 404, _error(f"기록된 응답이 없는 API: {endpoint}", code=404)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # 동시 접속이 많을 때 연결 대기열이 넘쳐 재시도(1초)가 생기지 않도록
+
+
+class _Handler(BaseHTTPRequestHandler):
+    mock = None  # serve()에서 지정
+    verbose = False
+
+    def do_POST(self):
+        parts = urlsplit(self.path)
+        if not parts.path.startswith(API_PREFIX):
+            self._send(404, _error(f"알 수 없는 경로: {parts.path}", code=404))
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send(400, _error("요청 본문이 JSON 형식이 아닙니다.", code=400))
+            return
+        status, payload = self.mock.handle(parts.path[len(API_PREFIX):], parse_qs(parts.query), body)
+        self._send(status, payload)
+
+    def do_GET(self):
+        if urlsplit(self.path).path == "/mock/stats":  # 테스트/벤치마크용 호출 통계
+            self._send(200, self.mock.stats())
+        else:
+            self._send(404, _error("알 수 없는 경로", code=404))
+
+    def _send(self, status, payload):
+        content = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+        except (BrokenPipeError, ConnectionResetError):  # 제한 시간이 지나 클라이언트가 먼저 연결을 끊은 경우
+            pass
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+
+def serve(mock, host="127.0.0.1", port=0, verbose=False):
+    """모의 서버를 백그라운드 스레드에서 시작. (서버, 기본 주소)를 반환하며 server.shutdown()으로 멈춘다
+
+    port=0이면 빈 포트를 쓴다. 기본 주소는 ecount.BASE_URL_ENV에 넣어 쓴다.
+    """
+    handler = type("MockHandler", (_Handler,), {"mock": mock, "verbose": verbose})
+    server = _Server((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, name="ecount-mock", daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def load_products(items_path):
+    """items.json(storage 저장 형식 모두 가능)을 GetBasicProductsList 응답 형식으로"""
+    import serializers
+
+    with open(items_path, "rb") as f:
+        items = serializers.loads(f.read())
+    return [
+        {"PROD_CD": code, "PROD_DES": info.get("name", ""), "CLASS_CD": info.get("category", "")}
+        for code, info in items.items()
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이카운트 OAPI 모의 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--items", help="품목 목록으로 쓸 items.json 경로")
+    parser.add_argument("--zone", default=DEFAULT_ZONE)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="추가 지연의 최댓값 (초, 균등 분포)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="HTTP 500 오류 비율 (0~1)")
+    parser.add_argument("--rate-limit", type=int, default=0, help="API별 초당 최대 호출 수 (0이면 제한 없음)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--record", help="실제 서버로 전달하고 요청/응답을 기록할 JSON lines 파일")
+    parser.add_argument("--upstream", default="https://sboapi{zone}.ecount.com", help="--record 시 실제 서버 주소")
+    parser.add_argument("--replay", help="기록한 응답을 돌려줄 JSON lines 파일")
+    parser.add_argument("--verbose", action="store_true", help="요청 로그 출력")
+    args = parser.parse_args()
+
+    mock = MockEcount(
+        products=load_products(args.items) if args.items else None, zone=args.zone,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, rate_limit=args.rate_limit,
+        seed=args.seed, record=args.record, upstream=args.upstream, replay=args.replay,
+    )
+    server, url = serve(mock, args.host, args.port, args.verbose)
+    print(f"이카운트 모의 서버: {url} (CODAIPOINT_ECOUNT_BASE_URL={url})", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        mock.close()
+        print(json.dumps(mock.stats(), ensure_ascii=False, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""포인트 소멸 일괄 처리 (적립일로부터 service.POINT_VALID_DAYS일이 지난 묶음)
+
+    python -m expiry --as-of 2025-06-30 --report expiry.csv
+    python -m expiry --dry-run          # 소멸 대상만 확인하고 저장하지 않음
+
+모든 거래처의 묶음을 한 번에 배열로 펼쳐 소멸 대상과 거래처별 합계를 계산하고,
+소멸 대상이 있는 거래처만 묶음 목록을 고친다.
+"""
+import argparse
+import csv
+import sys
+from datetime import date
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
+
+import metrics
+import service
+import storage
+
+REPORT_COLUMNS = [
+    "customer_id", "name", "balance_before", "expired_points", "expired_lots", "balance_after", "expiring_soon",
+]
+
+
+@metrics.timed("points.expiry")
+def run_expiry(customers, as_of, apply=True, notice_days=service.POINT_NOTICE_DAYS):
+    """as_of("YYYY-MM-DD") 기준 소멸 대상 묶음을 계산하고, apply이면 거래처 데이터에서 차감한다
+
+    소멸 보고서 {"as_of", "cutoff", "customers", "lots", "points", "expiring_soon", "rows"}를 반환.
+    rows는 소멸 대상이나 notice_days일 안에 소멸 예정인 포인트가 있는 거래처별 REPORT_COLUMNS 목록.
+    """
+    cutoff = service.expiry_cutoff(as_of)
+    notice_cutoff = service.expiry_cutoff(as_of, notice_days)
+
+    customer_ids = list(customers)
+    lot_lists = [service.point_lots(customers[customer_id]) for customer_id in customer_ids]
+    counts = np.fromiter(map(len, lot_lists), dtype=np.int64, count=len(lot_lists))
+    total = int(counts.sum())
+
+    # 모든 묶음을 (거래처 번호, 적립일, 남은 포인트) 배열로 펼친다
+    owners = np.repeat(np.arange(len(customer_ids)), counts)
+    dates = np.fromiter(map(itemgetter(0), chain.from_iterable(lot_lists)), dtype="U10", count=total)
+    points = np.fromiter(map(itemgetter(1), chain.from_iterable(lot_lists)), dtype=np.int64, count=total)
+
+    expired = dates <= cutoff  # "YYYY-MM-DD" 문자열은 사전순이 날짜순
+    soon = ~expired & (dates <= notice_cutoff)
+    expired_points = np.bincount(owners[expired], weights=points[expired], minlength=len(customer_ids))
+    expired_lots = np.bincount(owners[expired], minlength=len(customer_ids))
+    soon_points = np.bincount(owners[soon], weights=points[soon], minlength=len(customer_ids))
+
+    rows = []
+    for position in np.flatnonzero((expired_lots > 0) | (soon_points > 0)):
+        customer_id = customer_ids[position]
+        customer = customers[customer_id]
+        balance = customer.get('points', 0)
+        amount = int(expired_points[position])
+        rows.append({
+            "customer_id": customer_id,
+            "name": customer.get('name', ''),
+            "balance_before": balance,
+            "expired_points": amount,
+            "expired_lots": int(expired_lots[position]),
+            "balance_after": balance - amount,
+            "expiring_soon": int(soon_points[position]),
+        })
+        if apply and expired_lots[position]:
+            customer['lots'] = [lot for lot in lot_lists[position] if lot[0] > cutoff]
+            customer['points'] = balance - amount
+
+    return {
+        "as_of": as_of,
+        "cutoff": cutoff,
+        "customers": int(np.count_nonzero(expired_lots)),
+        "lots": int(expired.sum()),
+        "points": int(expired_points.sum()),
+        "expiring_soon": int(soon_points.sum()),
+        "rows": rows,
+    }
+
+
+def write_report(report, path):
+    """거래처별 소멸 내역을 CSV로 저장 (엑셀에서 열 수 있도록 BOM 포함)"""
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(report["rows"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="포인트 소멸 일괄 처리")
+    parser.add_argument("--as-of", default=date.today().strftime("%Y-%m-%d"), help="기준일 (기본: 오늘)")
+    parser.add_argument("--dry-run", action="store_true", help="소멸 대상만 계산하고 저장하지 않음")
+    parser.add_argument("--report", help="거래처별 소멸 내역 CSV 경로")
+    args = parser.parse_args()
+
+    with storage.locked():
+        customers = storage.load_customers()
+        report = run_expiry(customers, args.as_of, apply=not args.dry_run)
+        if not args.dry_run and report["lots"]:
+            storage.save_customers(customers)
+
+    if args.report:
+        write_report(report, args.report)
+    print(
+        f"{report['as_of']} 기준 ({report['cutoff']}까지 적립분): 거래처 {report['customers']:,}곳, "
+        f"묶음 {report['lots']:,}개, {report['points']:,}점 {'소멸 대상' if args.dry_run else '소멸'} / "
+        f"{service.POINT_NOTICE_DAYS}일 내 소멸 예정 {report['expiring_soon']:,}점",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
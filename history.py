@@ -0,0 +1,99 @@
+"""거래 내역 조회 화면용 데이터 가공"""
+from bisect import bisect_left, bisect_right
+
+import metrics
+
+
+def has_customer_name(transaction):
+    return bool(transaction.get('customer_name') and transaction.get('customer_name').strip())
+
+
+class TransactionIndex:
+    """거래일자 순 거래 위치 색인 (전체 + 거래처별)
+
+    거래일자("YYYY-MM-DD")와 거래 위치를 날짜 오름차순 배열로 가지고 있어
+    기간 조회는 이진 탐색으로 해당 구간만 잘라내고, 기간의 처음/끝은 배열 양 끝에서 바로 얻는다.
+    거래 데이터가 바뀌면 새로 만든다 (common.get_transaction_index).
+    """
+
+    @metrics.timed("index.transactions_build")
+    def __init__(self, transactions):
+        dated = [pos for pos, transaction in enumerate(transactions) if transaction.get('date')]
+        dated.sort(key=lambda pos: transactions[pos]['date'])  # 안정 정렬 - 같은 날짜는 등록 순
+
+        self.positions = dated
+        self.dates = [transactions[pos]['date'] for pos in dated]
+        self.unnamed = sum(1 for transaction in transactions if not has_customer_name(transaction))
+
+        # 거래처별 (날짜 배열, 위치 배열) - 전체 순서대로 나누므로 각각 날짜 순
+        self._by_customer = {}
+        for date, pos in zip(self.dates, dated):
+            customer_id = transactions[pos].get('customer_id', '')
+            entry = self._by_customer.get(customer_id)
+            if entry is None:
+                entry = self._by_customer[customer_id] = ([], [])
+            entry[0].append(date)
+            entry[1].append(pos)
+
+    def _arrays(self, customer_id):
+        if customer_id is None:
+            return self.dates, self.positions
+        return self._by_customer.get(customer_id, ([], []))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def bounds(self, customer_id=None):
+        """(처음 거래일자, 마지막 거래일자). 거래가 없으면 None"""
+        dates, _ = self._arrays(customer_id)
+        if not dates:
+            return None
+        return dates[0], dates[-1]
+
+    def range(self, start, end, customer_id=None):
+        """start~end(포함, "YYYY-MM-DD") 기간 거래 위치 목록 (날짜 오름차순)"""
+        dates, positions = self._arrays(customer_id)
+        return positions[bisect_left(dates, start):bisect_right(dates, end)]
+
+
+@metrics.timed("dataframe.transactions")
+def build_transactions_df(transactions):
+    """거래 내역을 품목별 한 행의 DataFrame으로 변환 (최근 거래일 순)"""
+    import pandas as pd  # 조회 화면에서만 필요하므로 지연 로드
+
+    # 거래 내역을 DataFrame으로 변환하기 전에 데이터 구조 수정
+    transaction_rows = []
+    for transaction in transactions:
+        # 기본 거래 정보를 안전하게 가져오기
+        base_info = {
+            'date': transaction.get('date', ''),
+            'customer_name': transaction.get('customer_name', ''),
+            'customer_id': transaction.get('customer_id', ''),
+            'total_supply_value': transaction.get('total_supply_value', 0),
+            'total_vat': transaction.get('total_vat', 0),
+            'total_amount': transaction.get('total_amount', 0),
+            'points': transaction.get('points', 0)
+        }
+
+        # 품목별 정보를 개별 행으로 추가
+        if transaction.get('items'):
+            for item in transaction['items']:
+                row = base_info.copy()
+                row.update({
+                    'item_code': item.get('item_code', ''),
+                    'item_name': item.get('item_name', ''),
+                    'quantity': item.get('quantity', 0),
+                    'price': item.get('price', 0),
+                    'supply_value': item.get('supply_value', 0),
+                    'vat': item.get('vat', 0),
+                    'total': item.get('total', 0)
+                })
+                transaction_rows.append(row)
+        else:
+            transaction_rows.append(base_info)
+
+    transactions_df = pd.DataFrame(transaction_rows)
+    if not transactions_df.empty:
+        transactions_df['date'] = pd.to_datetime(transactions_df['date'])
+        transactions_df = transactions_df.sort_values('date', ascending=False)
+    return transactions_df
@@ -0,0 +1,177 @@
+"""처리 구간별 실행 시간 측정 (저장소, 검색, DataFrame, HTTP 호출)
+
+    with metrics.timer("storage.load", file="customers.json"):
+        ...
+
+측정값은 프로세스 전체 통계(구간별 최근 WINDOW회의 백분위수)와
+현재 실행 중인 작업(Streamlit 페이지 실행, API 요청)의 구간별 기록에 함께 남는다.
+환경 변수 CODAIPOINT_METRICS_LOG에 파일 경로를 지정하면 측정값을 JSON lines로 기록한다.
+"""
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+WINDOW = 1000  # 구간별로 백분위수 계산에 사용하는 최근 측정 수
+QUANTILES = (0.5, 0.9, 0.99)
+LOG_ENV = 'CODAIPOINT_METRICS_LOG'
+METRIC_PREFIX = 'codaipoint_'
+
+_lock = threading.Lock()
+_series = {}  # (구간 이름, 라벨) -> {"count", "sum", "recent"}
+_current_run = ContextVar('codaipoint_run', default=None)  # 현재 실행 중인 작업 (API 스레드풀에도 전달됨)
+_log_files = {}
+
+
+def _write_log(entry):
+    path = os.environ.get(LOG_ENV)
+    if not path:
+        return
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    with _lock:
+        f = _log_files.get(path)
+        if f is None:
+            f = _log_files[path] = open(path, 'a', encoding='utf-8', buffering=1)
+        f.write(line)
+
+
+def record(name, seconds, **labels):
+    """측정값 하나를 기록"""
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        series = _series.get(key)
+        if series is None:
+            series = _series[key] = {"count": 0, "sum": 0.0, "recent": deque(maxlen=WINDOW)}
+        series["count"] += 1
+        series["sum"] += seconds
+        series["recent"].append(seconds)
+
+    run = _current_run.get()
+    if run is not None:
+        run["sections"].append((name, seconds))
+
+    _write_log({"ts": time.time(), "metric": name, "seconds": seconds, **labels})
+
+
+@contextmanager
+def timer(name, **labels):
+    """with 블록의 실행 시간을 name 구간으로 기록"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start, **labels)
+
+
+def timed(name, **labels):
+    """함수 실행 시간을 name 구간으로 기록하는 데코레이터"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# 실행 단위(Streamlit 페이지 한 번 실행, API 요청 한 건)별 구간 기록
+def start_run(label):
+    """새 실행을 시작하고 실행 기록을 반환 (이후 측정값이 이 실행에 모인다)"""
+    run = {"label": label, "started_at": time.time(), "start": time.perf_counter(),
+           "total": None, "sections": []}
+    _current_run.set(run)
+    return run
+
+
+def finish_run(run):
+    """실행을 끝내고 전체 시간을 기록"""
+    if _current_run.get() is run:
+        _current_run.set(None)
+    if run.get("total") is None:
+        run["total"] = time.perf_counter() - run["start"]
+        record("run", run["total"], label=run["label"])
+    return run
+
+
+def summarize_run(run):
+    """실행 기록을 구간별 (이름, 횟수, 합계 초) 목록으로 정리 (합계가 큰 순)"""
+    totals = {}
+    for name, seconds in run["sections"]:
+        count, total = totals.get(name, (0, 0.0))
+        totals[name] = (count + 1, total + seconds)
+    return sorted(
+        ((name, count, total) for name, (count, total) in totals.items()),
+        key=lambda row: row[2], reverse=True
+    )
+
+
+def percentile(sorted_values, q):
+    """정렬된 값에서 nearest-rank 방식 백분위수"""
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values), max(1, math.ceil(q * len(sorted_values)))) - 1
+    return sorted_values[idx]
+
+
+def snapshot():
+    """구간별 누적 횟수/합계와 최근 측정의 백분위수 목록"""
+    with _lock:
+        items = [(key, series["count"], series["sum"], list(series["recent"]))
+                 for key, series in _series.items()]
+
+    rows = []
+    for (name, labels), count, total, recent in sorted(items):
+        recent.sort()
+        rows.append({
+            "name": name,
+            "labels": dict(labels),
+            "count": count,
+            "sum": total,
+            **{f"p{int(q * 100)}": percentile(recent, q) for q in QUANTILES},
+            "max": recent[-1] if recent else 0.0,
+        })
+    return rows
+
+
+def reset():
+    with _lock:
+        _series.clear()
+
+
+def _metric_name(name):
+    return METRIC_PREFIX + re.sub(r'[^a-zA-Z0-9_]', '_', name) + '_seconds'
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def render_prometheus():
+    """Prometheus text 형식 (summary) 출력"""
+    lines = []
+    declared = set()
+    for row in snapshot():
+        metric = _metric_name(row["name"])
+        if metric not in declared:
+            declared.add(metric)
+            lines.append(f"# HELP {metric} {row['name']} 실행 시간 (초)")
+            lines.append(f"# TYPE {metric} summary")
+        labels = row["labels"]
+        for q in QUANTILES:
+            value = row[f"p{int(q * 100)}"]
+            lines.append(f"{metric}{_label_text({**labels, 'quantile': str(q)})} {value:.6f}")
+        lines.append(f"{metric}_sum{_label_text(labels)} {row['sum']:.6f}")
+        lines.append(f"{metric}_count{_label_text(labels)} {row['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,188 @@
+import streamlit as st
+
+import duplicates
+import service
+import storage
+from common import (
+    setup_page, finish_page, get_customers, get_point_rules, get_id_variants,
+    save_customers, save_all_transactions, resolve_customer_id, data_version, get_all_transactions,
+)
+
+# 페이지 설정
+setup_page("거래처 관리")
+
+customers = get_customers()
+
+
+def _all_transactions():
+    # 거래처는 모든 매장이 함께 쓰므로 합칠 때는 모든 매장의 거래 번호를 바꾼다
+    return [transaction for transactions in get_all_transactions().values() for transaction in transactions]
+
+
+st.subheader("거래처 관리")
+
+# 거래처 등록/수정 폼
+with st.form("customer_registration"):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        new_customer_id = st.text_input("사업자번호 또는 핸드폰번호", key="new_customer_id")
+    with col2:
+        new_customer_name = st.text_input("거래처(고객명)", key="new_customer_name")
+    with col3:
+        initial_points = st.number_input("초기 포인트", min_value=0, key="initial_points")
+
+    submitted = st.form_submit_button("거래처 등록/수정")
+    if submitted:
+        try:
+            with storage.locked():
+                new_customer_id = resolve_customer_id(new_customer_id)
+                is_new = service.upsert_customer(get_customers(), new_customer_id, new_customer_name, initial_points)
+                save_customers()
+        except service.ServiceError as e:
+            st.error(str(e))
+        else:
+            if is_new:
+                st.success(f"새로운 거래처가 등록되었습니다: [{new_customer_id}] {new_customer_name}")
+            else:
+                st.success(f"거래처 정보가 수정되었습니다: [{new_customer_id}] {new_customer_name}")
+            st.rerun()
+
+# 표기만 다른 같은 번호(예: 01012345678 / 010-1234-5678) 정리
+variants = get_id_variants()
+if variants:
+    st.warning(f"번호 표기만 다른 거래처가 {len(variants):,}건 있습니다. 합치면 포인트 잔액이 한 거래처로 모입니다.")
+    with st.expander("합칠 거래처 보기"):
+        st.write({key: ids for key, ids in list(variants.items())[:100]})
+    if st.button("표준 번호로 합치기"):
+        with storage.locked():
+            merged, relinked = service.migrate_customer_ids(get_customers(), _all_transactions())
+            save_customers()
+            save_all_transactions()
+        st.success(f"거래처 {merged:,}건을 표준 번호로 합치고 거래 {relinked:,}건의 번호를 바꿨습니다.")
+        st.rerun()
+
+# 중복 거래처 찾기 - 거래처명/번호가 비슷한 거래처 묶음을 확인하고 선택한 묶음만 합친다
+st.markdown("---")
+with st.expander("중복 거래처 찾기"):
+    threshold = st.slider("유사도 기준", 0.5, 1.0, duplicates.DEFAULT_THRESHOLD, 0.01,
+                          help="거래처명 유사도 × 번호 유사도가 이 값 이상인 거래처를 같은 거래처 후보로 봅니다.")
+    cache_key = (data_version('customers'), data_version('transactions'), threshold)
+    if st.button("중복 후보 찾기"):
+        groups = duplicates.find_duplicates(get_customers(), _all_transactions(), threshold)
+        st.session_state.duplicate_groups = (cache_key, groups)
+
+    cached = st.session_state.get('duplicate_groups')
+    if cached is not None and cached[0] == cache_key:
+        groups = cached[1]
+        if not groups:
+            st.info("중복 후보가 없습니다.")
+        else:
+            import pandas as pd  # 목록 표시 시에만 필요하므로 지연 로드
+
+            st.caption(f"중복 후보 {len(groups):,}묶음. 남길 거래처는 거래가 가장 많은 거래처입니다.")
+            selection = st.data_editor(
+                pd.DataFrame([
+                    {
+                        "합치기": True,
+                        "남길 번호": group["keep"],
+                        "거래처명": customers[group["keep"]].get("name", ""),
+                        "합쳐질 번호": ", ".join(
+                            f"{customer_id} ({customers[customer_id].get('name', '')})"
+                            for customer_id in group["members"] if customer_id != group["keep"]
+                        ),
+                        "점수": group["score"],
+                    }
+                    for group in groups
+                ]),
+                disabled=["남길 번호", "거래처명", "합쳐질 번호", "점수"],
+                use_container_width=True,
+                hide_index=True,
+                key="duplicate_selection",
+            )
+            selected = [group for group, checked in zip(groups, selection["합치기"]) if checked]
+            if st.button(f"선택한 {len(selected):,}묶음 합치기", disabled=not selected):
+                with storage.locked():
+                    # 찾은 뒤 삭제된 거래처가 있는 묶음은 건너뜀
+                    customers = get_customers()
+                    selected = [
+                        group for group in selected
+                        if all(customer_id in customers for customer_id in group["members"])
+                    ]
+                    merged, relinked = duplicates.merge_groups(customers, _all_transactions(), selected)
+                    save_customers()
+                    save_all_transactions()
+                st.session_state.pop('duplicate_groups', None)
+                st.success(f"거래처 {merged:,}곳을 합치고 거래 {relinked:,}건의 번호를 바꿨습니다.")
+                st.rerun()
+
+# 등록된 거래처 목록
+st.markdown("---")
+st.subheader("등록된 거래처 목록")
+if customers:
+    import pandas as pd  # 목록 표시 시에만 필요하므로 지연 로드
+
+    customers_df = pd.DataFrame([
+        {
+            "사업자번호/핸드폰번호": id_number,
+            "거래처명": info.get("name", "Unknown"),
+            "등급": info.get("tier", ""),
+            "적립 포인트": info.get("points", 0)
+        }
+        for id_number, info in customers.items()
+    ])
+    st.dataframe(customers_df.reset_index(drop=True), use_container_width=True, hide_index=True)
+
+    # 거래처 수정/삭제
+    col1, col2 = st.columns(2)
+    with col1:
+        customer_to_edit = st.selectbox(
+            "수정/삭제할 거래처 선택",
+            options=list(customers.keys()),
+            format_func=lambda x: f"{x} - {customers[x]['name']}"
+        )
+    with col2:
+        action = st.radio("작업 선택", ["수정", "삭제"], horizontal=True)
+
+    if action == "수정":
+        with st.form("customer_edit_form"):
+            # 등급은 적립 규칙에 정의된 등급 중에서 선택 (빈 값은 일반)
+            current_tier = customers[customer_to_edit].get('tier', '')
+            tier_options = [""] + get_point_rules().tiers
+            if current_tier not in tier_options:
+                tier_options.append(current_tier)
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                edit_name = st.text_input("거래처명", value=customers[customer_to_edit]['name'])
+            with col2:
+                edit_points = st.number_input("적립 포인트", value=customers[customer_to_edit]['points'])
+            with col3:
+                edit_tier = st.selectbox("등급", tier_options, index=tier_options.index(current_tier))
+
+            if st.form_submit_button("수정"):
+                with storage.locked():
+                    customers = get_customers()
+                    customers[customer_to_edit]['name'] = edit_name
+                    if edit_tier:
+                        customers[customer_to_edit]['tier'] = edit_tier
+                    else:
+                        customers[customer_to_edit].pop('tier', None)
+                    service.set_points(customers, customer_to_edit, int(edit_points))
+                    save_customers()
+                st.success("거래처 정보가 수정되었습니다.")
+                st.rerun()
+    else:  # 삭제
+        if st.button("선택한 거래처 삭제"):
+            with storage.locked():
+                customers = get_customers()
+                deletable = customers[customer_to_edit]['points'] <= 0
+                if deletable:
+                    del customers[customer_to_edit]
+                    save_customers()
+            if not deletable:
+                st.error("적립 포인트가 남아있는 거래처는 삭제할 수 없습니다.")
+            else:
+                st.success("거래처가 삭제되었습니다.")
+                st.rerun()
+
+finish_page()
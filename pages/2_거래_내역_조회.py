@@ -0,0 +1,112 @@
+from datetime import datetime
+
+import streamlit as st
+
+import service
+import storage
+from common import (
+    setup_page, finish_page, get_customers, get_transactions, get_transaction_index,
+    save_customers, save_transactions, find_customer_by_name,
+)
+from history import build_transactions_df, has_customer_name
+
+# 페이지 설정
+setup_page("거래 내역 조회")
+
+st.subheader("거래 내역 조회")
+
+transactions = get_transactions()
+transaction_index = get_transaction_index()
+
+if transaction_index.unnamed:
+    # 거래처명이 비어있는 데이터 삭제 (색인을 만들 때 발견된 경우에만)
+    with storage.locked():
+        transactions = [transaction for transaction in get_transactions() if has_customer_name(transaction)]
+        save_transactions(transactions)
+    transaction_index = get_transaction_index()
+
+if len(transaction_index):
+    # 거래처 검색 입력
+    selected_customer_id = None
+    customer_name_search = st.text_input("거래처(고객명)", key="customer_search_input")
+    if customer_name_search:
+        matches = find_customer_by_name(customer_name_search)
+        if matches:
+            if len(matches) == 1:
+                # 일치하는 거래처가 하나인 경우
+                selected_customer_id = matches[0][0]
+            elif len(matches) > 1:
+                # 중복된 거래처가 있는 경우
+                options = [f"{m[0]} - {m[1]['name']}" for m in matches]
+                selected_option = st.selectbox(
+                    "중복된 거래처가 있습니다. 선택해주세요:",
+                    options=options,
+                    key="duplicate_customer_search"
+                )
+                if selected_option:
+                    selected_customer_id = selected_option.split(" - ")[0]
+        else:
+            st.warning("검색된 거래처가 없습니다.")
+
+    # 기간 기본값은 색인의 처음/마지막 거래일자
+    bounds = transaction_index.bounds(selected_customer_id)
+    if bounds:
+        first_date, last_date = (datetime.strptime(d, "%Y-%m-%d").date() for d in bounds)
+
+        # 날짜 범위 선택
+        col1, col2 = st.columns(2)
+        with col1:
+            start_date = st.date_input("시작일", first_date, key="start_date")
+        with col2:
+            end_date = st.date_input("종료일", last_date, key="end_date")
+
+        # 색인에서 기간(및 거래처)에 해당하는 거래만 잘라서 표로 만든다
+        positions = transaction_index.range(
+            start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"), selected_customer_id
+        )[::-1]  # 최근 거래 순
+
+        if positions:
+            filtered_df = build_transactions_df([transactions[pos] for pos in positions])
+
+            # 표시할 열 선택
+            display_columns = [
+                'date', 'customer_name', 'item_name', 'quantity', 'price',
+                'supply_value', 'vat', 'total', 'points'
+            ]
+            # 실제 존재하는 열만 선택
+            display_columns = [col for col in display_columns if col in filtered_df.columns]
+
+            st.dataframe(filtered_df[display_columns].reset_index(drop=True), use_container_width=True, hide_index=True)
+
+            # 거래 내역 삭제 기능
+            st.markdown("---")
+            st.subheader("거래 내역 삭제")
+
+            def transaction_label(pos):
+                transaction = transactions[pos]
+                return (f"{transaction['date']} - {transaction.get('customer_name', '')}"
+                        f" - {transaction.get('total_amount', 0):,.0f}원")
+
+            selected_position = st.selectbox("삭제할 거래 내역 선택", positions, format_func=transaction_label)
+
+            if st.button("선택한 거래 내역 삭제"):
+                selected_transaction = transactions[selected_position]
+
+                # 화면을 그린 뒤 다른 세션에서 거래가 바뀌었을 수 있으므로 잠금 안에서 위치를 다시 확인
+                with storage.locked():
+                    current = get_transactions()
+                    idx = service.locate_transaction(current, selected_transaction, selected_position)
+                    if idx is not None:
+                        service.delete_transaction(get_customers(), current, idx)
+                        save_customers()
+                        save_transactions()
+                st.success("거래 내역이 삭제되었습니다.")
+                st.rerun()
+        else:
+            st.info("해당 기간에 거래 내역이 없습니다.")
+    else:
+        st.info("선택한 거래처의 거래 내역이 없습니다.")
+else:
+    st.info("거래 내역이 없습니다.")
+
+finish_page()
@@ -0,0 +1,247 @@
+import streamlit as st
+
+import storage
+import stores
+from common import (
+    setup_page, finish_page, get_items, get_api_config, get_transactions, is_api_connected,
+    save_items, save_api_config,
+)
+
+# 페이지 설정
+setup_page("품목 관리")
+
+item_data = get_items()
+
+st.subheader("품목 관리")
+
+col1, col2 = st.columns([1, 4])
+with col1:
+    # API 설정 버튼
+    if st.button("API 설정", key="api_settings_button"):
+        st.session_state.show_api_settings = True
+with col2:
+    # 품목 불러오기 버튼 (API 연동이 완료된 경우에만 활성화)
+    if st.button("품목 불러오기", disabled=not is_api_connected()):
+        from ecount import get_products_list
+
+        if st.session_state.zone:
+            # 로딩 스피너 표시
+            with st.spinner("품목 정보를 불러오는 중입니다..."):
+                # 진행 상태 표시
+                progress_bar = st.progress(0)
+                st.info("API 서버에 연결 중...")
+                progress_bar.progress(30)
+
+                # TestKey가 있는 경우 테스트 모드로 시도
+                if getattr(st.session_state, 'test_session_id', None):
+                    st.info("테스트 세션으로 연결 시도...")
+                    products = get_products_list(st.session_state.test_session_id, st.session_state.zone, is_test=True)
+                elif getattr(st.session_state, 'api_session_id', None):
+                    st.info("API 세션으로 연결 시도...")
+                    products = get_products_list(st.session_state.api_session_id, st.session_state.zone, is_test=False)
+
+                if products:
+                    st.info("품목 데이터 처리 중...")
+                    progress_bar.progress(60)
+
+                    # 기존 품목 데이터 초기화
+                    item_data = {}
+
+                    # 새로운 품목 데이터 등록
+                    total_products = len(products)
+                    for i, product in enumerate(products):
+                        prod_cd = product.get("PROD_CD")
+                        prod_des = product.get("PROD_DES")
+                        if prod_cd and prod_des:
+                            item_data[prod_cd] = {
+                                "name": prod_des
+                            }
+                            # 이카운트 품목그룹1을 적립 규칙의 품목 분류로 사용
+                            if product.get("CLASS_CD"):
+                                item_data[prod_cd]["category"] = product["CLASS_CD"]
+                        # 진행률 업데이트 (60%~90%)
+                        progress = 60 + (30 * (i + 1) / total_products)
+                        progress_bar.progress(int(progress))
+
+                    st.info("데이터 저장 중...")
+                    progress_bar.progress(90)
+
+                    # 데이터 저장
+                    with storage.locked():
+                        save_items(item_data)
+
+                    progress_bar.progress(100)
+                    st.success(f"품목 정보가 성공적으로 업데이트되었습니다. (총 {len(item_data)}개 품목)")
+                    st.rerun()
+                else:
+                    st.error("품목 정보를 불러오는데 실패했습니다.")
+        else:
+            st.error("API 연동이 필요합니다. API 설정에서 연동을 완료해주세요.")
+
+# API 설정 레이어
+if getattr(st.session_state, 'show_api_settings', False):
+    with st.form("api_settings_form"):
+        st.subheader("API 설정")
+
+        # 현재 설정값 로드
+        current_api_config = get_api_config()
+
+        col1, col2 = st.columns(2)
+        with col1:
+            code = st.text_input("CODE", value=current_api_config.get("CODE", ""))
+            test_key = st.text_input("TestKey", value=current_api_config.get("TestKey", ""))
+        with col2:
+            id_value = st.text_input("ID", value=current_api_config.get("ID", ""))
+            api_key = st.text_input("APIKey", value=current_api_config.get("APIKey", ""), type="password")
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.form_submit_button("저장"):
+                # 매장마다 이카운트 회사가 다른 경우 다른 매장의 회사 코드로 저장하지 않도록 확인
+                registered = storage.load_stores()
+                owner = stores.store_for_com_code(registered, code)
+                if owner is not None and owner != storage.current_store():
+                    st.error(f"회사 코드 {code}는 다른 매장({stores.store_label(registered, owner)})에 등록되어 있습니다.")
+                else:
+                    with storage.locked():
+                        save_api_config({
+                            "CODE": code,
+                            "ID": id_value,
+                            "TestKey": test_key,
+                            "APIKey": api_key
+                        })
+                    st.success("API 설정이 저장되었습니다.")
+                    st.session_state.show_api_settings = False
+                    st.rerun()
+        with col2:
+            # API 연결 상태에 따라 버튼 텍스트 변경
+            button_text = "연동 완료" if getattr(st.session_state, 'api_session_id', None) else "API 연결 테스트"
+            if st.form_submit_button(button_text):
+                from ecount import get_zone_info, get_session_id
+
+                # Zone 정보 조회
+                zone = get_zone_info(code)
+                if zone:
+                    st.session_state.zone = zone
+                    st.info(f"Zone 정보 조회 성공: {zone}")
+
+                    # 테스트키가 있는 경우 테스트 세션 연결 시도
+                    if test_key:
+                        st.info("테스트 세션 연결 시도 중...")
+                        session_id = get_session_id(code, id_value, test_key, zone, is_test=True)
+                        if session_id:
+                            st.session_state.test_session_id = session_id
+                            st.success(f"테스트 세션 연결 성공 (Session ID: {session_id})")
+                        else:
+                            st.error("테스트 세션 연결 실패")
+
+                    # API키가 있는 경우 실제 API 세션 연결 시도
+                    if api_key:
+                        st.info("API 세션 연결 시도 중...")
+                        api_session_id = get_session_id(code, id_value, api_key, zone, is_test=False)
+                        if api_session_id:
+                            st.session_state.api_session_id = api_session_id
+                            st.success(f"API 세션 연결 성공 (Session ID: {api_session_id})")
+                        else:
+                            st.error("API 세션 연결 실패")
+                            if 'api_session_id' in st.session_state:
+                                del st.session_state.api_session_id
+                else:
+                    st.error("Zone 정보 조회 실패")
+                    if 'api_session_id' in st.session_state:
+                        del st.session_state.api_session_id
+        with col3:
+            if st.form_submit_button("닫기"):
+                st.session_state.show_api_settings = False
+                st.rerun()
+
+st.markdown("---")
+
+# 품목 등록 폼
+with st.form("item_registration"):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        new_item_code = st.text_input("품목코드", key="new_item_code")
+    with col2:
+        new_item_name = st.text_input("품목명", key="new_item_name")
+    with col3:
+        new_item_category = st.text_input("분류 (선택)", key="new_item_category", help="포인트 적립 규칙의 품목 분류")
+
+    submitted = st.form_submit_button("품목 등록/수정")
+    if submitted:
+        if not new_item_code or not new_item_name:
+            st.error("품목코드와 품목명을 모두 입력해주세요.")
+        else:
+            with storage.locked():
+                get_items()[new_item_code] = {
+                    "name": new_item_name
+                }
+                if new_item_category:
+                    get_items()[new_item_code]["category"] = new_item_category
+                save_items()
+            st.success(f"품목이 등록/수정되었습니다: [{new_item_code}] {new_item_name}")
+            st.rerun()
+
+# 등록된 품목 목록
+st.markdown("---")
+st.subheader("등록된 품목 목록")
+if item_data:
+    import pandas as pd  # 목록 표시 시에만 필요하므로 지연 로드
+
+    items_df = pd.DataFrame([
+        {"품목코드": code, "품목명": info["name"], "분류": info.get("category", "")}
+        for code, info in item_data.items()
+    ])
+    st.dataframe(items_df.reset_index(drop=True), use_container_width=True, hide_index=True)
+
+    # 품목 수정/삭제
+    col1, col2 = st.columns(2)
+    with col1:
+        item_to_edit = st.selectbox(
+            "수정/삭제할 품목 선택",
+            options=list(item_data.keys()),
+            format_func=lambda x: f"{x} - {item_data[x]['name']}"
+        )
+    with col2:
+        item_action = st.radio("작업 선택", ["수정", "삭제"], horizontal=True, key="item_action")
+
+    if item_action == "수정":
+        with st.form("item_edit_form"):
+            col1, col2 = st.columns(2)
+            with col1:
+                edit_item_name = st.text_input("품목명", value=item_data[item_to_edit]['name'])
+            with col2:
+                edit_item_category = st.text_input("분류", value=item_data[item_to_edit].get('category', ''))
+
+            if st.form_submit_button("수정"):
+                with storage.locked():
+                    get_items()[item_to_edit]['name'] = edit_item_name
+                    if edit_item_category:
+                        get_items()[item_to_edit]['category'] = edit_item_category
+                    else:
+                        get_items()[item_to_edit].pop('category', None)
+                    save_items()
+                st.success("품목 정보가 수정되었습니다.")
+                st.rerun()
+    else:  # 삭제
+        if st.button("선택한 품목 삭제"):
+            # 거래 내역에서 해당 품목 사용 여부 확인
+            item_in_use = False
+            for transaction in get_transactions():
+                for item in transaction.get('items', []):
+                    if item['item_code'] == item_to_edit:
+                        item_in_use = True
+                        break
+                if item_in_use:
+                    break
+
+            if item_in_use:
+                st.error("이미 거래 내역에 사용된 품목은 삭제할 수 없습니다.")
+            else:
+                with storage.locked():
+                    get_items().pop(item_to_edit, None)
+                    save_items()
+                st.success("품목이 삭제되었습니다.")
+                st.rerun()
+
+finish_page()
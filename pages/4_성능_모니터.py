@@ -0,0 +1,67 @@
+import streamlit as st
+
+import metrics
+from common import setup_page, finish_page, metrics_panel_enabled, METRICS_PANEL_ENV
+
+# 페이지 설정
+setup_page("성능 모니터")
+
+st.subheader("성능 모니터")
+
+if not metrics_panel_enabled():
+    st.info(f"성능 모니터가 꺼져 있습니다. 환경 변수 `{METRICS_PANEL_ENV}=1`로 실행하면 사용할 수 있습니다.")
+else:
+    import pandas as pd  # 모니터 화면에서만 필요하므로 지연 로드
+
+    # 이 프로세스의 모든 세션을 합친 구간별 통계
+    st.markdown("#### 구간별 실행 시간 (최근 측정 기준 백분위수)")
+    rows = metrics.snapshot()
+    if rows:
+        stats_df = pd.DataFrame([
+            {
+                "구간": row["name"],
+                "라벨": ", ".join(f"{key}={value}" for key, value in row["labels"].items()),
+                "횟수": row["count"],
+                "합계(ms)": row["sum"] * 1000,
+                "p50(ms)": row["p50"] * 1000,
+                "p90(ms)": row["p90"] * 1000,
+                "p99(ms)": row["p99"] * 1000,
+                "최대(ms)": row["max"] * 1000,
+            }
+            for row in rows
+        ]).sort_values("합계(ms)", ascending=False)
+        st.dataframe(stats_df.round(2), use_container_width=True, hide_index=True)
+    else:
+        st.info("아직 측정된 구간이 없습니다.")
+
+    # 이 세션의 최근 페이지 실행별 구간 합계
+    st.markdown("#### 이 세션의 최근 페이지 실행")
+    runs = list(st.session_state.get('metrics_runs', []))
+    if runs:
+        run_rows = []
+        for run in reversed(runs):
+            sections = metrics.summarize_run(run)
+            row = {
+                "페이지": run["label"],
+                "전체(ms)": None if run["total"] is None else round(run["total"] * 1000, 2),
+            }
+            row.update({name: round(total * 1000, 2) for name, _, total in sections})
+            run_rows.append(row)
+        st.dataframe(pd.DataFrame(run_rows), use_container_width=True, hide_index=True)
+        st.caption("전체 시간이 비어 있는 실행은 버튼 처리 후 바로 다시 실행(st.rerun)된 경우입니다.")
+
+    # 외부 수집용 내보내기
+    st.markdown("#### 내보내기")
+    prometheus_text = metrics.render_prometheus()
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Prometheus text 다운로드", prometheus_text, file_name="codaipoint_metrics.prom",
+                           mime="text/plain")
+    with col2:
+        if st.button("통계 초기화"):
+            metrics.reset()
+            st.rerun()
+    with st.expander("Prometheus text 보기"):
+        st.code(prometheus_text, language="text")
+
+finish_page()
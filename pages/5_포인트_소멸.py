@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import streamlit as st
+
+import expiry
+import service
+import storage
+from common import setup_page, finish_page, get_customers, save_customers
+
+# 페이지 설정
+setup_page("포인트 소멸")
+
+st.subheader("포인트 소멸")
+st.caption(f"적립일로부터 {service.POINT_VALID_DAYS}일이 지난 포인트는 소멸됩니다. "
+           f"포인트는 먼저 적립한 것부터 사용/소멸됩니다.")
+
+as_of = st.date_input("기준일", datetime.now()).strftime("%Y-%m-%d")
+
+if st.button("소멸 처리"):
+    with storage.locked():
+        result = expiry.run_expiry(get_customers(), as_of)
+        if result["lots"]:
+            save_customers()
+    st.success(f"거래처 {result['customers']:,}곳의 포인트 {result['points']:,}점이 소멸되었습니다.")
+
+# 소멸 처리 전 확인용 (저장하지 않음)
+report = expiry.run_expiry(get_customers(), as_of, apply=False)
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("소멸 대상 거래처", f"{report['customers']:,}")
+col2.metric("소멸 대상 묶음", f"{report['lots']:,}")
+col3.metric("소멸 대상 포인트", f"{report['points']:,}")
+col4.metric(f"{service.POINT_NOTICE_DAYS}일 내 소멸 예정", f"{report['expiring_soon']:,}")
+st.caption(f"{report['cutoff']}까지 적립된 포인트가 소멸 대상입니다.")
+
+if report["rows"]:
+    import pandas as pd  # 보고서 표시 시에만 필요하므로 지연 로드
+
+    report_df = pd.DataFrame(report["rows"], columns=expiry.REPORT_COLUMNS).rename(columns={
+        "customer_id": "사업자번호/핸드폰번호",
+        "name": "거래처명",
+        "balance_before": "현재 포인트",
+        "expired_points": "소멸 포인트",
+        "expired_lots": "소멸 묶음 수",
+        "balance_after": "소멸 후 포인트",
+        "expiring_soon": f"{service.POINT_NOTICE_DAYS}일 내 소멸 예정",
+    })
+    st.dataframe(report_df, use_container_width=True, hide_index=True)
+    st.download_button(
+        "소멸 보고서 다운로드 (CSV)",
+        report_df.to_csv(index=False).encode('utf-8-sig'),
+        file_name=f"point_expiry_{as_of}.csv",
+        mime="text/csv"
+    )
+else:
+    st.info("소멸 대상이나 소멸 예정인 포인트가 없습니다.")
+
+finish_page()
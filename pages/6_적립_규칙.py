@@ -0,0 +1,126 @@
+import json
+import time
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+import accrual
+import storage
+from common import (
+    setup_page, finish_page, get_customers, get_items, get_transactions, get_transaction_index,
+    get_point_rules, get_point_rules_config, save_point_rules, data_version,
+)
+
+# 페이지 설정
+setup_page("적립 규칙")
+
+st.subheader("포인트 적립 규칙")
+st.caption("품목 한 줄의 적립 = 합계 × 적립률(품목 > 분류 > 기본) × 등급 배율 × 행사 배율, "
+           "거래의 적립은 소수점을 버리고 상한(max_points)을 적용합니다.")
+
+# 규칙 편집 (JSON)
+rules_text = st.text_area(
+    "규칙 (JSON)",
+    value=json.dumps(get_point_rules_config(), ensure_ascii=False, indent=2),
+    height=360,
+    help="형식은 accrual.py 설명을 참고하세요."
+)
+try:
+    proposed_config = json.loads(rules_text)
+    proposed = accrual.compile_rules(proposed_config)
+except (json.JSONDecodeError, accrual.RuleError) as e:
+    proposed = None
+    st.error(f"규칙 오류: {e}")
+
+# 규칙 변경 모의 계산 - 기간 내 거래를 한 번 펼쳐 두고 규칙만 바꿔 가며 다시 계산
+st.markdown("---")
+st.subheader("규칙 변경 모의 계산")
+
+index = get_transaction_index()
+bounds = index.bounds()
+if bounds is None:
+    st.info("거래 내역이 없습니다.")
+else:
+    last_date = datetime.strptime(bounds[1], "%Y-%m-%d").date()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        start_date = st.date_input("시작일", max(last_date - timedelta(days=364),
+                                                  datetime.strptime(bounds[0], "%Y-%m-%d").date()))
+    with col2:
+        end_date = st.date_input("종료일", last_date)
+    with col3:
+        baseline_mode = st.radio("비교 기준", ["현재 규칙", "기록된 적립 포인트"], horizontal=True)
+
+    if proposed is not None and st.button("모의 계산"):
+        start, end = start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+        started = time.perf_counter()
+
+        # 펼친 거래 배열은 기간과 데이터가 같으면 재사용
+        cache_key = (data_version('transactions'), data_version('customers'), start, end)
+        cached = st.session_state.get('accrual_lines')
+        if cached is None or cached[0] != cache_key:
+            transactions = get_transactions()
+            selected = [transactions[position] for position in index.range(start, end)]
+            cached = st.session_state.accrual_lines = (
+                cache_key, selected, accrual.flatten_lines(selected, get_customers())
+            )
+        _, selected, lines = cached
+
+        items = get_items()
+        if baseline_mode == "현재 규칙":
+            before = get_point_rules().evaluate(lines, items)
+        else:
+            before = accrual.recorded_points(selected)
+        after = proposed.evaluate(lines, items)
+        elapsed = time.perf_counter() - started
+
+        total_before, total_after = int(before.sum()), int(after.sum())
+        change = (total_after - total_before) / total_before * 100 if total_before else 0.0
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("거래 수", f"{len(selected):,}")
+        col2.metric("기존 적립 합계", f"{total_before:,}")
+        col3.metric("새 규칙 적립 합계", f"{total_after:,}", f"{change:+.1f}%")
+        col4.metric("계산 시간", f"{elapsed:.2f}초")
+
+        if selected:
+            import numpy as np
+            import pandas as pd  # 결과 표시 시에만 필요하므로 지연 로드
+
+            result_df = pd.DataFrame({
+                "month": lines["dates"].astype("U7"),  # "YYYY-MM"
+                "tier": np.array(lines["tiers"], dtype=object)[lines["tier_index"]],
+                "customer_id": [transaction.get("customer_id", "") for transaction in selected],
+                "customer_name": [transaction.get("customer_name", "") for transaction in selected],
+                "before": before,
+                "after": after,
+            })
+            result_df["tier"] = result_df["tier"].replace("", "일반")
+
+            st.markdown("#### 월별 적립 포인트")
+            monthly = result_df.groupby("month")[["before", "after"]].sum()
+            st.bar_chart(monthly.rename(columns={"before": "기존", "after": "새 규칙"}))
+
+            st.markdown("#### 등급별")
+            by_tier = result_df.groupby("tier")[["before", "after"]].sum().reset_index()
+            by_tier["difference"] = by_tier["after"] - by_tier["before"]
+            st.dataframe(by_tier.rename(columns={
+                "tier": "등급", "before": "기존", "after": "새 규칙", "difference": "증감"
+            }), use_container_width=True, hide_index=True)
+
+            st.markdown("#### 적립 변화가 큰 거래처")
+            by_customer = result_df.groupby(["customer_id", "customer_name"])[["before", "after"]].sum()
+            by_customer["difference"] = by_customer["after"] - by_customer["before"]
+            top = by_customer.reindex(by_customer["difference"].abs().sort_values(ascending=False).index).head(20)
+            st.dataframe(top.reset_index().rename(columns={
+                "customer_id": "사업자번호/핸드폰번호", "customer_name": "거래처명",
+                "before": "기존", "after": "새 규칙", "difference": "증감"
+            }), use_container_width=True, hide_index=True)
+
+# 규칙 저장 - 이후 거래 등록(화면/API)부터 적용
+st.markdown("---")
+if st.button("규칙 저장", disabled=proposed is None):
+    with storage.locked():
+        save_point_rules(proposed_config)
+    st.success("적립 규칙이 저장되었습니다. 이후 등록하는 거래부터 적용됩니다.")
+
+finish_page()
@@ -0,0 +1,107 @@
+from datetime import datetime
+
+import streamlit as st
+
+import reconcile
+import storage
+from common import (
+    setup_page, finish_page, get_transactions, get_transaction_index, is_api_connected, save_transactions,
+    data_version,
+)
+
+# 페이지 설정
+setup_page("이카운트 대사")
+
+st.subheader("이카운트 대사")
+st.caption("기간 내 로컬 거래와 이카운트 판매 전표를 전표 번호로 비교합니다. "
+           "전표 번호가 없는 거래는 일자/거래처/품목이 같은 전표를 찾아 연결할 수 있습니다.")
+
+try:
+    reconcile.check_sale_list()
+except reconcile.SaleListUnavailable as e:
+    st.warning(str(e))
+    finish_page()
+    st.stop()
+
+if not is_api_connected():
+    st.warning("이카운트 API 연동이 필요합니다. 품목 관리 화면의 API 설정에서 연동을 완료해주세요.")
+    finish_page()
+    st.stop()
+
+today = datetime.now().date()
+col1, col2 = st.columns(2)
+with col1:
+    start_date = st.date_input("시작일", today.replace(day=1))
+with col2:
+    end_date = st.date_input("종료일", today)
+start, end = start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+
+if st.button("대사 실행"):
+    is_test = bool(st.session_state.get('test_session_id'))
+    session_id = st.session_state.get('test_session_id') or st.session_state.get('api_session_id')
+    try:
+        with st.spinner("이카운트 판매 전표를 불러오는 중입니다..."):
+            slips = reconcile.group_slips(
+                reconcile.fetch_remote_sales(session_id, st.session_state.zone, is_test, start, end)
+            )
+    except reconcile.FetchError as e:
+        st.error(str(e))
+    else:
+        report = reconcile.reconcile(get_transactions(), slips, get_transaction_index().range(start, end))
+        st.session_state.reconcile_report = ((start, end, data_version('transactions')), len(slips), report)
+
+cached = st.session_state.get('reconcile_report')
+if cached is not None and cached[0][:2] == (start, end):
+    _, slip_count, report = cached
+    counts = report["counts"]
+    st.caption(f"이카운트 전표 {slip_count:,}건")
+    columns = st.columns(len(reconcile.STATUS_LABELS))
+    for column, (status, label) in zip(columns, reconcile.STATUS_LABELS.items()):
+        column.metric(label, f"{counts.get(status, 0):,}")
+
+    if cached[0][2] != data_version('transactions'):
+        st.info("대사 후 거래 내역이 바뀌었습니다. 다시 실행하면 최신 내역으로 비교합니다.")
+    elif report["links"]:
+        if st.button(f"전표 번호 미기록 거래 {len(report['links']):,}건에 전표 번호 기록"):
+            with storage.locked():
+                transactions = get_transactions()
+                # 대사한 뒤 다른 세션/API 서버가 거래를 바꿨으면 위치가 달라질 수 있으므로 기록하지 않음
+                unchanged = cached[0][2] == data_version('transactions')
+                if unchanged:
+                    linked = reconcile.link_slips(transactions, report["links"])
+                    save_transactions()
+            st.session_state.pop('reconcile_report', None)
+            if unchanged:
+                st.success(f"거래 {linked:,}건에 전표 번호를 기록했습니다.")
+            else:
+                st.error("대사 후 거래 내역이 바뀌었습니다. 대사를 다시 실행해주세요.")
+
+    problem_rows = [row for row in report["rows"] if row["status"] != reconcile.STATUS_MATCHED]
+    if problem_rows:
+        import pandas as pd  # 보고서 표시 시에만 필요하므로 지연 로드
+
+        show_all = st.checkbox("일치한 거래도 표시")
+        report_df = pd.DataFrame(report["rows"] if show_all else problem_rows, columns=reconcile.REPORT_COLUMNS)
+        report_df["status"] = report_df["status"].map(reconcile.STATUS_LABELS)
+        report_df = report_df.rename(columns={
+            "status": "상태",
+            "slip_no": "전표 번호",
+            "date": "거래일자",
+            "customer_id": "사업자번호/핸드폰번호",
+            "customer_name": "거래처명",
+            "local_supply": "공급가액(로컬)",
+            "remote_supply": "공급가액(이카운트)",
+            "transaction_id": "거래 id",
+            "detail": "차이",
+        })
+        st.dataframe(report_df, use_container_width=True, hide_index=True)
+        st.download_button(
+            "대사 보고서 다운로드 (CSV)",
+            pd.DataFrame(report["rows"], columns=reconcile.REPORT_COLUMNS).to_csv(index=False).encode('utf-8-sig'),
+            file_name=f"ecount_reconcile_{start}_{end}.csv",
+            mime="text/csv"
+        )
+    else:
+        st.success("모든 거래가 이카운트 전표와 일치합니다.")
+
+finish_page()
@@ -0,0 +1,100 @@
+from datetime import datetime
+
+import streamlit as st
+
+import service
+import storage
+import stores
+from common import setup_page, finish_page, get_all_transactions, get_transaction_index, data_version
+
+# 페이지 설정
+setup_page("매장 관리")
+
+st.subheader("매장 관리")
+st.caption("매장별로 거래 내역, 품목, 이카운트 API 설정을 따로 저장합니다. 거래처와 포인트 잔액, 적립 규칙은 모든 매장이 함께 씁니다. "
+           "매장을 등록하면 사이드바에서 작업할 매장을 고를 수 있습니다.")
+
+# 매장 등록
+with st.form("store_registration"):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        new_store_code = st.text_input("매장 코드", help="영문/숫자/-/_ 32자 이내. 데이터 폴더 이름으로 쓰입니다.")
+    with col2:
+        new_store_name = st.text_input("매장 이름")
+    with col3:
+        new_com_code = st.text_input("이카운트 회사 코드", help="매장마다 이카운트 회사가 다르면 입력합니다.")
+
+    if st.form_submit_button("매장 등록"):
+        try:
+            with storage.locked():
+                registered = storage.load_stores()
+                stores.add_store(registered, new_store_code, new_store_name, new_com_code)
+                storage.save_stores(registered)
+        except service.ServiceError as e:
+            st.error(str(e))
+        else:
+            st.success(f"매장이 등록되었습니다: {stores.store_label(registered, new_store_code.strip())}")
+            st.rerun()
+
+import pandas as pd  # 표 표시에 필요하므로 등록 처리 후 로드
+
+registered = storage.load_stores()
+if registered:
+    st.dataframe(pd.DataFrame([
+        {
+            "매장 코드": code or "-",
+            "매장 이름": stores.store_label(registered, code),
+            "이카운트 회사 코드": registered.get(code, {}).get('com_code', ''),
+            "거래 내역 파일": storage.store_path(storage.TRANSACTIONS_FILE, code),
+        }
+        for code in storage.store_codes()
+    ]), use_container_width=True, hide_index=True)
+
+# 매장별 합계
+st.markdown("---")
+st.subheader("매장별 합계")
+today = datetime.now().date()
+col1, col2 = st.columns(2)
+with col1:
+    start_date = st.date_input("시작일", today.replace(day=1))
+with col2:
+    end_date = st.date_input("종료일", today)
+start, end = start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+
+# 매장별 색인은 각 매장 화면과 같은 세션 캐시를 쓴다
+by_store = get_all_transactions()
+indexes, versions = {}, []
+for code in by_store:
+    with storage.using_store(code):
+        indexes[code] = get_transaction_index()
+        versions.append((code, data_version('transactions')))
+cache_key = (start, end, tuple(versions))
+cached = st.session_state.get('store_summary')
+if cached is None or cached[0] != cache_key:
+    cached = st.session_state.store_summary = (cache_key, stores.summarize(by_store, start, end, indexes))
+rows, total = cached[1]
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("전체 거래", f"{total['transactions']:,}")
+col2.metric("전체 합계", f"{total['total_amount']:,.0f}")
+col3.metric("거래처", f"{total['customers']:,}")
+col4.metric("여러 매장 이용 거래처", f"{total['shared_customers']:,}")
+
+summary_df = pd.DataFrame(rows + [total], columns=stores.REPORT_COLUMNS).drop(columns=["store"]).rename(columns={
+    "store_name": "매장",
+    "transactions": "거래 수",
+    "customers": "거래처 수",
+    "shared_customers": "다른 매장도 이용",
+    "total_supply_value": "공급가액",
+    "total_amount": "합계",
+    "points": "적립 포인트",
+})
+st.dataframe(summary_df, use_container_width=True, hide_index=True)
+st.download_button(
+    "매장별 합계 다운로드 (CSV)",
+    pd.DataFrame(rows + [total], columns=stores.REPORT_COLUMNS).to_csv(index=False).encode('utf-8-sig'),
+    file_name=f"store_summary_{start}_{end}.csv",
+    mime="text/csv"
+)
+
+finish_page()
@@ -0,0 +1,314 @@
+"""로컬 거래와 이카운트 판매 전표 대사 (월말 마감용)
+
+    python -m reconcile --from 2025-01-01 --to 2025-01-31 --report reconcile.csv
+    python -m reconcile --from 2025-01-01 --to 2025-01-31 --link   # 일치하는 전표 번호를 거래에 기록
+    python -m reconcile --from 2025-01-01 --to 2025-01-31 --store GN01   # 등록한 매장 (매장의 API 설정/거래 내역)
+
+기간의 이카운트 판매 전표 줄을 페이지 단위로 동시에 받아 전표별로 묶고, 로컬 거래와 전표 번호(ecount_slip)로 비교한다.
+전표 번호가 없는 거래("거래 등록"으로만 저장한 거래)는 일자/거래처/품목이 같은 전표와 짝을 찾는다.
+판매 조회 API(Sale/GetSaleList)는 ecount_mock 모의 서버에만 있으므로, 이카운트 주소를 모의 서버로 바꾼 경우
+(CODAIPOINT_ECOUNT_BASE_URL)에만 실행하고 실제 서버 주소면 로그인 전에 SaleListUnavailable로 멈춘다.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import requests
+
+import ecount
+import metrics
+from customer_ids import normalize_customer_id
+
+SALE_LIST_PATH = "Sale/GetSaleList"
+PAGE_SIZE = 500  # 한 번에 받는 전표 줄 수
+WORKERS = 8  # 동시에 받는 페이지 수 (이카운트 호출 제한에 맞게 조정)
+MAX_RETRIES = 4  # 호출 제한(429)/서버 오류/제한 시간 초과 시 재시도 횟수
+RETRY_BACKOFF = 0.5  # 첫 재시도 대기 시간(초), 재시도마다 두 배
+
+STATUS_MATCHED = "matched"  # 전표 번호, 일자, 거래처, 품목이 모두 같음
+STATUS_MISMATCH = "mismatch"  # 전표 번호는 같지만 일자/거래처/품목이 다름
+STATUS_REMOTE_MISSING = "remote_missing"  # 전표 번호가 있는데 이카운트에 전표가 없음
+STATUS_UNLINKED = "unlinked"  # 전표 번호가 없지만 일자/거래처/품목이 같은 전표가 있음 (link_slips로 기록)
+STATUS_NOT_SENT = "not_sent"  # 전표 번호가 없고 같은 전표도 없음 (이카운트 미전송)
+STATUS_LOCAL_MISSING = "local_missing"  # 이카운트에만 있는 전표
+
+STATUS_LABELS = {
+    STATUS_MATCHED: "일치",
+    STATUS_MISMATCH: "불일치",
+    STATUS_REMOTE_MISSING: "이카운트 전표 없음",
+    STATUS_UNLINKED: "전표 번호 미기록",
+    STATUS_NOT_SENT: "미전송",
+    STATUS_LOCAL_MISSING: "로컬 거래 없음",
+}
+
+REPORT_COLUMNS = [
+    "status", "slip_no", "date", "customer_id", "customer_name", "local_supply", "remote_supply",
+    "transaction_id", "detail",
+]
+
+
+class FetchError(RuntimeError):
+    """이카운트 판매 조회 실패 (재시도 후에도 실패했거나 오류 응답)"""
+
+
+class SaleListUnavailable(FetchError):
+    """판매 조회 API가 없는 서버(실제 이카운트 서버)로 대사하려 함"""
+
+
+def check_sale_list():
+    """판매 조회 API를 쓸 수 있는지 확인. 이카운트 주소가 모의 서버로 바뀌지 않았으면 SaleListUnavailable"""
+    if not os.environ.get(ecount.BASE_URL_ENV):
+        raise SaleListUnavailable(
+            f"판매 조회 API({SALE_LIST_PATH})는 이카운트 모의 서버(ecount_mock)에만 있어 실제 이카운트 서버로는 "
+            f"대사할 수 없습니다. {ecount.BASE_URL_ENV}에 모의 서버 주소를 지정한 경우에만 실행합니다."
+        )
+
+
+def _fetch_page(url, body):
+    error = None
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+        try:
+            response = ecount.call_api("GetSaleList", url, json=body)
+        except requests.RequestException as e:
+            error = f"{type(e).__name__}: {e}"
+            continue
+        if response.status_code in (429, 500, 502, 503, 504):
+            error = f"HTTP {response.status_code}"
+            continue
+        if response.status_code != 200:
+            raise FetchError(f"판매 조회 실패: HTTP {response.status_code} - {response.text[:200]}")
+        data = response.json()
+        if data.get("Error"):
+            raise FetchError(f"판매 조회 오류: {data['Error'].get('Message', '알 수 없는 오류')}")
+        return data["Data"]
+    raise FetchError(f"판매 조회 {body.get('PAGE_NO')}페이지를 {MAX_RETRIES}번 재시도했지만 실패했습니다: {error}")
+
+
+@metrics.timed("reconcile.fetch")
+def fetch_remote_sales(session_id, zone, is_test, start, end, page_size=PAGE_SIZE, workers=WORKERS):
+    """기간(start~end, "YYYY-MM-DD")의 이카운트 판매 전표 줄 목록
+
+    첫 페이지로 전체 줄 수를 확인한 뒤 나머지 페이지를 workers개씩 동시에 받는다.
+    """
+    check_sale_list()
+    url = f"{ecount.api_url(SALE_LIST_PATH, zone, is_test)}?SESSION_ID={session_id}"
+    body = {"FROM_DATE": start.replace("-", ""), "TO_DATE": end.replace("-", ""), "PAGE_SIZE": page_size}
+    first = _fetch_page(url, {**body, "PAGE_NO": 1})
+    rows = list(first.get("Result") or [])
+    pages = -(-int(first.get("TotalCnt") or 0) // page_size)
+    if pages > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(lambda page: _fetch_page(url, {**body, "PAGE_NO": page}), range(2, pages + 1)):
+                rows.extend(result.get("Result") or [])
+    return rows
+
+
+def _number(value):
+    try:
+        return int(float(value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def group_slips(rows):
+    """전표 줄 목록을 전표 번호별로 {전표 번호: {"date", "customer_id", "customer_name", "lines", "supply"}}
+
+    lines는 (품목코드, 수량, 단가) 정렬 목록, 일자는 "YYYY-MM-DD".
+    """
+    slips = {}
+    for row in rows:
+        slip = slips.get(row["SLIP_NO"])
+        if slip is None:
+            io_date = str(row.get("IO_DATE", ""))
+            slip = slips[row["SLIP_NO"]] = {
+                "date": f"{io_date[:4]}-{io_date[4:6]}-{io_date[6:8]}",
+                "customer_id": str(row.get("CUST", "")),
+                "customer_name": row.get("CUST_DES", ""),
+                "lines": [],
+                "supply": 0,
+            }
+        slip["lines"].append((row.get("PROD_CD", ""), _number(row.get("QTY")), _number(row.get("PRICE"))))
+        slip["supply"] += _number(row.get("SUPPLY_AMT"))
+    for slip in slips.values():
+        slip["lines"].sort()
+    return slips
+
+
+def _local_lines(transaction):
+    return sorted(
+        (line["item_code"], _number(line["quantity"]), _number(line["price"])) for line in transaction.get("items", [])
+    )
+
+
+def _differences(transaction, lines, slip, normalize):
+    differences = []
+    if transaction.get("date") != slip["date"]:
+        differences.append(f"일자 {transaction.get('date')} / {slip['date']}")
+    if normalize(transaction.get("customer_id", "")) != normalize(slip["customer_id"]):
+        differences.append(f"거래처 {transaction.get('customer_id')} / {slip['customer_id']}")
+    if lines != slip["lines"]:
+        local, remote = Counter(lines), Counter(slip["lines"])
+        only_local = sorted((local - remote).elements())
+        only_remote = sorted((remote - local).elements())
+        differences.append(f"품목 로컬에만 {only_local} / 이카운트에만 {only_remote}")
+    return differences
+
+
+@metrics.timed("reconcile.diff")
+def reconcile(transactions, slips, positions=None):
+    """로컬 거래와 이카운트 전표(group_slips 결과) 비교. positions는 비교할 거래 위치 (예: 기간 색인 결과, 없으면 전체)
+
+    대사 보고서 {"counts": {상태: 건수}, "rows": [REPORT_COLUMNS], "links": {거래 위치: 전표 번호}}를 반환.
+    links는 전표 번호가 없는 거래와 짝이 맞는 전표 (link_slips로 기록, id가 없는 이전 거래도 있어 위치로 기록).
+    """
+    rows = []
+    links = {}
+    seen = set()
+    unsent = []
+    normalize = lru_cache(maxsize=None)(normalize_customer_id)  # 같은 거래처 번호가 반복되므로 이번 대사 동안만 기억
+
+    def add(status, transaction=None, slip_no="", slip=None, detail=""):
+        source = transaction or slip
+        rows.append({
+            "status": status,
+            "slip_no": slip_no,
+            "date": source.get("date", ""),
+            "customer_id": source.get("customer_id", ""),
+            "customer_name": source.get("customer_name", ""),
+            "local_supply": transaction.get("total_supply_value") if transaction else None,
+            "remote_supply": slip["supply"] if slip else None,
+            "transaction_id": transaction.get("id", "") if transaction else "",
+            "detail": detail,
+        })
+
+    for position in range(len(transactions)) if positions is None else positions:
+        transaction = transactions[position]
+        slip_no = transaction.get("ecount_slip")
+        lines = _local_lines(transaction)
+        if not slip_no:
+            unsent.append((position, transaction, lines))
+            continue
+        slip = slips.get(slip_no)
+        if slip is None:
+            add(STATUS_REMOTE_MISSING, transaction, slip_no)
+            continue
+        seen.add(slip_no)
+        differences = _differences(transaction, lines, slip, normalize)
+        add(STATUS_MISMATCH if differences else STATUS_MATCHED, transaction, slip_no, slip, "; ".join(differences))
+
+    # 전표 번호가 없는 거래는 아직 짝이 없는 전표 중 일자/거래처/품목이 같은 전표와 연결
+    candidates = {}
+    for slip_no, slip in slips.items():
+        if slip_no not in seen:
+            key = (slip["date"], normalize(slip["customer_id"]), tuple(slip["lines"]))
+            candidates.setdefault(key, []).append(slip_no)
+    for position, transaction, lines in unsent:
+        key = (transaction.get("date"), normalize(transaction.get("customer_id", "")), tuple(lines))
+        matches = candidates.get(key)
+        if matches:
+            slip_no = matches.pop(0)
+            seen.add(slip_no)
+            links[position] = slip_no
+            add(STATUS_UNLINKED, transaction, slip_no, slips[slip_no])
+        else:
+            add(STATUS_NOT_SENT, transaction)
+
+    for slip_no, slip in slips.items():
+        if slip_no not in seen:
+            add(STATUS_LOCAL_MISSING, slip_no=slip_no, slip=slip)
+
+    rows.sort(key=lambda row: (row["date"], row["status"], row["slip_no"]))
+    return {"counts": dict(Counter(row["status"] for row in rows)), "rows": rows, "links": links}
+
+
+def link_slips(transactions, links):
+    """reconcile()의 {거래 위치: 전표 번호}를 거래의 ecount_slip으로 기록. 기록한 거래 수를 반환
+
+    위치는 대사할 때의 거래 목록 기준이므로 그 사이 거래 내역이 바뀌지 않았을 때만 호출한다.
+    """
+    linked = 0
+    for position, slip_no in links.items():
+        transaction = transactions[position]
+        if transaction.get("ecount_slip") != slip_no:
+            transaction["ecount_slip"] = slip_no
+            linked += 1
+    return linked
+
+
+def write_report(report, path):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:  # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(report["rows"])
+
+
+def _run(args):
+    """현재 매장의 API 설정으로 로그인해 대사. (보고서, 전표 수, 기간 거래 수, 전표 번호를 기록한 거래 수)"""
+    import storage
+    from history import TransactionIndex
+
+    try:
+        check_sale_list()
+    except SaleListUnavailable as e:
+        sys.exit(str(e))
+    api_config = storage.load_api_config()
+    try:
+        zone = ecount.request_zone(api_config.get("CODE", ""))
+        session_id = ecount.request_session_id(
+            api_config.get("CODE", ""), api_config.get("ID", ""),
+            api_config.get("TestKey" if args.test else "APIKey", ""), zone, is_test=args.test
+        )
+    except ecount.LoginError as e:
+        sys.exit(f"이카운트 로그인에 실패했습니다 ({e}). "
+                 f"API 설정({storage.store_path(storage.API_CONFIG_FILE)})을 확인해주세요.")
+
+    slips = group_slips(fetch_remote_sales(session_id, zone, args.test, args.start, args.end, workers=args.workers))
+    with storage.locked():
+        transactions = storage.load_transactions()
+        positions = TransactionIndex(transactions).range(args.start, args.end)
+        report = reconcile(transactions, slips, positions)
+        linked = link_slips(transactions, report["links"]) if args.link else 0
+        if linked:
+            storage.save_transactions(transactions)
+    return report, len(slips), len(positions), linked
+
+
+def main():
+    import storage
+
+    parser = argparse.ArgumentParser(description="로컬 거래와 이카운트 판매 전표 대사")
+    parser.add_argument("--from", dest="start", required=True, help="시작일 (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", required=True, help="종료일 (YYYY-MM-DD)")
+    parser.add_argument("--store", help="매장 코드 (생략 시 기본 매장). 그 매장의 API 설정과 거래 내역을 씀")
+    parser.add_argument("--report", help="대사 결과 CSV 경로")
+    parser.add_argument("--link", action="store_true", help="전표 번호가 없는 거래에 짝이 맞는 전표 번호를 기록")
+    parser.add_argument("--test", action="store_true", help="TestKey로 로그인 (sboapi)")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    try:
+        with storage.using_store(args.store):
+            report, slip_count, transaction_count, linked = _run(args)
+    except storage.StoreError as e:
+        sys.exit(str(e))
+
+    if args.report:
+        write_report(report, args.report)
+    summary = ", ".join(f"{STATUS_LABELS[status]} {count:,}" for status, count in sorted(report["counts"].items()))
+    print(
+        f"{f'[{args.store}] ' if args.store else ''}{args.start} ~ {args.end}: 이카운트 전표 {slip_count:,}건, "
+        f"거래 {transaction_count:,}건 ({summary})",
+        file=sys.stderr
+    )
+    if linked:
+        print(f"거래 {linked:,}건에 전표 번호를 기록했습니다.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""데이터 파일 직렬화 형식 (JSON / 빠른 JSON / MessagePack, 선택적 압축)
+
+형식 이름은 "직렬화[+압축]" 으로 쓴다. 예: "json", "orjson", "msgpack+gzip", "msgpack+zstd"
+
+- JSON 계열은 머리말 없이 일반 JSON으로 저장하므로 이전 버전 앱에서도 그대로 읽힌다.
+- 그 외 형식은 파일 앞에 머리말(MAGIC, 파일 형식 버전, 직렬화/압축 코드)을 붙인다.
+- 읽을 때는 머리말 유무로 형식을 자동 판별하므로 기존 JSON 파일도 계속 읽을 수 있다.
+"""
+import gc
+import gzip
+import json
+import struct
+import threading
+from contextlib import contextmanager
+
+try:
+    import orjson  # 빠른 JSON 인코더 (선택 설치)
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack  # 바이너리 형식 (선택 설치)
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard  # zstd 압축 (선택 설치)
+except ImportError:
+    zstandard = None
+
+MAGIC = b"CDPT"
+FILE_VERSION = 1
+_HEADER = struct.Struct(">4sBBB")  # MAGIC, 파일 형식 버전, 직렬화 코드, 압축 코드
+
+GZIP_LEVEL = 1  # 저장 속도 우선 (6 이상은 크기 차이에 비해 저장이 크게 느려짐)
+ZSTD_LEVEL = 3
+
+
+class FormatError(ValueError):
+    """지원하지 않거나 읽을 수 없는 데이터 파일 형식"""
+
+
+def _json_dumps(data):
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _json_loads(payload):
+    return json.loads(payload.decode('utf-8'))
+
+
+def _orjson_dumps(data):
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _msgpack_dumps(data):
+    return msgpack.packb(data, use_bin_type=True)
+
+
+def _msgpack_loads(payload):
+    return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+
+# 이름 -> (파일 머리말 코드, 저장 함수, 읽기 함수, 사용 가능 여부). 코드는 파일에 기록되므로 바꾸지 않는다
+SERIALIZERS = {
+    'json': (0, _json_dumps, _json_loads, lambda: True),
+    'orjson': (1, _orjson_dumps, lambda payload: orjson.loads(payload), lambda: orjson is not None),
+    'msgpack': (2, _msgpack_dumps, _msgpack_loads, lambda: msgpack is not None),
+}
+
+COMPRESSIONS = {
+    'none': (0, lambda payload: payload, lambda payload: payload, lambda: True),
+    'gzip': (1, lambda payload: gzip.compress(payload, compresslevel=GZIP_LEVEL, mtime=0), gzip.decompress,
+             lambda: True),
+    'zstd': (2, lambda payload: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload),
+             lambda payload: zstandard.ZstdDecompressor().decompress(payload), lambda: zstandard is not None),
+}
+
+_SERIALIZER_CODES = {entry[0]: name for name, entry in SERIALIZERS.items()}
+_COMPRESSION_CODES = {entry[0]: name for name, entry in COMPRESSIONS.items()}
+_PLAIN_JSON = ('json', 'orjson')
+
+
+def parse_format(name):
+    """형식 이름을 (직렬화, 압축)으로 검사하여 반환"""
+    serializer, _, compression = (name or 'json').strip().lower().partition('+')
+    compression = compression or 'none'
+    if serializer not in SERIALIZERS:
+        raise FormatError(f"알 수 없는 직렬화 형식: {serializer}")
+    if compression not in COMPRESSIONS:
+        raise FormatError(f"알 수 없는 압축 형식: {compression}")
+    if not SERIALIZERS[serializer][3]():
+        raise FormatError(f"{serializer} 형식을 쓰려면 패키지를 설치해야 합니다: pip install {serializer}")
+    if not COMPRESSIONS[compression][3]():
+        raise FormatError(f"{compression} 압축을 쓰려면 패키지를 설치해야 합니다: pip install zstandard")
+    return serializer, compression
+
+
+def format_name(serializer, compression):
+    return serializer if compression == 'none' else f"{serializer}+{compression}"
+
+
+def normalize_format(name):
+    """형식 이름을 검사하여 표준 표기로 반환 (예: "MsgPack+none" -> "msgpack")"""
+    return format_name(*parse_format(name))
+
+
+def default_format():
+    """별도 지정이 없을 때의 저장 형식 (orjson이 있으면 빠른 JSON, 없으면 표준 JSON)"""
+    return 'orjson' if orjson is not None else 'json'
+
+
+def dumps(data, fmt):
+    """data를 fmt 형식의 파일 내용(bytes)으로 변환"""
+    serializer, compression = parse_format(fmt)
+    ser_code, encode, _, _ = SERIALIZERS[serializer]
+    comp_code, compress, _, _ = COMPRESSIONS[compression]
+    payload = encode(data)
+    if serializer in _PLAIN_JSON and compression == 'none':
+        return payload
+    return _HEADER.pack(MAGIC, FILE_VERSION, ser_code, comp_code) + compress(payload)
+
+
+def detect(content):
+    """파일 내용의 형식 이름 (머리말이 없으면 일반 JSON)"""
+    if not content.startswith(MAGIC):
+        return 'json'
+    if len(content) < _HEADER.size:
+        raise FormatError("데이터 파일 머리말이 잘렸습니다")
+    _, version, ser_code, comp_code = _HEADER.unpack_from(content)
+    if version > FILE_VERSION:
+        raise FormatError(f"이 버전에서 읽을 수 없는 데이터 파일 형식 버전입니다: {version}")
+    if ser_code not in _SERIALIZER_CODES or comp_code not in _COMPRESSION_CODES:
+        raise FormatError(f"알 수 없는 데이터 파일 형식 코드: {ser_code}/{comp_code}")
+    return format_name(_SERIALIZER_CODES[ser_code], _COMPRESSION_CODES[comp_code])
+
+
+_gc_lock = threading.Lock()
+_gc_pauses = 0  # 진행 중인 읽기 수 (GC는 프로세스 전체 설정이므로 스레드끼리 함께 센다)
+_gc_was_enabled = False
+
+
+@contextmanager
+def _gc_paused():
+    # 읽은 데이터에는 순환 참조가 없으므로, 객체를 대량으로 만드는 동안 순환 GC가 반복 실행되지 않게 한다.
+    # 여러 스레드(API 요청, Streamlit 세션)가 동시에 읽으면 처음 시작한 읽기가 끄고 마지막으로 끝난 읽기가 다시 켠다.
+    global _gc_pauses, _gc_was_enabled
+    with _gc_lock:
+        if _gc_pauses == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_was_enabled:
+                gc.enable()
+
+
+def loads(content):
+    """파일 내용(bytes)을 형식을 판별하여 읽음"""
+    with _gc_paused():
+        return _loads(content)
+
+
+def _loads(content):
+    if not content.startswith(MAGIC):
+        # 머리말 없는 파일은 일반 JSON (이전 버전에서 만든 파일 포함)
+        if orjson is not None:
+            try:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
+                pass  # NaN 등 orjson이 받지 않는 표준 json 출력은 아래에서 읽는다
+        return _json_loads(content)
+    serializer, compression = parse_format(detect(content))
+    payload = COMPRESSIONS[compression][2](content[_HEADER.size:])
+    return SERIALIZERS[serializer][2](payload)
@@ -0,0 +1,396 @@
+"""거래 등록, 포인트 사용/조회 등 화면과 무관한 핵심 로직
+
+Streamlit 화면(app.py, pages/)과 API 서버(api.py)가 함께 사용한다.
+함수들은 메모리의 customers/transactions 데이터를 변경만 하고, 저장은 호출하는 쪽에서 한다.
+"""
+import uuid
+from bisect import bisect_right
+from datetime import date as Date, datetime, timedelta
+from operator import itemgetter
+
+import metrics
+from customer_ids import normalize_customer_id
+
+VAT_RATE = 0.1
+POINT_RATE = 0.01  # 총액의 1% 적립
+POINT_VALID_DAYS = 365  # 적립일로부터 1년이 지나면 소멸 (expiry.py)
+POINT_NOTICE_DAYS = 30  # 며칠 안에 소멸하는 포인트를 "소멸 예정"으로 안내할지
+
+# 포인트 묶음 [적립일 "YYYY-MM-DD", 남은 포인트, 적립 출처] 의 출처 (거래로 적립한 묶음은 거래 id)
+LOT_INITIAL = "initial"  # 거래처 등록 시 초기 포인트
+LOT_ADJUST = "adjust"  # 거래처 관리 화면에서 직접 수정
+LOT_OPENING = "opening"  # 묶음 관리 이전부터 있던 잔액
+
+
+class ServiceError(ValueError):
+    """입력 값이나 데이터 상태 때문에 처리할 수 없는 요청"""
+
+
+class NotFoundError(ServiceError):
+    """등록되지 않은 거래처/품목"""
+
+
+def calc_points(total_amount):
+    """적립 포인트 계산 (총액의 1%)"""
+    return int(total_amount * POINT_RATE)
+
+
+def make_line(item_code, item_name, quantity, price):
+    """품목 한 줄의 공급가액/부가세/합계 계산"""
+    supply_value = quantity * price
+    vat = supply_value * VAT_RATE
+    return {
+        "item_code": item_code,
+        "item_name": item_name,
+        "quantity": quantity,
+        "price": price,
+        "supply_value": supply_value,
+        "vat": vat,
+        "total": supply_value + vat
+    }
+
+
+def _today():
+    return Date.today().strftime("%Y-%m-%d")
+
+
+def point_lots(customer):
+    """거래처의 포인트 묶음 목록 (적립일 순, 먼저 적립한 포인트부터 사용/소멸)
+
+    잔액('points')이 0 이상이면 묶음의 남은 포인트 합계와 같다.
+    묶음이 없는 이전 데이터는 현재 잔액 전체를 오늘 적립한 묶음으로 본다.
+    """
+    lots = customer.get('lots')
+    if lots is None:
+        points = customer.get('points', 0)
+        lots = customer['lots'] = [[_today(), points, LOT_OPENING]] if points > 0 else []
+    return lots
+
+
+def add_points(customer, points, date, source):
+    """포인트 적립. 잔액이 음수였던 만큼은 묶음에 넣지 않는다"""
+    lots = point_lots(customer)
+    before = customer.get('points', 0)
+    customer['points'] = before + points
+    amount = max(customer['points'], 0) - max(before, 0)
+    if amount > 0:
+        lots.insert(bisect_right(lots, date, key=itemgetter(0)), [date, amount, source])
+
+
+def consume_points(customer, points):
+    """먼저 적립한 묶음부터 차감 (잔액이 부족하면 잔액은 음수가 되고 묶음은 모두 사라짐)"""
+    lots = point_lots(customer)
+    remaining = points
+    emptied = 0
+    for lot in lots:
+        if remaining <= 0:
+            break
+        taken = min(lot[1], remaining)
+        lot[1] -= taken
+        remaining -= taken
+        if lot[1] == 0:
+            emptied += 1
+    del lots[:emptied]
+    customer['points'] = customer.get('points', 0) - points
+
+
+def expiring_points(customer, as_of, days=0):
+    """as_of("YYYY-MM-DD")로부터 days일 안에 소멸하는(또는 이미 소멸 대상인) 포인트"""
+    cutoff = expiry_cutoff(as_of, days)
+    return sum(lot[1] for lot in point_lots(customer) if lot[0] <= cutoff)
+
+
+def expiry_cutoff(as_of, days=0):
+    """as_of + days일 기준으로 소멸 대상이 되는 마지막 적립일 ("YYYY-MM-DD")"""
+    as_of_date = datetime.strptime(as_of, "%Y-%m-%d").date()
+    return (as_of_date + timedelta(days=days - POINT_VALID_DAYS)).strftime("%Y-%m-%d")
+
+
+def migrate_point_lots(customers, transactions, today=None):
+    """묶음이 없는 거래처의 잔액을 거래 내역으로 적립일별 묶음으로 나눈다. 변환한 거래처 수를 반환
+
+    거래 적립 포인트 중 이미 사용한 만큼은 오래된 거래부터 뺀 것으로 보고,
+    잔액이 거래 적립 합계보다 많으면(초기 포인트 등) 그 차이는 today에 적립한 묶음으로 둔다.
+    """
+    pending = {customer_id for customer_id, info in customers.items() if 'lots' not in info}
+    if not pending:
+        return 0
+
+    earned = {customer_id: [] for customer_id in pending}
+    for transaction in transactions:
+        customer_id = transaction.get('customer_id')
+        if customer_id in earned and transaction.get('points', 0) > 0:
+            earned[customer_id].append([transaction['date'], transaction['points'], transaction.get('id', "")])
+
+    today = today or _today()
+    for customer_id in pending:
+        customer = customers[customer_id]
+        balance = customer.get('points', 0)
+        lots = sorted(earned[customer_id], key=itemgetter(0))
+        customer['lots'] = lots
+        customer['points'] = sum(lot[1] for lot in lots)
+        if balance >= customer['points']:
+            add_points(customer, balance - customer['points'], today, LOT_OPENING)
+        else:
+            consume_points(customer, customer['points'] - balance)
+    return len(pending)
+
+
+def resolve_customer_id(customers, customer_id, variants=None):
+    """입력한 번호의 거래처 키. 그대로 등록된 키가 없으면 표준 표기(customer_ids)를 쓴다
+
+    variants(customer_ids.variant_groups() 결과)를 주면 아직 표준 표기로 합치지 않은
+    이전 표기의 거래처도 찾는다.
+    """
+    if customer_id in customers:
+        return customer_id
+    key = normalize_customer_id(customer_id)
+    if key not in customers and variants and key in variants:
+        return variants[key][0]
+    return key
+
+
+def get_customer(customers, customer_id):
+    customer = customers.get(resolve_customer_id(customers, customer_id))
+    if customer is None:
+        raise NotFoundError(f"등록되지 않은 거래처입니다: {customer_id}")
+    return customer
+
+
+def _final_target(mapping, customer_id):
+    # A→B, B→C 처럼 이어진 경우 마지막 번호(C)로
+    seen = {customer_id}
+    target_id = mapping[customer_id]
+    while target_id in mapping and target_id not in seen:
+        seen.add(target_id)
+        target_id = mapping[target_id]
+    return target_id
+
+
+def merge_customers(customers, transactions, mapping):
+    """여러 거래처를 한 번에 합친다. mapping은 {합쳐질 번호: 남길 번호}
+
+    포인트 잔액은 더하고 묶음은 적립일 순으로 합치며, 거래처명/등급은 남길 거래처 값을 우선한다.
+    transactions가 있으면 합쳐진 번호의 거래를 한 번 훑어 남길 번호로 바꾼다. 바꾼 거래 수를 반환
+    """
+    mapping = {source_id: _final_target(mapping, source_id) for source_id in mapping}
+    for source_id, target_id in mapping.items():
+        if source_id == target_id or source_id not in customers:
+            continue
+        source = customers.pop(source_id)
+        if target_id not in customers:
+            customers[target_id] = source
+            continue
+        target = customers[target_id]
+        balance = target.get('points', 0) + source.get('points', 0)
+        lots = sorted(point_lots(target) + point_lots(source), key=itemgetter(0))
+        target['lots'] = lots
+        target['points'] = sum(lot[1] for lot in lots)
+        consume_points(target, target['points'] - balance)  # 음수 잔액이 있었던 만큼 차감
+        if target.get('name', 'Unknown') == 'Unknown' and source.get('name'):
+            target['name'] = source['name']
+        if not target.get('tier') and source.get('tier'):
+            target['tier'] = source['tier']
+
+    relinked = 0
+    for transaction in transactions or ():
+        target_id = mapping.get(transaction.get('customer_id'))
+        if target_id is not None and target_id != transaction['customer_id']:
+            transaction['customer_id'] = target_id
+            relinked += 1
+    return relinked
+
+
+def migrate_customer_ids(customers, transactions):
+    """표기만 다른 거래처 번호를 표준 표기로 합치고 거래 내역의 번호도 표준 표기로 바꾼다
+
+    (합쳐지거나 키가 바뀐 거래처 수, 번호가 바뀐 거래 수)를 반환
+    """
+    mapping = {}
+    for customer_id in customers:
+        key = normalize_customer_id(customer_id)
+        if key != customer_id:
+            mapping[customer_id] = key
+    for transaction in transactions:  # 거래처가 삭제된 거래도 표준 표기로
+        customer_id = transaction.get('customer_id')
+        if customer_id is not None and customer_id not in mapping:
+            key = normalize_customer_id(customer_id)
+            if key != customer_id:
+                mapping[customer_id] = key
+    merged = sum(1 for customer_id in mapping if customer_id in customers)
+    return merged, merge_customers(customers, transactions, mapping)
+
+
+def get_balance(customers, customer_id):
+    """거래처의 현재 적립 포인트"""
+    return get_customer(customers, customer_id).get('points', 0)
+
+
+@metrics.timed("search.customer_by_name")
+def find_customer_by_name(customers, name):
+    """거래처명(대소문자 무시)이 일치하는 (사업자번호, 거래처 정보) 목록"""
+    name = name.lower()
+    return [
+        (id_number, info) for id_number, info in customers.items()
+        if info.get('name', '').lower() == name
+    ]
+
+
+@metrics.timed("search.item")
+def find_item(items, search_term):
+    """품목코드 일치 또는 품목명에 검색어가 포함된 (품목코드, 품목 정보) 목록"""
+    matches = []
+
+    # 품목코드로 직접 검색
+    if search_term in items:
+        matches.append((search_term, items[search_term]))
+
+    # 품목명으로 검색
+    term = search_term.lower()
+    for code, info in items.items():
+        if code != search_term and term in info['name'].lower():
+            matches.append((code, info))
+
+    return matches
+
+
+def lines_from_items(items, entries):
+    """(품목코드, 수량, 단가) 목록을 품목 정보로 확인하여 make_line() 형식으로 변환"""
+    lines = []
+    for item_code, quantity, price in entries:
+        if item_code not in items:
+            raise NotFoundError(f"등록되지 않은 품목입니다: {item_code}")
+        if quantity <= 0 or price <= 0:
+            raise ServiceError(f"수량과 단가는 0보다 커야 합니다: {item_code}")
+        lines.append(make_line(item_code, items[item_code]['name'], quantity, price))
+    return lines
+
+
+def register_transaction(customers, transactions, customer_id, customer_name, date, lines, rules=None, items=None,
+                         slip_no=None):
+    """거래를 추가하고 포인트를 적립한다. 추가된 거래를 반환
+
+    lines는 make_line() 형식의 품목 목록, date는 "YYYY-MM-DD" 문자열.
+    rules(accrual.compile_rules() 결과)가 없으면 총액의 1%를 적립하고, 있으면 품목 분류 확인에 items를 쓴다.
+    slip_no는 이카운트로 전송한 거래의 판매 전표 번호 (대사용, reconcile.py)
+    """
+    if not customer_id or not customer_name:
+        raise ServiceError("거래처(고객명)와 사업자/핸드폰번호를 입력해주세요.")
+    if not lines:
+        raise ServiceError("최소한 하나의 유효한 품목을 입력해주세요.")
+    customer_id = resolve_customer_id(customers, customer_id)
+
+    total_supply_value = sum(line["supply_value"] for line in lines)
+    total_vat = sum(line["vat"] for line in lines)
+    total_amount = sum(line["total"] for line in lines)
+    if rules is None:
+        points = calc_points(total_amount)
+    else:
+        points = rules.basket_points(lines, items or {}, date, customers.get(customer_id, {}).get('tier', ''))
+
+    transaction = {
+        "id": uuid.uuid4().hex,
+        "date": date,
+        "customer_name": customer_name,
+        "customer_id": customer_id,
+        "items": list(lines),
+        "total_supply_value": total_supply_value,
+        "total_vat": total_vat,
+        "total_amount": total_amount,
+        "points": points
+    }
+    if slip_no:
+        transaction["ecount_slip"] = slip_no
+    transactions.append(transaction)
+
+    # 고객 정보 저장/업데이트
+    if customer_id not in customers:
+        customers[customer_id] = {
+            "name": customer_name,
+            "points": 0,
+            "lots": []
+        }
+    add_points(customers[customer_id], points, date, transaction["id"])
+    return transaction
+
+
+def use_points(customers, customer_id, points):
+    """포인트 사용. 사용 후 잔액을 반환"""
+    customer = get_customer(customers, customer_id)
+    if points <= 0:
+        raise ServiceError("사용할 포인트는 0보다 커야 합니다.")
+    if points > customer.get('points', 0):
+        raise ServiceError(f"적립 포인트가 부족합니다. (현재 {customer.get('points', 0):,} 점)")
+    consume_points(customer, points)
+    return customer['points']
+
+
+def set_points(customers, customer_id, points, date=None):
+    """잔액 직접 수정. 늘어난 만큼은 date(기본 오늘)에 적립한 묶음, 줄어든 만큼은 오래된 묶음부터 차감"""
+    customer = get_customer(customers, customer_id)
+    difference = points - customer.get('points', 0)
+    if difference > 0:
+        add_points(customer, difference, date or _today(), LOT_ADJUST)
+    elif difference < 0:
+        consume_points(customer, -difference)
+    return customer['points']
+
+
+def upsert_customer(customers, customer_id, name, initial_points=0, date=None):
+    """거래처 등록 또는 이름 수정. 새로 등록된 경우 True"""
+    if not customer_id or not name:
+        raise ServiceError("사업자번호/핸드폰번호와 거래처명을 모두 입력해주세요.")
+    customer_id = resolve_customer_id(customers, customer_id)
+    if customer_id in customers:
+        customers[customer_id]['name'] = name
+        return False
+    customers[customer_id] = {
+        "name": name,
+        "points": 0,
+        "lots": []
+    }
+    if initial_points > 0:
+        add_points(customers[customer_id], initial_points, date or _today(), LOT_INITIAL)
+    return True
+
+
+@metrics.timed("search.transaction")
+def find_transaction_index(transactions, date, customer_name):
+    """거래일자와 거래처명이 일치하는 첫 거래의 위치. 없으면 None"""
+    for idx, transaction in enumerate(transactions):
+        if transaction.get('date') == date and transaction.get('customer_name') == customer_name:
+            return idx
+    return None
+
+
+def locate_transaction(transactions, transaction, hint=None):
+    """transaction과 같은 거래의 현재 위치. hint 위치가 맞으면 바로 반환, 없으면 None"""
+    if hint is not None and hint < len(transactions) and transactions[hint] == transaction:
+        return hint
+    if transaction.get('id'):
+        for idx, candidate in enumerate(transactions):
+            if candidate.get('id') == transaction['id']:
+                return idx
+        return None
+    return find_transaction_index(transactions, transaction.get('date'), transaction.get('customer_name'))
+
+
+def delete_transaction(customers, transactions, index):
+    """거래 삭제 및 적립 포인트 차감. 삭제된 거래를 반환
+
+    그 거래로 적립한 묶음의 남은 포인트를 먼저 빼고, 이미 사용한 만큼은 오래된 묶음부터 차감한다.
+    """
+    transaction = transactions.pop(index)
+    customer_id = transaction.get('customer_id')
+    if customer_id in customers:
+        customer = customers[customer_id]
+        points = transaction.get('points', 0)
+        lots = point_lots(customer)
+        for position, lot in enumerate(lots):
+            if transaction.get('id') and lot[2] == transaction['id']:
+                removed = min(lots.pop(position)[1], points)
+                customer['points'] -= removed
+                points -= removed
+                break
+        consume_points(customer, points)
+    return transaction
@@ -0,0 +1,306 @@
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import catalog
+import metrics
+import serializers
+import service
+
+try:
+    import fcntl  # 프로세스 간 파일 잠금 (Linux/macOS)
+except ImportError:  # Windows 등에서는 프로세스 내 잠금만 사용
+    fcntl = None
+
+# 데이터 저장 파일 경로
+CUSTOMERS_FILE = 'customers.json'
+TRANSACTIONS_FILE = 'transactions.json'
+ITEMS_FILE = 'items.json'
+ITEMS_CATALOG_FILE = 'items.catalog'  # 품목 파일로 만든 읽기 전용 카탈로그 (catalog.py, 프로세스 간 공유)
+API_CONFIG_FILE = 'api_config.json'  # API 설정 파일
+POINT_RULES_FILE = 'point_rules.json'  # 포인트 적립 규칙 (accrual.py)
+LOCK_FILE = '.codaipoint.lock'  # UI와 API 서버가 함께 쓰는 잠금 파일
+STORES_FILE = 'stores.json'  # 매장 목록 {매장 코드: {"name", "com_code"}}
+STORES_DIR = 'stores'  # 매장별 데이터 폴더 (stores/<매장 코드>/)
+
+# 매장별로 나누는 파일 (거래처/적립 규칙/매장 목록은 모든 매장이 함께 씀). 기본 매장('')은 작업 폴더의 파일을 그대로 쓴다
+STORE_FILES = (TRANSACTIONS_FILE, ITEMS_FILE, ITEMS_CATALOG_FILE, API_CONFIG_FILE)
+DEFAULT_STORE = ''
+STORE_CODE_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,32}$')
+_current_store = ContextVar('codaipoint_store', default=DEFAULT_STORE)  # API 스레드풀에도 전달됨
+
+# 데이터 파일 저장 형식 (예: json, orjson, msgpack, msgpack+gzip). 읽을 때는 형식을 자동 판별한다
+DATA_FORMAT_ENV = 'CODAIPOINT_DATA_FORMAT'
+DATA_FORMAT = serializers.normalize_format(os.environ.get(DATA_FORMAT_ENV) or serializers.default_format())
+
+# 파일이 없을 때 생성할 기본값
+DEFAULT_API_CONFIG = {
+    "CODE": "",
+    "ID": "",
+    "TestKey": "",
+    "APIKey": ""
+}
+
+_thread_lock = threading.RLock()
+
+# 데이터 파일을 저장한 뒤 호출할 함수 목록 (경로를 받음). backup.py의 백그라운드 백업이 등록한다
+SAVE_LISTENERS = []
+
+
+@contextmanager
+def locked():
+    """데이터 파일을 읽고-수정하고-저장하는 동안 다른 스레드/프로세스의 쓰기를 막는 잠금"""
+    start = time.perf_counter()
+    with _thread_lock:
+        if fcntl is None:
+            metrics.record("storage.lock_wait", time.perf_counter() - start)
+            yield
+            return
+        with open(LOCK_FILE, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            metrics.record("storage.lock_wait", time.perf_counter() - start)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class StoreError(service.ServiceError):
+    """등록되지 않았거나 형식이 잘못된 매장 코드"""
+
+
+def current_store():
+    """현재 작업(Streamlit 페이지 실행, API 요청)의 매장 코드 (기본 매장은 '')"""
+    return _current_store.get()
+
+
+def _check_store(code):
+    code = code or DEFAULT_STORE
+    if code != DEFAULT_STORE and (not STORE_CODE_PATTERN.match(code) or code not in load_stores()):
+        raise StoreError(f"등록되지 않은 매장입니다: {code}")
+    return code
+
+
+def set_store(code):
+    """현재 실행의 매장을 바꿈 (Streamlit 페이지 실행마다 setup_page에서 호출)"""
+    _current_store.set(_check_store(code))
+
+
+@contextmanager
+def using_store(code):
+    """with 블록 안에서만 code 매장의 데이터 파일을 씀"""
+    token = _current_store.set(_check_store(code))
+    try:
+        yield
+    finally:
+        _current_store.reset(token)
+
+
+def store_path(file_name, store=None):
+    """현재 매장(또는 store)의 데이터 파일 경로. 매장별 파일이 아니면 그대로"""
+    store = current_store() if store is None else store
+    if not store or file_name not in STORE_FILES:
+        return file_name
+    return os.path.join(STORES_DIR, store, file_name)
+
+
+def store_codes():
+    """기본 매장('')을 포함한 매장 코드 목록"""
+    return [DEFAULT_STORE] + sorted(load_stores())
+
+
+def file_version(path):
+    """파일 변경 여부 판단용 값 (수정 시각, 크기). 파일이 없으면 None"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _load_json(path, default, fmt=None):
+    """파일이 없으면 기본값으로(fmt 형식) 생성한 뒤 읽어오는 함수. 읽을 때는 형식을 자동 판별"""
+    if not os.path.exists(path):
+        _save_json(path, default, fmt)
+
+    with metrics.timer("storage.load", file=os.path.basename(path)):
+        with open(path, 'rb') as f:
+            return serializers.loads(f.read())
+
+
+def _save_json(path, data, fmt=None):
+    fmt = fmt or DATA_FORMAT
+    with metrics.timer("storage.save", file=os.path.basename(path), format=fmt):
+        _write_file(path, serializers.dumps(data, fmt))
+
+
+def _write_file(path, content):
+    # 임시 파일에 쓴 뒤 교체하여 다른 프로세스가 쓰다 만 파일을 읽지 않도록 한다
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)  # 처음 쓰는 매장 폴더
+    tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    for listener in SAVE_LISTENERS:
+        listener(path)
+
+
+def load_customers():
+    customers = _load_json(CUSTOMERS_FILE, {})
+
+    # 고객 데이터 구조 확인 및 수정
+    for customer_id, info in customers.items():
+        if isinstance(info, int):
+            customers[customer_id] = {
+                "name": "Unknown",
+                "points": info
+            }
+
+    # 포인트 묶음이 없는 이전 데이터는 거래 내역으로 적립일별 묶음을 만든다 (다음 저장 시 기록됨)
+    if any('lots' not in info for info in customers.values()):
+        service.migrate_point_lots(
+            customers, [transaction for transactions in load_all_transactions().values() for transaction in transactions]
+        )
+    return customers
+
+
+def load_transactions():
+    return _load_json(store_path(TRANSACTIONS_FILE), [])
+
+
+def load_all_transactions():
+    """모든 매장의 거래 내역 {매장 코드: 거래 목록} (매장 공용인 거래처를 합치거나 이전할 때)"""
+    result = {}
+    for code in store_codes():
+        with using_store(code):
+            result[code] = load_transactions()
+    return result
+
+
+def save_all_transactions(by_store):
+    """load_all_transactions() 결과를 매장별 파일에 저장"""
+    for code, transactions in by_store.items():
+        with using_store(code):
+            save_transactions(transactions)
+
+
+def load_items():
+    return _load_json(store_path(ITEMS_FILE), {})
+
+
+def load_item_catalog():
+    """품목 카탈로그 (프로세스 내 공유, 읽기 전용). 없거나 품목 파일보다 오래되었으면 다시 만든다"""
+    catalog_path, items_path = store_path(ITEMS_CATALOG_FILE), store_path(ITEMS_FILE)
+    items_catalog = catalog.shared(catalog_path)
+    if items_catalog is None or items_catalog.source_version != file_version(items_path):
+        with locked():
+            items_catalog = catalog.shared(catalog_path)
+            if items_catalog is None or items_catalog.source_version != file_version(items_path):
+                items = load_items()
+                catalog.publish(catalog_path, items, file_version(items_path))
+                items_catalog = catalog.shared(catalog_path)
+    return items_catalog
+
+
+def load_api_config():
+    return _load_json(store_path(API_CONFIG_FILE), dict(DEFAULT_API_CONFIG), 'json')
+
+
+def load_point_rules():
+    import accrual  # numpy를 쓰므로 적립 규칙 파일을 읽을 때만 로드 (파일이 없으면 적립 엔진의 기본 규칙으로 생성)
+
+    return _load_json(POINT_RULES_FILE, dict(accrual.DEFAULT_RULES), 'json')
+
+
+def save_customers(customers):
+    _save_json(CUSTOMERS_FILE, customers)
+
+
+def save_transactions(transactions):
+    _save_json(store_path(TRANSACTIONS_FILE), transactions)
+
+
+def save_items(items):
+    _save_json(store_path(ITEMS_FILE), items)
+    catalog.publish(store_path(ITEMS_CATALOG_FILE), items, file_version(store_path(ITEMS_FILE)))
+
+
+def save_api_config(api_config):
+    _save_json(store_path(API_CONFIG_FILE), api_config, 'json')  # 직접 열어 고칠 수 있도록 항상 일반 JSON
+
+
+def save_point_rules(rules):
+    _save_json(POINT_RULES_FILE, rules, 'json')
+
+
+def load_stores():
+    if not os.path.exists(STORES_FILE):  # 매장을 등록하기 전에는 파일을 만들지 않음
+        return {}
+    return _load_json(STORES_FILE, {}, 'json')
+
+
+def save_stores(stores):
+    _save_json(STORES_FILE, stores, 'json')
+
+
+# 데이터 이름별 (파일 경로, 읽기 함수, 저장 함수). 매장별 데이터의 경로는 현재 매장 기준
+DATASETS = {
+    'customers': (lambda: CUSTOMERS_FILE, load_customers, save_customers),
+    'transactions': (lambda: store_path(TRANSACTIONS_FILE), load_transactions, save_transactions),
+    'items': (lambda: store_path(ITEMS_FILE), load_items, save_items),
+    'api_config': (lambda: store_path(API_CONFIG_FILE), load_api_config, save_api_config),
+    'point_rules': (lambda: POINT_RULES_FILE, load_point_rules, save_point_rules),
+    'stores': (lambda: STORES_FILE, load_stores, save_stores),
+}
+
+
+class DataStore:
+    """프로세스 내 데이터 캐시
+
+    다른 프로세스(Streamlit 화면, API 서버)가 파일을 바꾸면 다음 접근 시 다시 읽는다.
+    수정은 locked() 안에서 get() → 변경 → save() 순서로 한다.
+    매장별 데이터는 현재 매장의 파일 경로별로 따로 둔다.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._versions = {}
+
+    def get(self, name):
+        path, load, _ = DATASETS[name]
+        key = (name, path())
+        version = file_version(key[1])
+        if key not in self._data or version is None or self._versions.get(key) != version:
+            self._data[key] = load()
+            self._versions[key] = file_version(key[1])
+        return self._data[key]
+
+    def version(self, name):
+        """마지막으로 읽거나 저장한 파일의 버전 (데이터가 바뀌었는지 판단용)"""
+        return self._versions.get((name, DATASETS[name][0]()))
+
+    def save(self, name, data=None):
+        path, _, save = DATASETS[name]
+        key = (name, path())
+        if data is not None:
+            self._data[key] = data
+        save(self._data[key])
+        self._versions[key] = file_version(key[1])
+
+
+# 초기 데이터 로드 또는 생성
+def load_or_create_data():
+    return load_customers(), load_transactions(), load_items(), load_api_config()
+
+
+# 데이터 저장
+def save_data(customers, transactions, items, api_config=None):
+    save_customers(customers)
+    save_transactions(transactions)
+    save_items(items)
+    if api_config is not None:  # API 설정 저장
+        save_api_config(api_config)
@@ -0,0 +1,158 @@
+"""매장(이카운트 회사 코드)별 데이터 분리와 매장 합계
+
+    python -m stores --add GN01 --name 강남점 --com-code 123456
+    python -m stores --list
+    python -m stores --summary --from 2026-10-01 --to 2026-10-31 --report stores.csv
+
+거래 내역/품목/이카운트 API 설정은 매장별 폴더(stores/<매장 코드>/)에 따로 저장하고,
+거래처(포인트 잔액)와 적립 규칙은 모든 매장이 함께 쓴다. 기본 매장('')은 이전과 같이 작업 폴더의 파일을 쓰므로
+매장을 등록하지 않으면 동작이 바뀌지 않는다. 화면에서는 사이드바, API에서는 ?store=매장코드로 매장을 고른다.
+"""
+import argparse
+import csv
+import sys
+
+import metrics
+import service
+import storage
+from history import TransactionIndex
+
+DEFAULT_STORE_NAME = "기본 매장"
+
+REPORT_COLUMNS = [
+    "store", "store_name", "transactions", "customers", "shared_customers",
+    "total_supply_value", "total_amount", "points",
+]
+
+
+def store_label(stores, code):
+    """매장 선택 목록 표시 이름"""
+    if not code:
+        return DEFAULT_STORE_NAME
+    return f"{stores.get(code, {}).get('name') or code} ({code})"
+
+
+def add_store(stores, code, name, com_code=""):
+    """매장 등록 (매장 폴더는 처음 저장할 때 만들어짐). 이미 있거나 코드 형식이 잘못되면 ServiceError"""
+    code = (code or "").strip()
+    if not storage.STORE_CODE_PATTERN.match(code):
+        raise service.ServiceError("매장 코드는 영문/숫자/-/_ 32자 이내로 입력해주세요.")
+    if code in stores:
+        raise service.ServiceError(f"이미 등록된 매장 코드입니다: {code}")
+    if com_code and any(info.get('com_code') == com_code for info in stores.values()):
+        raise service.ServiceError(f"이미 다른 매장에 등록된 회사 코드입니다: {com_code}")
+    stores[code] = {"name": (name or "").strip() or code, "com_code": (com_code or "").strip()}
+
+
+def store_for_com_code(stores, com_code):
+    """이카운트 회사 코드(COM_CODE)로 등록한 매장 코드, 없으면 None"""
+    for code, info in stores.items():
+        if com_code and info.get('com_code') == com_code:
+            return code
+    return None
+
+
+@metrics.timed("stores.summary")
+def summarize(by_store, start=None, end=None, indexes=None):
+    """매장별 합계 행 목록과 전체 합계 행 (by_store: {매장 코드: 거래 목록}, 기간은 "YYYY-MM-DD" 포함)
+
+    indexes({매장 코드: TransactionIndex})를 주면 기간 조회에 그 매장 색인을 쓴다 (없으면 새로 만듦).
+
+    customers는 그 매장에서 거래한 거래처 수, shared_customers는 그중 다른 매장에서도 거래한 거래처 수.
+    전체 합계의 customers는 중복 없이 센다.
+    """
+    stores = storage.load_stores()
+    buyers = {}
+    rows = []
+    for code, transactions in by_store.items():
+        if start or end:
+            index = (indexes or {}).get(code) or TransactionIndex(transactions)
+            positions = index.range(start or "", end or "9999-99-99")
+            selected = [transactions[pos] for pos in positions]
+        else:
+            selected = transactions
+        buyers[code] = {transaction.get('customer_id', '') for transaction in selected} - {''}
+        rows.append({
+            "store": code,
+            "store_name": stores.get(code, {}).get('name') or (code or DEFAULT_STORE_NAME),
+            "transactions": len(selected),
+            "customers": len(buyers[code]),
+            "shared_customers": 0,
+            "total_supply_value": sum(transaction.get('total_supply_value', 0) for transaction in selected),
+            "total_amount": sum(transaction.get('total_amount', 0) for transaction in selected),
+            "points": sum(transaction.get('points', 0) for transaction in selected),
+        })
+
+    visits = {}
+    for customer_ids in buyers.values():
+        for customer_id in customer_ids:
+            visits[customer_id] = visits.get(customer_id, 0) + 1
+    for row in rows:
+        row["shared_customers"] = sum(1 for customer_id in buyers[row["store"]] if visits[customer_id] > 1)
+
+    total = {
+        "store": "", "store_name": "전체",
+        "transactions": sum(row["transactions"] for row in rows),
+        "customers": len(visits),
+        "shared_customers": sum(1 for count in visits.values() if count > 1),
+        **{column: sum(row[column] for row in rows) for column in ("total_supply_value", "total_amount", "points")},
+    }
+    return rows, total
+
+
+def write_report(rows, total, path):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:  # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+        writer.writerow(total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="매장별 데이터 관리와 매장 합계")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--add", metavar="매장코드", help="매장 등록")
+    action.add_argument("--list", action="store_true", help="매장 목록")
+    action.add_argument("--summary", action="store_true", help="매장별 거래/포인트 합계")
+    parser.add_argument("--name", help="매장 이름 (--add)")
+    parser.add_argument("--com-code", default="", help="이카운트 회사 코드 (--add)")
+    parser.add_argument("--from", dest="start", help="합계 시작일 YYYY-MM-DD (--summary)")
+    parser.add_argument("--to", dest="end", help="합계 종료일 YYYY-MM-DD (--summary)")
+    parser.add_argument("--report", help="매장 합계 CSV 경로 (--summary)")
+    args = parser.parse_args()
+
+    if args.add:
+        with storage.locked():
+            stores = storage.load_stores()
+            try:
+                add_store(stores, args.add, args.name, args.com_code)
+            except service.ServiceError as e:
+                print(str(e), file=sys.stderr)
+                sys.exit(1)
+            storage.save_stores(stores)
+        print(f"매장을 등록했습니다: {store_label(stores, args.add.strip())}", file=sys.stderr)
+        return
+
+    stores = storage.load_stores()
+    if args.list:
+        for code in storage.store_codes():
+            com_code = stores.get(code, {}).get('com_code', '')
+            path = storage.store_path(storage.TRANSACTIONS_FILE, code)
+            print(f"{code or '-':12} {store_label(stores, code):24} {com_code:10} {path}")
+        return
+
+    rows, total = summarize(storage.load_all_transactions(), args.start, args.end)
+    for row in rows + [total]:
+        print(
+            f"{row['store_name']}: 거래 {row['transactions']:,}건, 거래처 {row['customers']:,}곳"
+            f"(다른 매장과 공유 {row['shared_customers']:,}), 합계 {row['total_amount']:,.0f}원, "
+            f"적립 {row['points']:,}P",
+            file=sys.stderr
+        )
+    if args.report:
+        write_report(rows, total, args.report)
+        print(f"보고서 저장: {args.report}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()